@@ -1,349 +1,1158 @@
-﻿#-------------------------------------------------------------------------------
-# Name:         db_sqlite_py
-# Purpose:      Для работы с базой данных SQLite
-#               Предназначен для взаимодействия с БД SQLite
-#               включает 4 класса:
-# Author:       Цымай Дмитрий (dmitry-zy@yandex.ru)
-#
-# Created:      25.05.2013
-# Copyright:    (c) Цымай Дмитрий 2013
-# Licence:      LGPL
-#-------------------------------------------------------------------------------
-#!/usr/bin/env python
-import sqlite3
-import string
-import codecs
-import pickle
-import sys
-import os
-import time
-#
-def info():
-    '''Общая информация'''
-    print("database 0 sqlite3 ")
-    return True
-    #
-class Journal(object):
-    '''Класс для ведения журнала действий'''
-    def __init__(self,output=True,file_name='journal'):
-        self.__filename=file_name+'.out'
-        self.__out=[]
-        self.output=output
-        if self.output:
-            self.restore()
-    #
-    def __del__(self):
-        #Запись в файл
-        self.save()
-        #self.getJournal()
-    #
-    def clear(self):
-        #Очистка всех записей
-        self.__out=[]
-        self.save()
-    #
-    def getJournal(self):
-        #возвращает список ошибок
-        #
-        if self.output:
-            print(self.__out)
-        return self.__out
-        #
-    def save(self):
-        #Запись результатов вывода в файл
-        #
-        with open(self.__filename,"wb") as f_out:
-            rec_str=pickle.dump(self.__out,f_out)
-        #
-    def restore(self):
-        #Восстановление результатов вывода из файла
-        #
-        with open(self.__filename,'rb') as f_in:
-            self.__out=pickle.load(f_in)
-        #
-    def add(self,metod,comment,zapros):
-        #Внесение комментария в список
-        #
-        #metod метод
-        #comment комментарий
-        #zapros текст запроса
-        #
-        tm=time.asctime()
-        self.__out.append((tm,metod,comment,zapros))
-        return len(self.__out)
-#
-#
-#
-class set_info(object):
-    def __init__(self,dbname,path):
-        self.dbname=dbname
-        self.path=path
-        #Результат последнего запроса
-        self.result=None
-        #Список ошибок
-        self.log=Journal(False,'error')
-        self.error=False
-    #
-    def _execute(self,zapros,param=None):
-        '''Выполнение запроса к БД
-        zapros-запрос
-        param-параметры запроса кортеж переменных заменяющих в запросе знаки ?
-        '''
-        res=False
-        #
-        if param==None: param=()
-        # Проверка существования файла БД
-        if self.dbname!=None:
-            conn=sqlite3.connect(self.dbname)
-            cursor=conn.cursor()
-            try:
-                cursor.execute(zapros,param)
-            except:
-                self.log.add('execute','Некорректный запрос',zapros)
-                self.error=True
-            conn.commit()
-            #количество полученных записей
-            self.__rcount=cursor.rowcount
-            self.result=cursor.fetchall()
-            #закрываем соединение
-            cursor.close()
-            conn.close()
-            if self.result:
-                res=self.result
-        return res
-    #
-#
-#
-#
-class database(set_info):
-    '''соединение с файлом базы данных sqlite  и отправка запросов'''
-    def __init__(self,dbname=None,path=None):
-        #Начальные значения переменных
-        #
-        set_info.__init__(self,dbname,path)
-        #Путь к БД
-        if (dbname!=None)and(os.path.exists(path+dbname)):
-            self.dbname=path+dbname
-        #
-    def list_tables(self):
-        '''Список таблиц в БД'''
-        #
-        zapros='SELECT "name" from "sqlite_master"'
-        self._execute(zapros)
-        res=[x[0] for x in self.result]
-        return res
-    #
-    def get_table(self,table_name):
-        '''Получить ссылку на таблицу
-           table_name - имя таблицы'''
-        #
-        if self.exists_tables(table_name):
-            filds_name_type=self.get_tables_info(table_name)
-            newtbl=tables(self.dbname,self.path,table_name,filds_name_type,True)
-            self.log.add('open table','Открыта таблица "{0}" в базе данных "{1}"'.format(table_name,self.dbname),'')
-        else:
-            newtbl=False
-            self.log.add('open table','Таблица "{0}" в базе данных "{1}" не существует'.format(table_name,self.dbname),'')
-        return newtbl
-    #
-    def exists_tables(self,table_name):
-        '''Проверка, существует ли таблица в базе данных
-        table_name - имя таблицы'''
-        #
-        if table_name in self.list_tables():
-            res=True
-        else:
-            res=False
-        return res
-    #
-    def get_tables_info(self,table_name):
-        '''Полная информация о таблице
-        table_name=None - имя таблицы'''
-        #
-        zapros='PRAGMA table_info ({0})'.format(table_name)
-        res=[]
-        [res.append([x[1],x[2]]) for x in self._execute(zapros)]
-        return res
-    #
-    def create_table(self,table_name,fld_type):
-        '''Создание таблицы
-        table_name=None - имя таблицы
-        fld_type Словарь с именами и типами полей таблицы'''
-        #
-        newtbl=False
-        if isinstance(fld_type,dict):#and (not self.exists_tables(table_name))
-            fld=['"{0}" {1}'.format(f,t)  for f,t in fld_type.items()]
-            zapros='CREATE TABLE "{0}"({1})'.format(table_name,','.join(fld))
-            self._execute(zapros)
-        return self.get_table(table_name)
-        #
-    def delete_table(self,table_name):
-        '''Удаление таблицы
-        table_name=None - имя таблицы'''
-        #
-        res=False
-        if self.exists_tables(table_name):
-            zapros='DROP TABLE "{0}"'.format(table_name)
-            if self._execute(zapros,())!=False:
-                self.__log.add('delete','Удалена таблица: {0}'.format(table_name),zapros)
-                res=True
-        else:
-            self.log.add('delete','Таблица: {0} не существует'.format(table_name),zapros)
-        return res
-#
-#
-#
-class tables(set_info):
-    '''Работа с таблицей из БД'''
-    #
-    def __init__(self,dbname=None,path=None,table_name=None,fldnametype=None,log=True):
-        #БД по умолчанию
-        set_info.__init__(self,dbname,path)
-        #Начальные значения переменных
-        #Имя текущей таблицы
-        self.__table_name=table_name
-        #
-        self.__fldnametype=fldnametype
-        #
-        self.__fldname=[x[0] for x in self.__fldnametype]
-    #
-    def insert(self,fld_nm_val):
-        '''Вставка в таблицу
-        fld_nm_val-словарь {'param_name': param_value}'''
-        #
-        #Компоновка запроса
-        table_name=self.__table_name
-        #
-        res=False
-        if self.__table_name:
-            fld_nm_val=self._validate_filds_name(fld_nm_val)
-            #
-            if fld_nm_val!=False:
-                param,fld=[],[]
-                for f,v in fld_nm_val.items():
-                    param.append(v)
-                    fld.append(f)
-                param=tuple(param)
-                #
-                zapros='INSERT INTO {0} ({1}) VALUES ({2})'.format(self.__table_name,','.join(fld),','.join(["?"]*len(fld_nm_val)))
-                res=self._execute(zapros,param)
-                res=not self.error
-        return res
-    #
-    def select(self,where='1=1',filds='*'):
-        '''Выборка из таблицы
-        where='1=1' - условие
-        filds='*' - список полей []'''
-        #
-        res=False
-        if self.__table_name:
-            filds=self._validate_filds_name(filds)
-            if isinstance(filds,list):
-                filds=','.join(filds)
-            elif filds==False:
-                filds='*'
-            #
-            zapros='SELECT {0} FROM {1} WHERE {2}'.format(filds,self.__table_name,where)
-            #
-            res=self._execute(zapros)
-        self.log.add('select',res,zapros)
-        return res
-    #
-    def update(self,fld_nm_val,where):
-        '''Обновление записи
-        where - условие
-        fld_nm_val-словарь {'param_name': param_value}
-        table_name=self.__table_name'''
-        #
-        res=False
-        if table_name:
-            fld_nm_val=self._validate_filds_name(fld_nm_val)
-            if fld_nm_val!=False:
-                #Компоновка запроса
-                param,fld=[],[]
-                for f,v in fld_nm_val.items():
-                    param.append(v)
-                    fld.append(f+'=?')
-                param=tuple(param)
-                fld=','.join(fld)
-                #
-                zapros='UPDATE {0} SET {1} WHERE {2}'.format(table_name,fld,where)
-                #
-                self._execute(zapros,param)
-                res=not self.error
-        return res
-    #
-    def delete(self,where):
-        '''Удаление записи
-        where - условие'''
-        #
-        res=False
-        if self.__table_name:
-            zapros='DELETE from {0} WHERE {1}'.format(self.__table_name,where)
-            res=self._execute(zapros)
-            #
-        return res
-    #
-    def count(self):
-        '''Количество записей в текущей таблице'''
-        #
-        res=self.select()
-        if res:
-            return len(res)
-        else:
-            return 0
-    #
-    def _validate_filds_name(self,filds):
-        '''проверка имени поля
-        filds - словарь {fild_name:fild_value} или список имен полей'''
-        #
-        #если проверяется словарь
-        if isinstance(filds,dict):
-            del_fld=[fld for fld in filds.keys() if not(fld in self.__fldname)]
-            for fld in del_fld:
-                del filds[fld]
-            if len(filds)==0: filds=False
-        #Если проверяется список
-        elif isinstance(filds,list):
-            filds=[fld for fld in filds if fld in self.__fldname]
-            if len(filds)==0: filds=False
-        #если проверяется строка
-        elif isinstance(filds,str):
-            if not(filds in self.__fldname): filds=False
-        else: filds=False
-        #возврат словаря/списка/строки соответствующих полям в таблице
-        return filds
-    #
-    def _validate_filds_value(self,fld_name,fld_value):
-        '''Проверка fld_name записи
-        fld_name - имя поля
-        fld_value - значение'''
-        #
-        res_qwery=self.select(filds=fld_name)
-        if res_qwery:
-            fld_value_table=[x[0] for x in res_qwery]
-            if fld_value in fld_value_table:
-                return True
-            else:
-                return False
-        else:
-            return False
-    #
-    def max_fld(self,fld):
-        '''Максимальное значение столбца'''
-        #
-        zapros='SELECT MAX({0}) FROM "{1}"'.format(fld,self.__table_name)
-        res=self._execute(zapros)
-        if not self.error:
-            max_res=res[0][0]
-        else:
-            max_res=False
-        return max_res
-    #
-    #
-    #
-def main():
-    info()
-if __name__ == '__main__':
-    main()
-    #
+﻿#-------------------------------------------------------------------------------
+# Name:         db_sqlite_py
+# Purpose:      Для работы с базой данных SQLite
+#               Предназначен для взаимодействия с БД SQLite
+#               включает 4 класса:
+# Author:       Цымай Дмитрий (dmitry-zy@yandex.ru)
+#
+# Created:      25.05.2013
+# Copyright:    (c) Цымай Дмитрий 2013
+# Licence:      LGPL
+#-------------------------------------------------------------------------------
+#!/usr/bin/env python
+import sqlite3
+import string
+import codecs
+import collections
+import sys
+import os
+import time
+import threading
+import itertools
+import re
+import contextlib
+#
+def info():
+    '''Общая информация'''
+    print("database 0 sqlite3 ")
+    return True
+    #
+#Профили настроек производительности SQLite {<профиль>:{<pragma>:<значение>}}
+dict_profiles={'read-mostly':{'journal_mode':'WAL','synchronous':'NORMAL','cache_size':-65536,'mmap_size':268435456,'temp_store':'MEMORY'},
+               'bulk-load':{'journal_mode':'WAL','synchronous':'OFF','cache_size':-262144,'temp_store':'MEMORY'},
+               'safe':{'journal_mode':'DELETE','synchronous':'FULL'}}
+#Допустимые настройки (PRAGMA)
+lst_pragmas=['journal_mode','synchronous','cache_size','mmap_size','temp_store','busy_timeout','locking_mode','foreign_keys']
+#
+def to_pragmas(profile=None,pragmas=None):
+    '''Функция возвращает словарь настроек SQLite {<pragma>:<значение>}
+    profile=None - имя профиля из dict_profiles ('read-mostly','bulk-load','safe')
+    pragmas=None - словарь явно заданных настроек (дополняет и заменяет профиль)
+    Недопустимые настройки и значения отбрасываются'''
+    #
+    res={}
+    if profile in dict_profiles:
+        res.update(dict_profiles[profile])
+    if isinstance(pragmas,dict):
+        res.update({k:v for k,v in pragmas.items() if (k in lst_pragmas)and(re.match(r'^-?\w+$',str(v)))})
+    return res
+#
+#Операторы, допустимые в условиях запроса
+lst_operators=['=','!=','<>','<','<=','>','>=','like','in','not in','is','is not']
+#
+def to_where(conditions):
+    '''Функция формирует условие запроса WHERE с параметрами (знаками ?)
+    Текст условия не зависит от значений, что позволяет повторно
+    использовать подготовленные запросы SQLite.
+    conditions - кортеж (<поле>,<оператор>,<значение>) или список таких кортежей,
+        для операторов 'in', 'not in' значение - список значений
+    Возвращает кортеж (<условие>,<кортеж параметров>),
+    ('1=1',()) для пустого списка условий
+    или (False,()) при недопустимом операторе'''
+    #
+    if isinstance(conditions,tuple):
+        conditions=[conditions]
+    where,param=[],[]
+    for fld,op,value in conditions:
+        op=op.lower()
+        if op not in lst_operators:
+            return (False,())
+        if op in ('in','not in'):
+            value=list(value)
+            where.append('"{0}" {1} ({2})'.format(fld,op.upper(),','.join(['?']*len(value))))
+            param.extend(value)
+        else:
+            where.append('"{0}" {1} ?'.format(fld,op.upper()))
+            param.append(value)
+    if len(where)==0:
+        return ('1=1',())
+    return (' AND '.join(where),tuple(param))
+#Открытые файлы журналов {<имя файла>:{'lock':<блокировка>,'file':<файл>,'refs':<число журналов>}}
+#(один файл и одна блокировка на имя файла для всех объектов Journal)
+dict_journal_files={}
+lock_journal_files=threading.Lock()
+#
+def get_journal_file(file_name):
+    '''Общие для всех журналов файл и блокировка для имени файла file_name
+    Каждый вызов увеличивает счетчик использующих файл журналов'''
+    #
+    with lock_journal_files:
+        if file_name not in dict_journal_files:
+            dict_journal_files[file_name]={'lock':threading.Lock(),'file':None,'refs':0}
+        dict_journal_files[file_name]['refs']+=1
+        return dict_journal_files[file_name]
+#
+def release_journal_file(file_name):
+    '''Освобождение файла журнала file_name
+    Файл закрывается, когда его освободили все использующие журналы'''
+    #
+    with lock_journal_files:
+        shared=dict_journal_files.get(file_name)
+        if shared==None:
+            return
+        shared['refs']-=1
+        if shared['refs']<=0:
+            del dict_journal_files[file_name]
+            with shared['lock']:
+                if shared['file']!=None:
+                    shared['file'].close()
+                    shared['file']=None
+#
+class Journal(object):
+    '''Класс для ведения журнала действий
+    Последние записи хранятся в памяти (кольцевой буфер ограниченного размера),
+    все записи построчно дописываются в файл журнала.
+    При превышении размера файла он переименовывается в <file_name>.out.1
+    Журналы с одним именем файла используют общий файл (get_journal_file)'''
+    def __init__(self,output=True,file_name='journal',maxlen=1000,max_size=1048576,save_rows=False):
+        '''output - вывод журнала на печать
+        file_name - имя файла журнала (без расширения)
+        maxlen=1000 - количество записей, хранимых в памяти
+        max_size=1048576 - максимальный размер файла журнала, байт
+        save_rows=False - сохранять в журнале результаты запросов (True)
+            или только количество записей (False)'''
+        self.__filename=file_name+'.out'
+        self.__out=collections.deque(maxlen=maxlen)
+        self.__shared=get_journal_file(self.__filename)
+        self.__closed=False
+        self.__lock=threading.Lock()
+        self.max_size=max_size
+        self.save_rows=save_rows
+        self.output=output
+        if self.output:
+            self.restore()
+    #
+    def __del__(self):
+        #Освобождение файла журнала
+        self.close()
+    #
+    def clear(self):
+        #Очистка всех записей
+        with self.__lock:
+            self.__out.clear()
+        with self.__shared['lock']:
+            self._close_file()
+            open(self.__filename,'w').close()
+    #
+    def getJournal(self):
+        #возвращает список записей
+        #
+        if self.output:
+            print(list(self.__out))
+        return list(self.__out)
+        #
+    def save(self):
+        #Запись буфера файла журнала на диск
+        #
+        with self.__shared['lock']:
+            if self.__shared['file']!=None:
+                self.__shared['file'].flush()
+        #
+    def close(self):
+        #Освобождение файла журнала (файл закрывается после закрытия
+        #всех журналов с тем же именем файла)
+        #
+        with self.__lock:
+            if self.__closed:
+                return
+            self.__closed=True
+        release_journal_file(self.__filename)
+    #
+    def _close_file(self):
+        if self.__shared['file']!=None:
+            self.__shared['file'].close()
+            self.__shared['file']=None
+    #
+    def restore(self):
+        #Восстановление последних записей из файла
+        #
+        if os.path.exists(self.__filename):
+            with open(self.__filename,encoding='utf-8',errors='replace') as f_in:
+                for line in f_in:
+                    self.__out.append(tuple(line.rstrip('\n').split('\t')))
+        #
+    def _write(self,rec):
+        #Дописывание записи в файл журнала с ротацией по размеру
+        #
+        line='\t'.join(str(x).replace('\t',' ').replace('\n',' ') for x in rec)+'\n'
+        if self.__shared['file']==None:
+            self.__shared['file']=open(self.__filename,'a',encoding='utf-8')
+        out=self.__shared['file']
+        if (out.tell()>0)and(out.tell()+len(line.encode('utf-8'))>self.max_size):
+            self._close_file()
+            os.replace(self.__filename,self.__filename+'.1')
+            out=self.__shared['file']=open(self.__filename,'a',encoding='utf-8')
+        out.write(line)
+        out.flush()
+    #
+    def add(self,metod,comment,zapros,duration=None):
+        #Внесение комментария в список
+        #
+        #metod метод
+        #comment комментарий (результат запроса сохраняется только при save_rows=True)
+        #zapros текст запроса
+        #duration время выполнения запроса, с
+        #
+        if (not self.save_rows)and(isinstance(comment,(list,tuple))):
+            comment='записей: {0}'.format(len(comment))
+        elif comment==False:
+            comment='записей: 0'
+        tm=time.asctime()
+        rec=(tm,metod,comment,zapros,'' if duration==None else '{0:.6f}'.format(duration))
+        with self.__lock:
+            self.__out.append(rec)
+            if self.__closed:
+                #Запись после закрытия - файл журнала используется повторно
+                self.__shared=get_journal_file(self.__filename)
+                self.__closed=False
+        with self.__shared['lock']:
+            self._write(rec)
+        return len(self.__out)
+#
+#
+#
+class connection_pool(object):
+    '''Пул соединений с БД
+    Соединения остаются открытыми и повторно используются:
+    одно соединение на поток. Соединения завершившихся потоков
+    закрываются при открытии новых соединений (или методом evict).
+    Снимок БД в памяти (in_memory=True) обслуживается одним соединением
+    для всех потоков; запросы к нему выполняются последовательно (serialized)'''
+    def __init__(self,dbname,cached_statements=256,max_queries=1000,in_memory=False,write_back=False,pragmas=None):
+        '''dbname - файл БД
+        cached_statements=256 - размер кэша подготовленных запросов
+        max_queries=1000 - количество запоминаемых текстов запросов
+        in_memory=False - работа с копией БД в памяти (снимок загружается через backup API)
+        write_back=False - запись снимка обратно в файл при закрытии пула
+        pragmas=None - настройки SQLite {<pragma>:<значение>} для каждого соединения'''
+        self.dbname=dbname
+        self.pragmas=pragmas if pragmas!=None else {}
+        #Размер кэша подготовленных запросов для каждого соединения
+        self.cached_statements=cached_statements
+        #Открытые соединения {<идентификатор потока>:(<поток>,<соединение>)}
+        self.__conn={}
+        #Количество изменений через закрытые соединения (см. total_changes)
+        self.__closed_changes=0
+        self.__lock=threading.Lock()
+        #Количество открытых соединений
+        self.opened=0
+        #Количество выполненных запросов
+        self.served=0
+        #Выполненные запросы {<текст запроса>:<количество>} (не более max_queries)
+        self.queries=collections.OrderedDict()
+        self.max_queries=max_queries
+        #Снимок БД в памяти
+        self.in_memory=in_memory
+        self.write_back=write_back
+        self.__memory=None
+        #Блокировка соединения со снимком БД в памяти
+        self.__serial=threading.RLock()
+    #
+    def _load_snapshot(self):
+        '''Загрузка снимка БД в память (backup API)
+        Соединение со снимком используется всеми потоками до закрытия пула
+        (общий кэш нескольких соединений дает SQLITE_LOCKED при записи
+        во время чтения другими потоками)'''
+        #
+        self.__memory=sqlite3.connect(':memory:',check_same_thread=False,cached_statements=self.cached_statements)
+        self.opened+=1
+        if os.path.exists(self.dbname):
+            source=sqlite3.connect(self.dbname)
+            source.backup(self.__memory)
+            source.close()
+        self._set_pragmas(self.__memory)
+    #
+    def save_snapshot(self,dbname=None):
+        '''Запись снимка БД из памяти в файл
+        dbname=None - имя файла (по умолчанию исходный файл БД)'''
+        #
+        if self.__memory==None:
+            return False
+        target=sqlite3.connect(dbname if dbname!=None else self.dbname)
+        with self.__serial:
+            self.__memory.backup(target)
+        target.close()
+        return True
+    #
+    def __enter__(self):
+        return self
+    #
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.close()
+        return False
+    #
+    def get_connection(self):
+        '''Соединение для текущего потока
+        При отсутствии открывается новое соединение.
+        Для снимка в памяти - общее соединение (запросы выполнять под serialized)'''
+        #
+        ident=threading.get_ident()
+        thread=threading.current_thread()
+        with self.__lock:
+            if self.in_memory:
+                if self.__memory==None:
+                    self._load_snapshot()
+                return self.__memory
+            conn=None
+            if ident in self.__conn:
+                #Идентификатор может быть повторно использован новым потоком
+                if self.__conn[ident][0] is thread:
+                    conn=self.__conn[ident][1]
+            if conn==None:
+                self._evict()
+                conn=sqlite3.connect(self.dbname,check_same_thread=False,cached_statements=self.cached_statements)
+                self._set_pragmas(conn)
+                self.__conn[ident]=(thread,conn)
+                self.opened+=1
+        return conn
+    #
+    def _evict(self):
+        '''Закрытие соединений завершившихся потоков (вызывается под блокировкой)
+        Возвращает количество закрытых соединений'''
+        #
+        current=threading.current_thread()
+        dead=[k for k,(thread,conn) in self.__conn.items() if (not thread.is_alive())or((k==threading.get_ident())and(thread is not current))]
+        for k in dead:
+            conn=self.__conn.pop(k)[1]
+            self.__closed_changes+=conn.total_changes
+            conn.close()
+        return len(dead)
+    #
+    def serialized(self):
+        '''Блокировка на время выполнения запроса и чтения результата:
+        для снимка в памяти - общая блокировка соединения, иначе не требуется'''
+        #
+        return self.__serial if self.in_memory else contextlib.nullcontext()
+    #
+    def evict(self):
+        '''Закрытие соединений завершившихся потоков
+        Возвращает количество закрытых соединений'''
+        #
+        with self.__lock:
+            return self._evict()
+    #
+    def _set_pragmas(self,conn):
+        '''Применение настроек SQLite к соединению'''
+        #
+        for k,v in self.pragmas.items():
+            conn.execute('PRAGMA {0}={1}'.format(k,v)).fetchall()
+    #
+    def served_add(self,count=1,zapros=None):
+        '''Учет выполненных запросов
+        zapros - текст запроса (сохраняется для анализа планов запросов)'''
+        #
+        with self.__lock:
+            self.served+=count
+            if zapros!=None:
+                if zapros in self.queries:
+                    self.queries[zapros]+=1
+                else:
+                    if len(self.queries)>=self.max_queries:
+                        self.queries.popitem(False)
+                    self.queries[zapros]=1
+        return self.served
+    #
+    def close(self):
+        '''Закрытие всех открытых соединений'''
+        #
+        with self.__lock:
+            for thread,conn in self.__conn.values():
+                self.__closed_changes+=conn.total_changes
+                conn.close()
+            self.__conn={}
+            if self.__memory!=None:
+                if self.write_back:
+                    self.save_snapshot()
+                self.__closed_changes+=self.__memory.total_changes
+                self.__memory.close()
+                self.__memory=None
+    #
+    def total_changes(self):
+        '''Суммарное количество изменений записей через открытые соединения пула'''
+        #
+        with self.__lock:
+            res=self.__closed_changes+sum(conn.total_changes for thread,conn in self.__conn.values())
+            return res+(self.__memory.total_changes if self.__memory!=None else 0)
+    #
+    def get_stats(self):
+        '''Статистика использования пула
+        Формат возвращаемых данных: словарь
+        {'opened':<открыто соединений>,'served':<выполнено запросов>,'active':<активных соединений>}'''
+        #
+        return {'opened':self.opened,'served':self.served,'active':len(self.__conn)+(self.__memory!=None)}
+#
+#
+#
+class set_info(object):
+    def __init__(self,dbname,path,pool=None):
+        self.dbname=dbname
+        self.path=path
+        #Пул соединений (создается при первом запросе)
+        self.pool=pool
+        #Результат последнего запроса
+        self.result=None
+        #Список ошибок
+        self.log=Journal(False,'error')
+        self.error=False
+        #Время выполнения последнего запроса, с
+        self.duration=0
+    #
+    def __enter__(self):
+        return self
+    #
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.close()
+        return False
+    #
+    def get_pool(self):
+        '''Пул соединений с БД'''
+        #
+        if (self.pool==None)and(self.dbname!=None):
+            self.pool=connection_pool(self.dbname)
+        return self.pool
+    #
+    def close(self):
+        '''Закрытие соединений с БД'''
+        #
+        if self.pool!=None:
+            self.pool.close()
+    #
+    def get_stats(self):
+        '''Статистика использования соединений'''
+        #
+        if self.pool!=None:
+            return self.pool.get_stats()
+        return {'opened':0,'served':0,'active':0}
+    #
+    def data_version(self):
+        '''Признак версии данных БД: кортеж
+        (<изменения через соединения пула>,<PRAGMA data_version>)
+        Значение меняется при изменении данных как через данный пул,
+        так и через другие соединения'''
+        #
+        res=self._execute('PRAGMA data_version')
+        version=res[0][0] if res else None
+        pool=self.get_pool()
+        return (pool.total_changes() if pool!=None else 0,version)
+    #
+    def _execute(self,zapros,param=None):
+        '''Выполнение запроса к БД
+        zapros-запрос
+        param-параметры запроса кортеж переменных заменяющих в запросе знаки ?
+        '''
+        res=False
+        #
+        if param==None: param=()
+        # Проверка существования файла БД
+        if self.dbname!=None:
+            pool=self.get_pool()
+            conn=pool.get_connection()
+            tm=time.perf_counter()
+            with pool.serialized():
+                cursor=conn.cursor()
+                try:
+                    cursor.execute(zapros,param)
+                except:
+                    self.log.add('execute','Некорректный запрос',zapros)
+                    self.error=True
+                conn.commit()
+                #количество полученных записей
+                self.__rcount=cursor.rowcount
+                self.result=cursor.fetchall()
+                #закрываем курсор (соединение остается открытым)
+                cursor.close()
+            pool.served_add(zapros=zapros)
+            #Время выполнения запроса
+            self.duration=time.perf_counter()-tm
+            if self.result:
+                res=self.result
+        return res
+    #
+    def _execute_many(self,zapros,param_seq):
+        '''Выполнение запроса к БД для набора параметров (executemany)
+        Все записи выполняются в одной транзакции
+        zapros-запрос
+        param_seq-последовательность кортежей параметров запроса
+        Возвращает количество обработанных записей'''
+        res=0
+        #
+        if self.dbname!=None:
+            pool=self.get_pool()
+            conn=pool.get_connection()
+            with pool.serialized():
+                cursor=conn.cursor()
+                try:
+                    cursor.executemany(zapros,param_seq)
+                    conn.commit()
+                    res=cursor.rowcount
+                except:
+                    conn.rollback()
+                    self.log.add('execute_many','Некорректный запрос',zapros)
+                    self.error=True
+                cursor.close()
+            pool.served_add(zapros=zapros)
+        return res
+    #
+    def _create_index(self,table_name,filds,index_name=None,unique=False):
+        '''Создание индекса
+        table_name - имя таблицы
+        filds - имя поля или список полей
+        index_name=None - имя индекса (по умолчанию idx_<таблица>_<поля>)
+        unique=False - уникальный индекс'''
+        #
+        if isinstance(filds,str):
+            filds=[filds]
+        if index_name==None:
+            index_name='idx_{0}_{1}'.format(table_name,'_'.join(filds)).replace('-','_')
+        zapros='CREATE {0}INDEX IF NOT EXISTS "{1}" ON "{2}" ({3})'.format('UNIQUE ' if unique else '',index_name,table_name,','.join(['"{0}"'.format(f) for f in filds]))
+        self.error=False
+        self._execute(zapros)
+        if self.error:
+            return False
+        self.log.add('index','Создан индекс {0}'.format(index_name),zapros)
+        return index_name
+    #
+    def _drop_index(self,index_name):
+        '''Удаление индекса index_name'''
+        #
+        zapros='DROP INDEX IF EXISTS "{0}"'.format(index_name)
+        self.error=False
+        self._execute(zapros)
+        return not self.error
+    #
+    def _list_indexes(self,table_name=None):
+        '''Список индексов
+        table_name=None - имя таблицы (по умолчанию индексы всех таблиц)
+        Формат возвращаемых данных: список кортежей [(<имя индекса>,<имя таблицы>),]'''
+        #
+        zapros='SELECT "name","tbl_name" FROM "sqlite_master" WHERE "type"=\'index\''
+        param=()
+        if table_name!=None:
+            zapros+=' AND "tbl_name"=?'
+            param=(table_name,)
+        res=self._execute(zapros,param)
+        return res if res else []
+    #
+#
+#
+#
+class database(set_info):
+    '''соединение с файлом базы данных sqlite  и отправка запросов'''
+    def __init__(self,dbname=None,path=None,pool=None,schema_ttl=1.0,in_memory=False,write_back=False,profile=None,pragmas=None):
+        '''schema_ttl=1.0 - интервал проверки изменения схемы БД (PRAGMA schema_version), с
+            schema_ttl=0 - проверка при каждом обращении,
+            schema_ttl=None - только при изменении схемы через данный объект
+        in_memory=False - загрузить копию БД в память; все таблицы, полученные
+            через get_table, работают с этой копией (запросы всех потоков
+            выполняются последовательно через одно соединение)
+        write_back=False - записать копию обратно в файл при закрытии (close)
+        profile=None - профиль настроек SQLite ('read-mostly','bulk-load','safe')
+        pragmas=None - явно заданные настройки SQLite, например {'cache_size':-20000}
+            Настройки применяются к каждому соединению пула'''
+        #Начальные значения переменных
+        #
+        set_info.__init__(self,dbname,path,pool)
+        #Путь к БД
+        if (dbname!=None)and(os.path.exists(path+dbname)):
+            self.dbname=path+dbname
+        #Кэш схемы БД
+        self.schema_ttl=schema_ttl
+        self.invalidate_schema()
+        #Работа с копией БД в памяти
+        self.in_memory=in_memory
+        self.write_back=write_back
+        #Настройки SQLite
+        self.pragmas=to_pragmas(profile,pragmas)
+        if self.in_memory and self.dbname!=None:
+            self.get_pool().get_connection()
+        #
+    def get_pool(self):
+        '''Пул соединений с БД'''
+        #
+        if (self.pool==None)and(self.dbname!=None):
+            self.pool=connection_pool(self.dbname,in_memory=self.in_memory,write_back=self.write_back,pragmas=self.pragmas)
+        return self.pool
+    #
+    def get_pragma(self,name):
+        '''Текущее значение настройки SQLite name для соединения текущего потока'''
+        #
+        if name not in lst_pragmas:
+            return None
+        res=self._execute('PRAGMA {0}'.format(name))
+        return res[0][0] if res else None
+    #
+    def save_snapshot(self,dbname=None):
+        '''Запись копии БД из памяти в файл (при in_memory=True)
+        dbname=None - имя файла (по умолчанию исходный файл БД)'''
+        #
+        if self.pool==None:
+            return False
+        return self.pool.save_snapshot(dbname)
+        #
+    def invalidate_schema(self):
+        '''Сброс кэша схемы БД (имен таблиц и информации о полях)'''
+        #
+        self.__schema_names=None
+        self.__schema_info={}
+        self.__schema_version=None
+        self.__schema_time=0
+    #
+    def schema_version(self):
+        '''Версия схемы БД (PRAGMA schema_version)'''
+        #
+        res=self._execute('PRAGMA schema_version')
+        return res[0][0] if res else None
+    #
+    def _check_schema(self):
+        '''Проверка актуальности кэша схемы БД
+        Кэш сбрасывается при изменении PRAGMA schema_version'''
+        #
+        tm=time.monotonic()
+        if self.__schema_names!=None:
+            if (self.schema_ttl==None)or(tm-self.__schema_time<self.schema_ttl):
+                return
+        version=self.schema_version()
+        if version!=self.__schema_version:
+            self.invalidate_schema()
+            self.__schema_version=version
+        self.__schema_time=tm
+    #
+    def list_tables(self):
+        '''Список таблиц в БД (без индексов, представлений и триггеров)'''
+        #
+        self._check_schema()
+        if self.__schema_names==None:
+            zapros='SELECT "name" from "sqlite_master" WHERE "type"=\'table\''
+            self._execute(zapros)
+            self.__schema_names=[x[0] for x in self.result]
+        return list(self.__schema_names)
+    #
+    def get_table(self,table_name):
+        '''Получить ссылку на таблицу
+           table_name - имя таблицы'''
+        #
+        if self.exists_tables(table_name):
+            filds_name_type=self.get_tables_info(table_name)
+            newtbl=tables(self.dbname,self.path,table_name,filds_name_type,True,self.get_pool())
+            self.log.add('open table','Открыта таблица "{0}" в базе данных "{1}"'.format(table_name,self.dbname),'')
+        else:
+            newtbl=False
+            self.log.add('open table','Таблица "{0}" в базе данных "{1}" не существует'.format(table_name,self.dbname),'')
+        return newtbl
+    #
+    def exists_tables(self,table_name):
+        '''Проверка, существует ли таблица в базе данных
+        table_name - имя таблицы'''
+        #
+        if table_name in self.list_tables():
+            res=True
+        else:
+            res=False
+        return res
+    #
+    def get_tables_info(self,table_name):
+        '''Полная информация о таблице
+        table_name=None - имя таблицы'''
+        #
+        self._check_schema()
+        if table_name not in self.__schema_info:
+            zapros='PRAGMA table_info ({0})'.format(table_name)
+            res=[]
+            [res.append([x[1],x[2]]) for x in self._execute(zapros) or []]
+            self.__schema_info[table_name]=res
+        return [list(x) for x in self.__schema_info[table_name]]
+    #
+    def create_table(self,table_name,fld_type):
+        '''Создание таблицы
+        table_name=None - имя таблицы
+        fld_type Словарь с именами и типами полей таблицы'''
+        #
+        newtbl=False
+        if isinstance(fld_type,dict):#and (not self.exists_tables(table_name))
+            fld=['"{0}" {1}'.format(f,t)  for f,t in fld_type.items()]
+            zapros='CREATE TABLE "{0}"({1})'.format(table_name,','.join(fld))
+            self._execute(zapros)
+            self.invalidate_schema()
+        return self.get_table(table_name)
+        #
+    def delete_table(self,table_name):
+        '''Удаление таблицы
+        table_name=None - имя таблицы'''
+        #
+        res=False
+        if self.exists_tables(table_name):
+            zapros='DROP TABLE "{0}"'.format(table_name)
+            self.error=False
+            self._execute(zapros,())
+            self.invalidate_schema()
+            if not self.error:
+                self.log.add('delete','Удалена таблица: {0}'.format(table_name),zapros)
+                res=True
+        else:
+            self.log.add('delete','Таблица: {0} не существует'.format(table_name),'')
+        return res
+    #
+    def create_index(self,table_name,filds,index_name=None,unique=False):
+        '''Создание индекса
+        table_name - имя таблицы
+        filds - имя поля или список полей
+        index_name=None - имя индекса (по умолчанию idx_<таблица>_<поля>)
+        unique=False - уникальный индекс
+        Возвращает имя индекса или False'''
+        #
+        res=False
+        if self.exists_tables(table_name):
+            res=self._create_index(table_name,filds,index_name,unique)
+            self.invalidate_schema()
+        return res
+    #
+    def drop_index(self,index_name):
+        '''Удаление индекса index_name'''
+        #
+        res=self._drop_index(index_name)
+        self.invalidate_schema()
+        return res
+    #
+    def list_indexes(self,table_name=None):
+        '''Список индексов
+        table_name=None - имя таблицы (по умолчанию индексы всех таблиц)
+        Формат возвращаемых данных: список кортежей [(<имя индекса>,<имя таблицы>),]'''
+        #
+        return self._list_indexes(table_name)
+    #
+    def explain(self,zapros,param=None):
+        '''План выполнения запроса (EXPLAIN QUERY PLAN)
+        Если параметры не заданы, знаки ? заменяются значениями NULL
+        Формат возвращаемых данных: список строк плана'''
+        #
+        if param==None:
+            param=(None,)*zapros.count('?')
+        res=self._execute('EXPLAIN QUERY PLAN '+zapros,param)
+        return [x[-1] for x in res] if res else []
+    #
+    def advise_indexes(self):
+        '''Анализ выполненных запросов (общих для пула соединений)
+        Возвращает список запросов, выполняемых полным просмотром таблицы.
+        Формат возвращаемых данных: список словарей
+            [{'table':<таблица>,'filds':<поля условия>,'count':<число выполнений>,
+              'zapros':<текст запроса>,'plan':<строка плана>},]'''
+        #
+        res=[]
+        pool=self.get_pool()
+        if pool==None:
+            return res
+        #Учитываются только таблицы БД (не SCAN CONSTANT ROW, подзапросы и т.п.)
+        table_names=set(self.list_tables())
+        for zapros,count in list(pool.queries.items()):
+            if not zapros.lstrip().upper().startswith(('SELECT','UPDATE','DELETE')):
+                continue
+            if 'sqlite_master' in zapros:
+                continue
+            if ' WHERE ' not in zapros.upper():
+                continue
+            where=zapros[zapros.upper().rindex(' WHERE ')+7:]
+            filds=re.findall(r'"?([A-Za-z_]\w*)"?\s*(?:=|IN\b|<|>|LIKE\b)',where,re.IGNORECASE)
+            if len(filds)==0:
+                continue
+            for plan in self.explain(zapros):
+                scan=re.match(r'SCAN (?:TABLE )?(\S+)(.*)',plan)
+                if scan and ('USING' not in scan.group(2))and(scan.group(1).strip('"') in table_names):
+                    res.append({'table':scan.group(1).strip('"'),'filds':filds,'count':count,'zapros':zapros,'plan':plan})
+        return res
+#
+#
+#
+class tables(set_info):
+    '''Работа с таблицей из БД'''
+    #
+    def __init__(self,dbname=None,path=None,table_name=None,fldnametype=None,log=True,pool=None):
+        #БД по умолчанию
+        #pool - пул соединений, общий с объектом database
+        set_info.__init__(self,dbname,path,pool)
+        #Начальные значения переменных
+        #Имя текущей таблицы
+        self.__table_name=table_name
+        #
+        self.__fldnametype=fldnametype
+        #
+        self.__fldname=[x[0] for x in self.__fldnametype]
+    #
+    def insert(self,fld_nm_val):
+        '''Вставка в таблицу
+        fld_nm_val-словарь {'param_name': param_value}'''
+        #
+        #Компоновка запроса
+        table_name=self.__table_name
+        #
+        res=False
+        if self.__table_name:
+            fld_nm_val=self._validate_filds_name(fld_nm_val)
+            #
+            if fld_nm_val!=False:
+                param,fld=[],[]
+                for f,v in fld_nm_val.items():
+                    param.append(v)
+                    fld.append(f)
+                param=tuple(param)
+                #
+                zapros='INSERT INTO {0} ({1}) VALUES ({2})'.format(self.__table_name,','.join(fld),','.join(["?"]*len(fld_nm_val)))
+                res=self._execute(zapros,param)
+                res=not self.error
+        return res
+    #
+    def insert_many(self,rows,filds=None,chunk_size=1000):
+        '''Пакетная вставка в таблицу
+        rows - набор записей: словари {'param_name': param_value} или кортежи значений
+        filds=None - список полей для кортежей (по умолчанию все поля таблицы)
+        chunk_size=1000 - количество записей в одной транзакции
+        Возвращает количество вставленных записей'''
+        #
+        return self._write_many('INSERT',rows,filds,chunk_size)
+    #
+    def upsert_many(self,rows,filds=None,chunk_size=1000):
+        '''Пакетная вставка с заменой существующих записей (INSERT OR REPLACE)
+        Параметры аналогичны insert_many'''
+        #
+        return self._write_many('INSERT OR REPLACE',rows,filds,chunk_size)
+    #
+    def _write_many(self,command,rows,filds,chunk_size):
+        '''Запись набора строк порциями через executemany
+        Имена полей проверяются один раз для всего набора'''
+        #
+        res=0
+        if not self.__table_name:
+            return res
+        rows=iter(rows)
+        first=next(rows,None)
+        if first==None:
+            return res
+        #Определение и проверка полей по первой записи
+        if isinstance(first,dict):
+            fld=self._validate_filds_name(list(first.keys()))
+            if fld==False:
+                return res
+            get_param=lambda row:tuple(row.get(f) for f in fld)
+        else:
+            if filds==None:
+                filds=self.__fldname
+            fld=self._validate_filds_name(list(filds))
+            if (fld==False)or(len(first)!=len(filds)):
+                return res
+            ind=[list(filds).index(f) for f in fld]
+            get_param=lambda row:tuple(row[i] for i in ind)
+        #
+        zapros='{0} INTO {1} ({2}) VALUES ({3})'.format(command,self.__table_name,','.join(fld),','.join(["?"]*len(fld)))
+        rows=itertools.chain([first],rows)
+        #Сброс признака ошибки предыдущих запросов
+        self.error=False
+        while True:
+            chunk=[get_param(row) for row in itertools.islice(rows,chunk_size)]
+            if len(chunk)==0:
+                break
+            count=self._execute_many(zapros,chunk)
+            if self.error:
+                break
+            res+=count
+        return res
+    #
+    def select(self,where='1=1',filds='*',params=None):
+        '''Выборка из таблицы
+        where='1=1' - условие (строка или список кортежей (<поле>,<оператор>,<значение>))
+        filds='*' - список полей []
+        params=None - параметры условия (кортеж значений для знаков ?)'''
+        #
+        res=False
+        zapros=''
+        where,params=self._where(where,params)
+        if self.__table_name and where:
+            filds=self._validate_filds_name(filds)
+            if isinstance(filds,list):
+                filds=','.join(filds)
+            elif filds==False:
+                filds='*'
+            #
+            zapros='SELECT {0} FROM {1} WHERE {2}'.format(filds,self.__table_name,where)
+            #
+            res=self._execute(zapros,params)
+        self.log.add('select',res,zapros,self.duration)
+        return res
+    #
+    def iter_select(self,where='1=1',filds='*',batch_size=1000,chunks=False,params=None):
+        '''Потоковая выборка из таблицы (генератор)
+        Записи читаются порциями через fetchmany и не сохраняются в объекте
+        where='1=1' - условие (строка или список кортежей (<поле>,<оператор>,<значение>))
+        filds='*' - список полей []
+        batch_size=1000 - размер порции
+        chunks=False - возвращать записи по одной (False) или порциями (True)
+        params=None - параметры условия'''
+        #
+        where,params=self._where(where,params)
+        if (not self.__table_name)or(self.dbname==None)or(where==False):
+            return
+        filds=self._validate_filds_name(filds)
+        if isinstance(filds,list):
+            filds=','.join(filds)
+        elif filds==False:
+            filds='*'
+        #
+        zapros='SELECT {0} FROM {1} WHERE {2}'.format(filds,self.__table_name,where)
+        pool=self.get_pool()
+        conn=pool.get_connection()
+        with pool.serialized():
+            cursor=conn.cursor()
+            try:
+                cursor.execute(zapros,params)
+            except:
+                cursor.close()
+                cursor=None
+        if cursor==None:
+            self.log.add('iter_select','Некорректный запрос',zapros)
+            self.error=True
+            return
+        pool.served_add(zapros=zapros)
+        self.log.add('iter_select','',zapros)
+        try:
+            while True:
+                #Порция читается под блокировкой, записи выдаются вне ее
+                with pool.serialized():
+                    rows=cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                if chunks:
+                    yield rows
+                else:
+                    for row in rows:
+                        yield row
+        finally:
+            with pool.serialized():
+                cursor.close()
+    #
+    def update(self,fld_nm_val,where,params=None):
+        '''Обновление записи
+        where - условие (строка или список кортежей (<поле>,<оператор>,<значение>))
+        fld_nm_val-словарь {'param_name': param_value}
+        params=None - параметры условия'''
+        #
+        res=False
+        where,params=self._where(where,params)
+        if self.__table_name and where:
+            fld_nm_val=self._validate_filds_name(fld_nm_val)
+            if fld_nm_val!=False:
+                #Компоновка запроса
+                param,fld=[],[]
+                for f,v in fld_nm_val.items():
+                    param.append(v)
+                    fld.append(f+'=?')
+                param=tuple(param)+params
+                fld=','.join(fld)
+                #
+                zapros='UPDATE {0} SET {1} WHERE {2}'.format(self.__table_name,fld,where)
+                #
+                self._execute(zapros,param)
+                res=not self.error
+        return res
+    #
+    def delete(self,where,params=None):
+        '''Удаление записи
+        where - условие (строка или список кортежей (<поле>,<оператор>,<значение>))
+        params=None - параметры условия'''
+        #
+        res=False
+        where,params=self._where(where,params)
+        if self.__table_name and where:
+            zapros='DELETE from {0} WHERE {1}'.format(self.__table_name,where)
+            res=self._execute(zapros,params)
+            #
+        return res
+    #
+    def count(self,where='1=1',params=None):
+        '''Количество записей в текущей таблице
+        where='1=1' - условие (строка или список кортежей (<поле>,<оператор>,<значение>))
+        params=None - параметры условия (кортеж значений для знаков ?)'''
+        #
+        res=self._aggregate('COUNT','*',where,params)
+        return res if res else 0
+    #
+    def exists(self,where='1=1',params=None):
+        '''Проверка наличия записей, удовлетворяющих условию
+        where='1=1' - условие
+        params=None - параметры условия (кортеж значений для знаков ?)'''
+        #
+        where,params=self._where(where,params)
+        if (not self.__table_name)or(where==False):
+            return False
+        zapros='SELECT EXISTS(SELECT 1 FROM {0} WHERE {1})'.format(self.__table_name,where)
+        res=self._execute(zapros,params)
+        return bool(res[0][0]) if res else False
+    #
+    def min(self,fld,where='1=1',params=None):
+        '''Минимальное значение поля fld'''
+        return self._aggregate('MIN',fld,where,params)
+    #
+    def max(self,fld,where='1=1',params=None):
+        '''Максимальное значение поля fld'''
+        return self._aggregate('MAX',fld,where,params)
+    #
+    def sum(self,fld,where='1=1',params=None):
+        '''Сумма значений поля fld'''
+        return self._aggregate('SUM',fld,where,params)
+    #
+    def avg(self,fld,where='1=1',params=None):
+        '''Среднее значение поля fld'''
+        return self._aggregate('AVG',fld,where,params)
+    #
+    def group_by(self,filds,aggregates,where='1=1',params=None):
+        '''Группировка записей с вычислением агрегатных функций в БД
+        filds - список полей группировки []
+        aggregates - список кортежей [(<функция>,<поле>),]
+            функции: 'count','min','max','sum','avg'; для 'count' поле может быть '*'
+        where='1=1' - условие
+        params=None - параметры условия
+        Формат возвращаемых данных: список кортежей
+            [(<значения полей группировки>...,<значения агрегатов>...),]'''
+        #
+        res=False
+        if isinstance(filds,str):
+            filds=[filds]
+        filds=self._validate_filds_name(list(filds))
+        where,params=self._where(where,params)
+        if (not self.__table_name)or(filds==False)or(where==False):
+            return res
+        agr=[]
+        for func,fld in aggregates:
+            agr_fld=self._aggregate_expr(func,fld)
+            if agr_fld==False:
+                return res
+            agr.append(agr_fld)
+        zapros='SELECT {0} FROM {1} WHERE {2} GROUP BY {3}'.format(','.join(filds+agr),self.__table_name,where,','.join(filds))
+        res=self._execute(zapros,params)
+        return res if res else []
+    #
+    def _aggregate_expr(self,func,fld):
+        '''Выражение агрегатной функции func для поля fld
+        Возвращает False для неизвестной функции или поля'''
+        #
+        func=func.upper()
+        if func not in ('COUNT','MIN','MAX','SUM','AVG'):
+            return False
+        if (fld=='*')and(func=='COUNT'):
+            return 'COUNT(*)'
+        if self._validate_filds_name(fld)==False:
+            return False
+        return '{0}("{1}")'.format(func,fld)
+    #
+    def _aggregate(self,func,fld,where='1=1',params=None):
+        '''Вычисление агрегатной функции в БД
+        Возвращает скалярное значение или None'''
+        #
+        agr=self._aggregate_expr(func,fld)
+        where,params=self._where(where,params)
+        if (not self.__table_name)or(agr==False)or(where==False):
+            return None
+        zapros='SELECT {0} FROM {1} WHERE {2}'.format(agr,self.__table_name,where)
+        res=self._execute(zapros,params)
+        return res[0][0] if res else None
+    #
+    def get_name(self):
+        '''Имя таблицы'''
+        #
+        return self.__table_name
+    #
+    def create_index(self,filds,index_name=None,unique=False):
+        '''Создание индекса по полям таблицы
+        filds - имя поля или список полей
+        index_name=None - имя индекса (по умолчанию idx_<таблица>_<поля>)
+        unique=False - уникальный индекс
+        Возвращает имя индекса или False'''
+        #
+        if isinstance(filds,str):
+            filds=[filds]
+        filds=self._validate_filds_name(list(filds))
+        if (not self.__table_name)or(filds==False):
+            return False
+        return self._create_index(self.__table_name,filds,index_name,unique)
+    #
+    def drop_index(self,index_name):
+        '''Удаление индекса index_name'''
+        #
+        return self._drop_index(index_name)
+    #
+    def list_indexes(self):
+        '''Список индексов таблицы
+        Формат возвращаемых данных: список кортежей [(<имя индекса>,<имя таблицы>),]'''
+        #
+        return self._list_indexes(self.__table_name)
+    #
+    def _where(self,where,params=None):
+        '''Условие запроса и его параметры
+        where - строка условия или список кортежей (<поле>,<оператор>,<значение>)
+        params=None - параметры для строки условия
+        Возвращает кортеж (<условие>,<параметры>) или (False,()) при ошибке'''
+        #
+        if isinstance(where,(list,tuple)):
+            conditions=[where] if isinstance(where,tuple) else where
+            filds=[c[0] for c in conditions]
+            #Пустой список условий - все записи ('1=1')
+            if (len(filds)>0)and(self._validate_filds_name(filds)!=filds):
+                return (False,())
+            return to_where(conditions)
+        return (where,tuple(params) if params!=None else ())
+    #
+    def _validate_filds_name(self,filds):
+        '''проверка имени поля
+        filds - словарь {fild_name:fild_value} или список имен полей'''
+        #
+        #если проверяется словарь
+        if isinstance(filds,dict):
+            del_fld=[fld for fld in filds.keys() if not(fld in self.__fldname)]
+            for fld in del_fld:
+                del filds[fld]
+            if len(filds)==0: filds=False
+        #Если проверяется список
+        elif isinstance(filds,list):
+            filds=[fld for fld in filds if fld in self.__fldname]
+            if len(filds)==0: filds=False
+        #если проверяется строка
+        elif isinstance(filds,str):
+            if not(filds in self.__fldname): filds=False
+        else: filds=False
+        #возврат словаря/списка/строки соответствующих полям в таблице
+        return filds
+    #
+    def _validate_filds_value(self,fld_name,fld_value):
+        '''Проверка fld_name записи
+        fld_name - имя поля
+        fld_value - значение'''
+        #
+        if self._validate_filds_name(fld_name)==False:
+            return False
+        return self.exists('"{0}"=?'.format(fld_name),(fld_value,))
+    #
+    def max_fld(self,fld):
+        '''Максимальное значение столбца'''
+        #
+        zapros='SELECT MAX({0}) FROM "{1}"'.format(fld,self.__table_name)
+        res=self._execute(zapros)
+        if not self.error:
+            max_res=res[0][0]
+        else:
+            max_res=False
+        return max_res
+    #
+    #
+    #
+def main():
+    info()
+if __name__ == '__main__':
+    main()
+    #
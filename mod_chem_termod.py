@@ -1,1662 +1,3073 @@
-# -*- coding: utf-8 -*-
-#-------------------------------------------------------------------------------
-# Name:         CHEMCAD TERMOD термодинамические расчеты
-# Purpose:      Компоненты для термодинамических расчетов
-#               связанных с веществом, реакцией и системой из нескольких веществ.
-#               Содержит классы subst, reaktion, chem_system, chem_table, chem_parametr, temperature, area, volume, pressure.
-#
-# Author:       Цымай Дмитрий
-#
-# Created:      24.06.2013
-# Copyright:    (c) Цымай Дмитрий 2013
-# Licence:      LGPL
-#-------------------------------------------------------------------------------
-#!/usr/bin/env python
-#
-import string
-import os
-import db_sqlite_py as db
-import sys
-import numpy as np
-#
-R_constant=8.31
-#Число знаков после запятой для округления
-round_digit=3
-#список фазовых состояний
-lst_phase=['g','k','l','s']
-
-class subst(object):
-    '''Класс subst предназначен для выполнения расчетов связанных с химическим
-    веществом, идентифицируемом по формуле
-    содержит методы определения элементного состава,
-    расчета молекулярной массы
-    расчета термодинамических характеристик'''
-    #
-    def __init__(self,formula,phase,newparametr,newtable):
-        '''Химическое вещество
-        formula - Формула (строка)
-        phase - Фазовое состояние (строка "g","k","l","s")
-        newparametr - Словарь, содержащий ссылки на параметры состояния
-        newdatabase - Словарь, содержащий ссылки на таблицы базы данных'''
-        #
-        #Список полей базы данных, используемой в расчетах
-        self.__lst_filds=["subst","dt1","dt2","dh298","da","db","dc","dd","ds298","uat0","m_coeff","n_coeff","dhh298","dhfp","z_coeff","phase"]
-        #Установка параметров БД
-        self.set_database(newtable)
-        #Получение названий полей
-        self.get_fld_name()
-        #
-        #Список фазовых состояний
-        self.__lst_phase=lst_phase
-        #Фазовое состояние
-        self.set_phase(phase)
-        #Формула
-        self.__formula=formula
-        #Получение информации о веществе
-        self.get_termod_info()
-        #Установка параметров
-        self.__parametr={}
-        self.set_parametr(newparametr)
-        #Получение элементной матрицы
-        self.__treematrix=to_substmatrix(self.__formula,2)
-        self.__substmatrix=to_substmatrix(self.__formula)
-        #Свойства
-        #Коэффициент (по умолчанию 1)
-        self.st_koeff=1
-        #Мольная доля (по умолчанию 1)
-        self.moll_konz=1
-        #Количество вещества
-        self.moll=0
-        #Масса вещества
-        self.massa=0
-    #
-    def set_database(self,dict_tbl):
-        '''Метод устанавливает  ссылки на таблицы
-        с термодинамической информацией и проверяет их структуру
-        dict_tbl - Словарь, содержащий ссылки на таблицы
-        Формат словаря:
-        {'term-base':<tables>,'term-name-fld':<tables>,'term-ellingem':<tables>,
-        'term-ellingem-name':<tables>}
-        Значения словаря по умолчанию: None'''
-        #
-        self.DataTable={}.fromkeys(['term-base','term-name-fld','term-ellingem''term-ellingem-name'])
-        if isinstance(dict_tbl,dict):
-            new_dict_tbl={k:v for k,v in dict_tbl.items() if isinstance(v,db.tables)}
-            self.DataTable={k:v for k,v in new_dict_tbl.items() if k in self.DataTable}
-            #
-    #
-    def set_parametr(self,dict_param=None):
-        '''Метод устанавливает значения параметров состояния
-        Если они не заданы, то устанавливает стандартные значения
-        dict_param - Словарь, ключами которого являются наименования параметров,
-         а значениями соответствующие объекты'''
-        #
-        self.__parametr['temperature']=temperature(298)
-        self.__parametr['pressure']=pressure(100000)
-        #
-        if isinstance(dict_param,dict):
-            if 'temperature' in dict_param:
-                if isinstance(dict_param['temperature'],temperature):
-                    self.__parametr['temperature']=dict_param['temperature']
-                    self.__parametr['temperature'].set_units('K')
-            if 'pressure' in dict_param:
-                if isinstance(dict_param['pressure'],pressure):
-                    self.__parametr['pressure']=dict_param['pressure']
-    #
-    def get_parametr(self):
-        '''Метод возвращает словарь с установленными параметрами системы'''
-        #
-        return self.__parametr
-    #
-    def get_subst_db_names(self):
-        '''Метод возвращает список веществ имеющихся в базе данных
-        Формат возвращаемых данных: список'''
-        #
-        subst_db_names=set()
-        subst_db_names.update([x[0] for x in self.DataTable['term-base'].select('1=1','subst')])
-        return subst_db_names
-    #
-    def is_valid_subst(self):
-        '''Метод проверяет наличие вещества, заданного формулой в базе данных
-        Возвращает логическое значение True или False'''
-        if self.__formula in self.get_subst_db_names():
-            return True
-        else:
-            return False
-    #
-    def get_termod_info(self):
-        '''Метод запрашивает информацию о веществе из базы данных
-        Выполняется проверка наличия информации о веществе в базе данных
-        Формат возвращаемых данных: список словарей'''
-        #
-        if self.is_valid_subst():
-            res=self.DataTable['term-base'].select('subst="{0}"'.format(self.__formula),self.__lst_filds)
-            self.__subst_termod_data=[{k:v for k,v in zip(self.__lst_filds,t_res)} for t_res in res]
-        else: self.__subst_termod_data=False
-        return self.__subst_termod_data
-    #
-    def get_fld_name(self):
-        '''Метод запрашивает названия полей, хранимых в базе данных (основная таблица таблица термодинамических свойств)
-        Формат возвращаемых данных: словарь {<имя поля в таблице>:<полное название поля>}'''
-        #
-        if self.DataTable['term-name-fld']:
-            fld_nm=self.DataTable['term-name-fld'].select(filds=['fld_name','fld_full_name'])
-        else:
-            fld_nm=[[x,x] for x in self.__lst_filds]
-        #
-        self.__lst_filds_name={x[0]:x[1] for x in fld_nm}
-        return self.__lst_filds_name
-    #
-    def get_subst_matrix(self):
-        '''Метод возвращает матрицу элементного состава вещества
-        Формат возвращаемых данных: словарь {<символ элемента>:<индекс>}'''
-        #
-        return self.__substmatrix
-    #
-    def print_subst_info(self):
-        '''Метод выводит на печать информации о веществе'''
-        #
-        out=[]
-        if self.__subst_termod_data:
-            out.append('Табличные данные о веществе {0} '.format(self.__formula))
-            i=0
-            for subst_t_info in self.__subst_termod_data:
-                out.append('Температурный интервал: от {0} \t до {1} К '.format(subst_t_info['dt1'],subst_t_info['dt2']))
-                out.append('Основные параметры ')
-                if i==0:
-                    out.append('{0}: \t {1}'.format(self.__lst_filds_name['dh298'],subst_t_info['dh298']))
-                    out.append('{0}: \t {1}'.format(self.__lst_filds_name['ds298'],subst_t_info['ds298']))
-                    out.append('{0}: \t {1}'.format(self.__lst_filds_name['dhh298'],subst_t_info['dhh298']))
-                    out.append('{0}: \t {1}'.format(self.__lst_filds_name['uat0'],subst_t_info['uat0']))
-                out.append('{0}: \t {1} '.format(self.__lst_filds_name['dhfp'],subst_t_info['dhfp']))
-                out.append('{0}: \t {1} '.format(self.__lst_filds_name['phase'],subst_t_info['phase']))
-                if i==0:
-                    out.append('Структура')
-                    out.append('{0}: \t {1} '.format(self.__lst_filds_name['m_coeff'],subst_t_info['m_coeff']))
-                    out.append('{0}: \t {1} '.format(self.__lst_filds_name['n_coeff'],subst_t_info['n_coeff']))
-                    out.append('{0}: \t {1} '.format(self.__lst_filds_name['z_coeff'],subst_t_info['z_coeff']))
-                    #
-                out.append('теплоемкость (коэффициенты полинома)')
-                out.append('{0}: \t {1} '.format(self.__lst_filds_name['da'],subst_t_info['da']))
-                out.append('{0}: \t {1} '.format(self.__lst_filds_name['db'],subst_t_info['db']))
-                out.append('{0}: \t {1} '.format(self.__lst_filds_name['dc'],subst_t_info['dc']))
-                out.append('{0}: \t {1} '.format(self.__lst_filds_name['dd'],subst_t_info['dd']))
-                i+=1
-        else:
-            out.append('Вещество {0} отсутствует в базе данных'.format(self.__formula))
-        print('\n'.join(out))
-    #
-    def Cp_t(self):
-        '''Метод возвращает поправку для теплоемкости вещества в зависимости от изменения температуры
-        Формат возвращаемых данных: массив вещественных чисел'''
-        #
-        global round_digit
-        temperatur=self.__parametr['temperature'].get_value()
-        res=np.zeros(self.__parametr['temperature'].get_size())
-        #цикл по температурным интервалам
-        if self.__subst_termod_data:
-            #
-            j=0
-            for t in temperatur:
-                #Проверка значения > нижней границы первого температурного интервала
-                if t<=self.__subst_termod_data[0]["dt1"]: t=self.__subst_termod_data[0]["dt1"]
-                #
-                res_t=0
-                for subst_t_data in self.__subst_termod_data:
-                    if t>=subst_t_data["dt2"]:
-                        #Расчет теплоемкости
-                        #Для предшествующих температурных интервалов
-                        res_t+=subst_t_data["da"]
-                        res_t+=subst_t_data["db"]*subst_t_data["dt2"]/1000.0
-                        res_t+=subst_t_data["dc"]*(subst_t_data["dt2"]**2)/1000000.0
-                        res_t-=subst_t_data["dd"]*(subst_t_data["dt2"]**(-2))*100000.0
-                    elif (t<subst_t_data["dt2"])and(t>=subst_t_data["dt1"]):
-                        #Расчет для данной температуры в данном интервале
-                        #
-                        res_t+=subst_t_data["da"]
-                        res_t+=subst_t_data["db"]*t/1000.0
-                        res_t+=subst_t_data["dc"]*(t**2)/1000000.0
-                        res_t-=subst_t_data["dd"]*(t**(-2))*100000.0
-                #Запись результата для данной температуры в массив
-                res[j]=res_t
-                j+=1
-        #пересчет из Дж в кДж
-        return np.around(res*self.st_koeff/1000.0,round_digit)
-    #
-    def delta_Int_S_Cp_t(self):
-        '''Метод возвращает поправку для теплоемкости вещества в зависимости от изменения температуры
-        Формат возвращаемых данных: массив вещественных чисел'''
-        #
-        global round_digit
-        temperatur=self.__parametr['temperature'].get_value()
-        res=np.zeros(self.__parametr['temperature'].get_size())
-        #цикл по температурным интервалам
-        if self.__subst_termod_data:
-            #
-            j=0
-            for t in temperatur:
-                #Проверка значения > нижней границы первого температурного интервала
-                if t<=self.__subst_termod_data[0]["dt1"]: t=self.__subst_termod_data[0]["dt1"]
-                #
-                res_t=0
-                for subst_t_data in self.__subst_termod_data:
-                    if t>=subst_t_data["dt2"]:
-                        #Расчет поправки
-                        #Для предшествующих температурных интервалов
-                        res_t+=subst_t_data["da"]*np.log(subst_t_data["dt2"]/subst_t_data["dt1"])
-                        res_t+=subst_t_data["db"]*(subst_t_data["dt2"]-subst_t_data["dt1"])/1000.0
-                        res_t+=subst_t_data["dc"]*(subst_t_data["dt2"]**2-subst_t_data["dt1"]**2)/2000000.0
-                        res_t-=subst_t_data["dd"]*(subst_t_data["dt2"]**(-2)-subst_t_data["dt1"]**(-2))*100000.0/3
-                        res_t+=subst_t_data["dhfp"]*1000.0/subst_t_data["dt2"]
-                    elif (t<subst_t_data["dt2"])and(t>=subst_t_data["dt1"]):
-                        #Расчет для данной температуры в данном интервале
-                        #
-                        res_t+=subst_t_data["da"]*np.log(t/subst_t_data["dt1"])
-                        res_t+=subst_t_data["db"]*(t-subst_t_data["dt1"])/1000.0
-                        res_t+=subst_t_data["dc"]*(t**2-subst_t_data["dt1"]**2)/2000000.0
-                        res_t-=subst_t_data["dd"]*(t**(-2)-subst_t_data["dt1"]**(-2))*100000.0/3
-                #Запись результата для данной температуры в массив
-                res[j]=res_t
-                j+=1
-        #пересчет из Дж в кДж
-        return np.around(res*self.st_koeff/1000.0,round_digit)
-    #
-    def delta_Int_Cp_t(self,fp=False):
-        '''Метод возвращает поправку для теплоемкости вещества в зависимости от изменения температуры
-        Формат возвращаемых данных: массив вещественных чисел
-        Параметры:
-        fp=False учитывать/не учитывать фазовые переходы (True/False)'''
-        #
-        global round_digit
-        temperatur=self.__parametr['temperature'].get_value()
-        res=np.zeros(self.__parametr['temperature'].get_size())
-        #цикл по температурным интервалам
-        if self.__subst_termod_data:
-            #
-            j=0
-            for t in temperatur:
-                #Проверка значения > нижней границы первого температурного интервала
-                if t<=self.__subst_termod_data[0]["dt1"]: t=self.__subst_termod_data[0]["dt1"]
-                #
-                res_t=0
-                for subst_t_data in self.__subst_termod_data:
-                    if t>=subst_t_data["dt2"]:
-                        #Расчет поправки
-                        #Для предшествующих температурных интервалов
-                        res_t+=subst_t_data["da"]*(subst_t_data["dt2"]-subst_t_data["dt1"])
-                        res_t+=subst_t_data["db"]*(subst_t_data["dt2"]**2-subst_t_data["dt1"]**2)/2000.0
-                        res_t+=subst_t_data["dc"]*(subst_t_data["dt2"]**3-subst_t_data["dt1"]**3)/3000000.0
-                        res_t-=subst_t_data["dd"]*(subst_t_data["dt2"]**(-1)-subst_t_data["dt1"]**(-1))*100000.0
-                        if fp!=True:
-                            res_t+=subst_t_data["dhfp"]*1000.0
-                    elif (t<subst_t_data["dt2"])and(t>=subst_t_data["dt1"]):
-                        #Расчет для данной температуры в данном интервале
-                        #
-                        res_t+=subst_t_data["da"]*(t-subst_t_data["dt1"])
-                        res_t+=subst_t_data["db"]*(t**2-subst_t_data["dt1"]**2)/2000.0
-                        res_t+=subst_t_data["dc"]*(t**3-subst_t_data["dt1"]**3)/3000000.0
-                        res_t-=subst_t_data["dd"]*(t**(-1)-subst_t_data["dt1"]**(-1))*100000.0
-                #Запись результата для данной температуры в массив
-                res[j]=res_t
-                j+=1
-        #пересчет из Дж в кДж
-        return np.around(res*self.st_koeff/1000.0,round_digit)
-    #
-    def entalp(self):
-        '''Энтальпия образования вещества при заданной температуре
-        Формат возвращаемых данных: массив вещественных чисел'''
-        #
-        global round_digit
-        temperatur=self.__parametr['temperature'].get_value()
-        res=np.zeros(self.__parametr['temperature'].get_size())
-        #
-        if self.__subst_termod_data:
-            res+=self.__subst_termod_data[0]["dh298"]+self.delta_Int_Cp_t()
-        return np.around(res*self.st_koeff,round_digit)
-    #
-    def entrop(self):
-        '''Энтропия образования вещества при заданной температуре
-        Формат возвращаемых данных: массив вещественных чисел'''
-        #
-        global round_digit
-        temperatur=self.__parametr['temperature'].get_value()
-        #
-        res=np.zeros(self.__parametr['temperature'].get_size())
-        if self.__subst_termod_data:
-            res+=self.__subst_termod_data[0]["ds298"]/1000+self.delta_Int_S_Cp_t()
-        return np.around(res*self.st_koeff,round_digit)
-    #
-    def gibbs(self):
-        '''Энергия Гиббса образования вещества при заданной температуре
-        Формат возвращаемых данных: массив вещественных чисел'''
-        #
-        global round_digit
-        temperatur=self.__parametr['temperature'].get_value()
-        #
-        res=np.zeros(self.__parametr['temperature'].get_size())
-        if self.__subst_termod_data:
-            res+=self.entalp()-temperatur*self.entrop()
-        return np.around(res*self.st_koeff,round_digit)
-    #
-    def gelmgolz(self):
-        '''Энергия Гельмгольца образования вещества при заданной температуре
-        Формат возвращаемых данных: массив вещественных чисел'''
-        #
-        global round_digit
-        global R_constant
-        temperatur=self.__parametr['temperature'].get_value()
-        res=np.zeros(self.__parametr['temperature'].get_size())
-        res+=self.gibbs()
-        #
-        if self.__phase=='g':
-            res+=R_constant*temperatur*self.moll
-        return np.around(res,round_digit)
-    #
-    def u_atomize(self,coord):
-        '''Энергия атомизации вещества
-        Формат возвращаемых данных: массив вещественных чисел
-        coord - параметр, определяющий:
-        расчитывать энергию, приходящуюся на одну связь (coord=True)
-        или полную энергию (coord=False)'''
-        #
-        global round_digit
-        global R_constant
-        #
-        temperatur=self.__parametr['temperature'].get_value()
-        res=np.zeros(self.__parametr['temperature'].get_size())
-        #
-        if self.__subst_termod_data:
-            res+=self.__subst_termod_data[0]["uat0"]
-            res-=temperatur*(3*(self.__subst_termod_data[0]["m_coeff"]*2+self.__subst_termod_data[0]["n_coeff"])/2)*R_constant/1000.0
-            res-=self.delta_Int_Cp_t(True)
-            res=res/self.__subst_termod_data[0]["m_coeff"]
-            if coord==True:
-                res=res/self.__subst_termod_data[0]["z_coeff"]
-        #
-        return np.around(res,round_digit)
-    #
-    def chem_potential(self):
-        '''Расчет химического потенциала вещества
-        Формат возвращаемых данных: массив вещественных чисел'''
-        #
-        global round_digit
-        global R_constant
-        #
-        temperatur=self.__parametr['temperature'].get_value()
-        res=np.zeros(self.__parametr['temperature'].get_size())
-        #
-        res+=self.gibbs()+R_constant*temperatur*np.log(self.moll_konz)
-        return np.around(res,round_digit)
-    #
-    def set_phase(self,newphase):
-        '''Устанавливает фазовое состояние вещества
-        newphase - Новое фазовое состояние (строка 'g','k','l','s')'''
-        #
-        if newphase in self.__lst_phase:
-            self.__phase=newphase
-        else:
-            self.__phase=self.__lst_phase[0]
-        return self.__phase
-    #
-    def get_phase(self):
-        '''Возвращает фазовое состояние'''
-        #
-        return self.__phase
-    #
-    def formula(self,prn_format='html'):
-        '''Возвращает html представление формулы вещества
-        prn_format - параметр, определяющий представление фомулы ('html', 'txt', 'tex')'''
-        #
-        return to_formula(self.__formula,prn_format)
-    #
-    def ellingem(self):
-        pass
-    #
-#
-#
-class reaktion(object):
-    '''Класс предназначен для расчетов связанных с химической реакцией
-    идентифицируемой по стехиометрической матрице
-    содержит методы выполнения стехиометрических расчетов,
-    уравнивания коэффициентов, расчета термодинамических характеристик
-    для химической реакции'''
-    #
-    def __init__(self,subst_koeff_phase,newparametr,newtable):
-        '''Определение химической реакции
-        Параметры:
-            subst_koeff_phase список, элементами которого являются кортежи:
-            [(формула вещества, стехеометрический коэффициент, фаза), ]
-            newtemperatur - интервал температур (объект класса temperature)
-            newparametr - Словарь, содержащий ссылки на параметры состояния
-            newdatable - Словарь, содержащий ссылки на таблицы базы данных'''
-        #Параметры,определяющие правильность задания реакции
-        #Существование веществ в базе данных
-        self.__validsubst={}
-        #правильность уравнивания коэффициентов
-        self.__validkoeff=True
-        #Список веществ (объектов subst)
-        self.__subst_list=[]
-        #Стехеометрическая матрица Словарь вида {<формула вещества>:<стехеометрический коэффициент>}
-        self.__subst_matrix={}
-        #Множество элементов
-        self.elems=set()
-        #Множество формул
-        self.forms=set()
-        #Определение веществ
-        for els in subst_koeff_phase:
-            subst_name,koeff,phase=els
-            n_subst=subst(subst_name,phase,newparametr,newtable)
-            if n_subst.is_valid_subst():
-                n_subst.st_koeff=koeff
-                self.__subst_list.append(n_subst)
-                self.elems.update(n_subst.get_subst_matrix().keys())
-                self.forms.add(n_subst.formula('txt'))
-                self.__validsubst[n_subst.formula('txt')]=True
-            else:
-                self.__validsubst[n_subst.formula('txt')]=False
-        #
-        self.koeff_calc()
-        #
-        if len(self.__subst_list)>0:
-            #Подключение таблиц БД
-            self.DataTable=self.__subst_list[0].DataTable
-            #Установка параметров системы
-            self.__parametr=self.__subst_list[0].get_parametr()
-            #
-            #Кинетические параметры
-            self.__energy=0 #Энергия активации
-            self.__factor=1 #Предэкспоненциальный множитель
-            self.__ordnung={}
-            self.set_ordnung() #Частные кинетические порядки реакции
-    #
-    def validate(self):
-        '''Проверка правильности задания параметров реакции'''
-        #
-        for frm,val in self.__validsubst.values():
-            if val==True:
-                print('Вещество {0} присутствует в базе даных')
-            else:
-                print('Вещество {0} отсутствует в базе даных')
-        #
-        if self.__validkoeff:
-            print('Коэффициенты реакции уравнены')
-        else:
-            print('Коэффициенты реакции не уравнены')
-    #
-    def is_valid(self):
-        '''Метод возвращает True, усли все вещества
-        указанные в реакции заданы правильно
-        и она правильно уравнена.'''
-        #
-        if (self.__validkoeff==True)and(False not in self.__validsubst.values()):
-            return True
-        else:
-            return False
-    #
-    def set_parametr(self,dict_param=None):
-        '''Изменяет параметры для всех веществ системы.
-        Параметры:
-            dict_param - Словарь, ключами которого являются наименования параметров,
-            а значениями соответствующие объекты'''
-        #
-        for sbs in self.__subst_list:
-            sbs.set_parametr(dict_param)
-    #
-    def get_matrix(self):
-        '''Метод для определения значения стехеометрической матрицы реакции'''
-        #
-        return self.__subst_matrix
-    #
-    def entalp(self):
-        '''Расчет энтальпии реакции при заданной температуре'''
-        #
-        return sum([sbs.entalp() for sbs in self.__subst_list])
-    #
-    def entrop(self):
-        '''Расчет энтропии реакции при заданной температуре'''
-        #
-        return sum([sbs.entrop() for sbs in self.__subst_list])
-    #
-    def gibbs(self):
-        '''Расчет энергии Гиббса реакции при заданной температуре'''
-        #
-        return sum([sbs.gibbs() for sbs in self.__subst_list])
-    #
-    def gelmgolz(self):
-        '''Расчет энергии Гельмгольца реакции при заданной температуре'''
-        #
-        return sum([sbs.gelmgolz() for sbs in self.__subst_list])
-    #
-    def const_p(self):
-        '''Расчет константы равновесия реакции при заданной температуре'''
-        #
-        global round_digit
-        global R_constant
-        #
-        temperatur=self.__parametr['temperature'].get_value()
-        res=np.exp(-self.gibbs()*1000/temperatur/R_constant)
-        return np.around(res,round_digit)
-    #
-    def log_const_p(self):
-        '''Расчет натурального логарифма константы равновесия реакции при заданной температуре'''
-        #
-        global round_digit
-        global R_constant
-        temperatur=self.__parametr['temperature'].get_value()
-        #
-        res=-self.gibbs()*1000/temperatur/R_constant
-        return np.around(res,round_digit)
-    #
-    def temperatur_nr(self):
-        '''Расчет температуры начала реакции
-        возвращаемое значение: строка'''
-        #
-        global round_digit
-        old_parametr=self.__parametr.copy()
-        #
-        self.set_parametr()
-        ent298=self.entalp()[0]
-        entr298=self.entrop()[0]
-        tnr=np.around(ent298/entr298,round_digit)
-        self.set_parametr(old_parametr)
-        #
-        res=None
-        #
-        if (ent298>0)and(entr298<0):
-            res='реакция не может протекать при температуре T>0 K'
-        elif (ent298<0)and(entr298>0):
-            res='реакция всегда может протекать при температуре T>0 K'
-        elif (ent298<0)and(entr298<0):
-            res='T<{0} K'.format(tnr)
-        elif (ent298>0)and(entr298>0):
-            res='T>{0} K'.format(tnr)
-        return res
-    #
-    def print_info(self):
-        '''печать основной информации о реакции'''
-        #
-        str_right=[]
-        str_left=[]
-        for sbs in self.__subst_list:
-            str_koeff=''
-            if sbs.st_koeff>0:
-                if sbs.st_koeff!=1:
-                    str_koeff=str(sbs.st_koeff)
-                str_right.append(str_koeff+sbs.formula('txt')+'('+sbs.get_phase()+')')
-            else:
-                if sbs.st_koeff!=-1:
-                    str_koeff=str(-sbs.st_koeff)
-                str_left.append(str_koeff+sbs.formula('txt')+'('+sbs.get_phase()+')')
-        #
-        Q=-self.entalp()[0]
-        return '{0} = {1}+{2} кДж ({3})'.format('+'.join(str_left),'+'.join(str_right),Q,self.temperatur_nr())
-    #
-    def set_reagents(self,form_moll):
-        '''Метод устанавливает значения количеств реагентов
-        form_moll - Словарь, ключами которого являются формулы веществ,
-         а значениями их количества, моль
-         {<формула вещества>:<количество вещества, моль>, }'''
-        #
-        if isinstance(form_moll,dict):
-            for sbs in self.__subst_list:
-                formula=sbs.formula('txt')
-                if formula in form_moll:
-                    sbs.moll=form_moll[formula]
-    #
-    def get_reagents(self):
-        '''Метод возвращает количество вещества реагентов, моль'''
-        #
-        return {sbs.formula('txt'):sbs.moll for sbs in self.__subst_list}
-    #
-    def degree_max(self):
-        '''Метод возвращает максимальное значение степени полноты'''
-        #
-        return min([-sbs.moll/sbs.st_koeff for sbs in self.__subst_list if sbs.st_koeff<0])
-    #
-    def degree(self,x):
-        '''Метод пересчитывает количества вещества реагентов на величину x
-        x - степень полноты реакции'''
-        #
-        max_x=self.degree_max()
-        re_x=x if x<max_x else max_x
-        for sbs in self.__subst_list:
-            sbs.moll+=sbs.st_koeff*x
-        return self.get_reagents()
-    #
-    def __mul__(self,num):
-        '''Умножение реакции на коэфициент
-        num - Число, на которое умножаются коэффициенты реакции'''
-        #
-        if (isinstance(num,int) or isinstance(num,float))and(num!=0):
-            for sbs in self.__subst_list:
-                sbs.st_koeff*=num
-                self.__subst_matrix[sbs.formula('txt')]=sbs.st_koeff
-        elif num==0:
-            print('error num is non zero')
-        return self
-    #
-    def set_koeff(self,frm_koeff):
-        '''Метод устанавливает значения стехеометрических коэффициентов
-        для всех веществ, входящих в реакцию.
-        Параметры:
-            frm_koeff - Словарь, ключами которого являются формулы, а значениями коэффициенты
-            {<Формула>:<Стехеометрический коэффициент>}'''
-        #
-        if isinstance(frm_koeff,dict):
-            for sbs in self.__subst_list:
-                frm=sbs.formula('txt')
-                sbs.st_koeff=frm_koeff[frm] if frm in frm_koeff.keys() else 1
-                self.__subst_matrix[frm]=frm_koeff[frm]
-    #
-    def koeff_calc(self):
-        '''Расчет стехеометрических коэффициентов реакции
-        Возвращает стехеометрическую матрицу реакции
-        словарь вида:
-            {<формула вещества>:<стехеометрический коэффициент>,}'''
-        #
-        k_matr=[]
-        for sbs in self.__subst_list:
-            el_matr=sbs.get_subst_matrix()
-            el_matr.update({el:0 for el in self.elems if el not in el_matr})
-            k_matr.append([el_matr[el] for el in self.elems])
-        #
-        eq_count=len(self.elems)
-        sbs_count=len(self.__subst_list)
-        eq=min(eq_count,sbs_count)
-        b_matrix=np.zeros((eq,1))
-        #
-        a_matrix=np.array([[row[i] for row in k_matr[:eq]] for i in range(eq_count)])
-        if eq<sbs_count:
-            b_matrix=np.array([[row] for row in k_matr[-1][:eq_count]])
-        else:
-            b_matrix=np.zeros((eq,1))
-        #
-        koeff=np.linalg.solve(a_matrix,b_matrix)
-        if eq<sbs_count:
-            koeff=np.append(koeff,1)
-        #
-        frm_koeff={self.__subst_list[i].formula('txt'):koeff[i]*np.sign(self.__subst_list[i].st_koeff) for i in range(sbs_count)}
-        self.set_koeff(frm_koeff)
-        #
-        return self.__subst_matrix
-    #
-    def rate(self,energy):
-        pass
-    #
-    def kinetik_koeff(self,factor=None,energy=None,log=False):
-        '''Метод расчитывает кинетический коэффициент реакции по уравнению Аррениуса.
-        Параметры метода:
-            energy - энергия активации
-            factor - предэкспоненциальный множитель
-            log - формат вывода
-                log=True логарифм константы
-                log=False константа'''
-        #
-        if energy!=None:
-            self.__energy=np.float(energy)
-        if factor!=None:
-            self.__factor=np.float(factor)
-        #
-        if log==True:
-            res=np.log(self.__factor)-self.__energy/(R_constant*self.__parametr['temperature'].get_value())
-        else:
-            res=self.__factor*np.exp(-self.__energy/(R_constant*self.__parametr['temperature'].get_value()))
-        return res
-    #
-    def parametr_kinetik(self,kin_konst,temp):
-        '''Метод возвращает параметры кинетической константы:
-            предэкспоненциальный множитель и энергию активацииив виде кортежа:
-                (<предэкспоненциальный множитель>,<энергия активации>).
-                Расчет выполняется по уравнению Аррениуса
-        Пераметры метода:
-            kin_konst - кортеж из двух кинетических констант, при различных температурах <float>
-            temp - кортеж из двух значений температуры <float>'''
-        #
-        energy,factor=0,0
-        if (isinstance(kin_konst,tuple))and(isinstance(temp,tuple)):
-            if (len(kin_konst)==2)and(len(temp)==2):
-                self.__energy=(R_constant*temp[0]*temp[1]/(temp[0]-temp[1]))*np.log(kin_konst[0]/kin_konst[1])
-                self.__factor=np.exp((temp[0]*np.log(kin_konst[0])-temp[1]*np.log(kin_konst[1]))/(temp[0]-temp[1]))
-            else:
-                print('Необходимы кортежи из двух элементов')
-        #
-        return (self.__factor,self.__energy)
-    #
-    def zdm(self,course='reversible',prn_format='html',variable='[]',ph='g'):
-        '''Метод, возвращающий выражение закона действующих масс для реакции
-        Возвращаемое выражение: строка в формате tex или html.
-        Параметры метода:
-            course - направление реакции.
-            Принимает значения:
-                course='forward' прямая
-                course='reverse' обратная
-                course='reversible' обратимая
-            prn_format='html' - Формат выводимых данных.
-            Принимает значения:
-                prn_format='tex' tex
-                prn_format='html' html
-            variable='[]' - тип переменных для вывода.
-            Принимает значения:
-                variable='[]' молярные концентрации (старая запись)
-                variable='x' мольные доли
-                variable='p' парциальные давления
-                variable='C' молярные концентрации (новая запись)
-            ph='g' - основная фаза. Принимает значения: 'g','k','l','s'.
-            (по обозначениям фаз)'''
-        #
-        mtr={sbs.formula('txt'):sbs.st_koeff for sbs in self.__subst_list if sbs.get_phase()==ph}
-        #
-        s_v,s_vb,s_ve='','[',']'
-        #
-        if prn_format=='html':
-            s_u,s_b,s_e,s_kb,s_ke='','<sup>','</sup>','<sub>','</sub>'
-            #
-            if variable!='[]':
-                s_v,s_vb,s_ve=str(variable),'<sub>','</sub>'
-        elif prn_format=='tex':
-            s_u,s_b,s_e,s_kb,s_ke='\cdot ','^{','}','_{','}'
-            #
-            if variable!='[]':
-                s_v,s_vb,s_ve=str(variable),'_{','}'
-        #
-        res=''
-        res1='k{0}+{1}'.format(s_kb,s_ke)+s_u.join(['{4}{5}{0}{6}{1}{2}{3}'.format(to_formula(frm,prn_format),s_b,-ind,s_e,s_v,s_vb,s_ve) for frm,ind in mtr.items() if ind<0])
-        res2='k{0}-{1}'.format(s_kb,s_ke)+s_u.join(['{4}{5}{0}{6}{1}{2}{3}'.format(to_formula(frm,prn_format),s_b,ind,s_e,s_v,s_vb,s_ve) for frm,ind in mtr.items() if ind>0])
-        if course=='forward':
-            res='v={0}'.format(res1)
-        elif course=='reverse':
-            res='v={0}'.format(res2)
-        elif course=='reversible':
-            res='v={0}-{1}'.format(res1,res2)
-        return res
-    #
-    def zdm_eval(self,val_degree=0,course='reversible',variable='x',ph='g',par=1):
-        '''Метод вычисляет значение скорости по закону действующих масс
-        при заданной величине степени полноты рекции val_degree.
-        По умолчанию val_degree=0.
-        Предварительно должна быть расчитана кинетическая константа при помощи
-        одного из методов kinetik_koeff() или parametr_kinetik().
-        По умолчанию кинетическая константа равна 1.
-        Параметры метода:
-            course - направление реакции.
-            Принимает значения:
-                course='forward' прямая
-                course='reverse' обратная
-                course='reversible' обратимая
-            variable='x' - тип переменных для вывода.
-            Принимает значения:
-                variable='x' мольные доли
-                variable='p' парциальные давления
-                (должен быть задан параметр давления)
-                variable='C' молярные концентрации
-                (должен быть задан параметр объема)
-            ph='g' - основная фаза. Принимает значения: 'g','k','l','s'.
-            (по обозначениям фаз)
-            par=1 - Дополнительный параметр
-            (давление или объем в зависимости от значения параметра variable)'''
-        #
-        k_kin1=self.kinetik_koeff()
-        k_kin2=1#k_kin1/self.const_p()
-        #
-        moll=self.degree(val_degree)
-        ordn=self.get_ordnung()
-        moll_s=np.sum([x for x in moll.values()])
-        #
-        if moll_s>0:
-            lst_frm1=[sbs.formula('txt') for sbs in self.__subst_list if (sbs.st_koeff<0)and(sbs.get_phase()==ph)]
-            lst_frm2=[sbs.formula('txt') for sbs in self.__subst_list if (sbs.st_koeff>0)and(sbs.get_phase()==ph)]
-            #
-            res1=k_kin1*np.prod([(moll[frm]/moll_s)**np.abs(ordn[frm]) for frm in lst_frm1])
-            res2=k_kin2*np.prod([(moll[frm]/moll_s)**np.abs(ordn[frm]) for frm in lst_frm2])
-            #
-            ordn_s1=np.sum([ordn[frm] for frm in lst_frm1])
-            ordn_s2=np.sum([ordn[frm] for frm in lst_frm2])
-            #
-            if course=='forward':
-                res=res1
-            elif course=='reverse':
-                res=res2
-            elif course=='reversible':
-                res=res1-res2
-            else:
-                res=res1
-            #
-            if (variable=='p')and(ph=='g'):
-                res1=res1*(par**ordn_s1)
-                res2=res2*(par**ordn_s2)
-            elif (variable=='C')and((ph=='s')or(ph=='l')or(ph=='g')):
-                res1=res1/((R_constant*self.__parametr['temperature'].get_value())**ordn_s1)
-                res2=res2/((R_constant*self.__parametr['temperature'].get_value())**ordn_s2)
-            elif (variable=='x')and((ph=='s')or(ph=='l')or(ph=='g')):
-                res1=res1/(par**ordn_s1)
-                res2=res2/(par**ordn_s2)
-        else:
-            res=0
-        return res
-    #
-    def set_ordnung(self,frm_val=None):
-        '''Метод устанавливает значения частных порядков реакции по реагентам.
-        Параметры метода:
-            frm_val=None - Порядки реакции.
-            Словарь вида: {<формула вещества>:<порядок реакции по веществу>}
-            Если значение не задано, то частные порядки реакции по веществам
-            определяются стехиометрическими коэффициентами.
-            Если концентрация данного вещества не определяет скорость реакции,
-            задайте значение порядка по веществу равным 0.'''
-        #
-        if isinstance(frm_val,dict):
-            frm_val1={k:v for k,v in frm_val.items() if (isinstance(v,int)or isinstance(v,float))}
-            for sbs in self.__subst_list:
-                frm=sbs.formula('txt')
-                if frm in frm_val1:
-                    self.__ordnung[frm]=frm_val1[frm]
-                else:
-                    self.__ordnung[frm]=sbs.st_koeff
-        else:
-            self.__ordnung={sbs.formula('txt'):sbs.st_koeff for sbs in self.__subst_list}
-    #
-    def get_ordnung(self):
-        '''Метод возвращает порядки реакции в формате словаря:
-            {<формула вещества>:<порядок реакции по веществу>}
-        '''
-        #
-        return self.__ordnung
-    #
-    def rawn_calc(self,params):
-        '''Расчет равновесной степени полноты реакции при заданной температуре'''
-        pass
-#
-#
-class chem_system(object):
-    '''Класс chem_system
-    Предназначен для выполнения расчетов связанных с химической системой,
-    в которой протекают химические реакции и в которую входят химические вещества
-    Содержит методы выполнения расчетов связанных с системой'''
-    #
-    def __init__(self,name,subst_moll_phase,newtemperatur):
-        '''subst_moll_phase состав системы
-        список кортежей вида
-        [(<Название вещества>,<Содержание вещества в молях>,<фазовое состояние вещества>),...]'''
-        #
-        self.__name=name
-        #Список веществ
-        self.__subst_list=[]
-        #Температура
-        self.set_temperatur(newtemperatur)
-        #Инертный компонент в системе
-        self.__inerts=0.0
-        #Определяем состав системы
-        for els in subst_moll_phase:
-            subst_name=els[0]
-            moll=els[1]
-            phase=els[2]
-            #Добавляем новое вещество
-            self.add_subst(subst_name,moll,phase)
-        #
-        #
-        #reakts стехеометрические матрицы реакций входящих в состав системы
-        #список словарей вида: [{<Название вещества>:<Стехеометрический коэффициент вещества>,...},...]
-    #
-    def get_info(self):
-        form_subst=map(lambda sb:sb.formula,self.__subst_list)
-        return [self.__name,form_subst]
-    def set_temperatur(self,value):
-        if isinstance(value,temperature):
-            self.__temperatur=value
-        else:
-            self.__temperatur=temperature(298)
-        #Устанавливаем температуру для всех веществ
-        for sbs in self.__subst_list:
-            sbs.set_temperatur(self.__temperatur)
-    #
-    def is_valid_system(self):
-        #Метод для проверки параметров системы
-        #Проверяет наличие в базе данных информации о веществах
-        #входящих в состав системы
-        #
-        #Проверка равенства суммы мольных долей компонентов системы 100%
-        res=True
-        res_sum=0.0
-        for sbs in self.__subst_list:
-            if not sbs.is_valid_subst():
-                res=False
-            res_sum+=sbs.moll_konz
-        res_sum=round(res_sum,2)
-        if res_sum==1.0 and res==True:
-            return True
-        else:
-            return False
-    #
-    def add_subst(self,formula,moll,phase):
-        #Метод добавляет новое вещество в систему
-        #formula - Формула нового вещества
-        #
-        #Возвращает True или False
-        #
-        n_subst=subst(formula,phase,self.__temperatur)
-        if n_subst.is_valid_subst()and(moll>0):
-            n_subst.moll=moll
-            #Добавляем
-            self.__subst_list.append(n_subst)
-            #Пересчитываем состав
-            self.get_sostav()
-            #
-            return True
-        #
-        else:
-            return False
-    #
-    def change_all(self,delta_moll):
-        #Метод изменяет количество инертного вещества в системе
-        #delta_moll - изменение количества вещества в молях
-        #units - единицы измерения
-        if(delta_moll+self.__inerts>0):
-            self.__inerts+=delta_moll
-        #
-        self.get_sostav()
-    #
-    def change_subst(self,formula,moll):
-        #Метод изменяет количество вещества в системе
-        #formula - Формула вещества
-        #
-        #Возвращает True или False
-        #
-        try:
-            my_num=map(lambda sbs:sbs.formula,self.__subst_list).index(formula)
-        except:
-            my_num=False
-        #
-        if(my_num!=False)and(moll>0):
-            self.__subst_list[my_num].moll=moll
-            #Пересчитываем состав
-            self.get_sostav()
-            #
-            return True
-        else:
-            return False
-    #
-    def del_subst(self,formula):
-        #Удаляет выбранное вещество из системы, если оно в ней присутствует
-        #
-        # formula - формула удаляемого вещества
-        #
-        try:
-            del_num=map(lambda sbs:sbs.formula,self.__subst_list).index(formula)
-        except:
-            del_num=False
-        #при наличии вещества в системе удаляем
-        if del_num:
-            del self.__subst_list[del_num]
-            #Пересчитываем состав
-            self.get_sostav()
-            #
-            return True
-        #
-        else:
-            return False
-    #
-    def get_sostav(self):
-        #Метод для определения состава системы
-        #Суммарное количество вещества
-        self.__all_moll=np.sum(map(lambda sbs:sbs.moll,self.__subst_list))+self.__inerts
-        #
-        for sbs in self.__subst_list:
-            sbs.moll_konz=sbs.moll*100/self.__all_moll
-    #
-    def u_midl_atomize(self):
-        #Средняя энергия атомизации системы
-        # при температуре temperatur
-        #
-        global round_digit
-        #
-        res=np.zeros(self.__temperatur.get_size())
-        #
-        for sbs in self.__subst_list:
-            res+=sbs.u_atomize(True)*sbs.moll_konz/100
-        return np.around(res,round_digit)
-    #
-    def Kn(self):
-        #Коэффициент прочности системы
-        #
-        global round_digit
-        #
-        temp=subst('SiO2','k',self.__temperatur)
-        temp.set_temperatur(self.__temperatur)
-        return np.around(self.u_midl_atomize()/temp.u_atomize(True),round_digit)
-    #
-    def entalp(self):
-        #Метод определяет энтальпию системы
-        global round_digit
-        #
-        res=np.zeros(self.__temperatur.get_size())
-        #
-        for sbs in self.__subst_list:
-            res+=sbs.entalp()*sbs.moll
-        return np.around(res,round_digit)
-    #
-    def entrop(self):
-        #Метод определяет энтропию системы
-        global round_digit
-        #
-        res=np.zeros(self.__temperatur.get_size())
-        #
-        for sbs in self.__subst_list:
-            res+=sbs.entrop()*sbs.moll
-        return np.around(res,round_digit)
-    #
-    def gibbs(self):
-        #Метод определяет энергию Гиббса системы
-        global round_digit
-        #
-        res=np.zeros(self.__temperatur.get_size())
-        #
-        for sbs in self.__subst_list:
-            res+=sbs.chem_potential()*sbs.moll
-        return np.around(res,round_digit)
-    #
-    def print_system_info(self,units='prozent'):
-        #Выводит информацию о составе системы
-        #Результат вывода - словарь {<формула вещества>:<количество вещества (в абсолютных или относительных единицах)>}
-        #
-        global round_digit
-        res={}
-        if units=='moll':
-            for sbs in self.__subst_list:
-                res[sbs.formula]=round(sbs.moll,round_digit)
-            res['inerts']=round(self.__inerts,round_digit)
-            res['itogo']=round(self.__all_moll,round_digit)
-            res['units']='moll'
-        elif units=='prozent':
-            for sbs in self.__subst_list:
-                res[sbs.formula]=round(sbs.moll_konz,round_digit)
-            res['inerts']=round(self.__inerts*100/self.__all_moll,round_digit)
-            res['itogo']=100
-            res['units']='%'
-        #
-        return res
-#
-class chemstring(object):
-    '''Класс объединяет методы обработки и синтаксического анализа строк
-     для последующего применения при создании химических объектов'''
-    #
-    def __init__(self):
-        print('f')
-
-#
-class chem_table(object):
-    def __init__(self,tbl=None):
-        '''Метод создает объект таблицы
-        '''
-        #
-        self.__fldname={}
-        self.__filds=[]
-        self.set_database(tbl)
-    #
-    def set_database(self,dict_tbl=None):
-        '''Метод устанавливает  ссылки на таблицы
-        с информацией об элементах и проверяет их структуру
-        Параметры:
-            dict_tbl - Словарь, содержащий ссылки на таблицы
-            Формат словаря: {'mend-table':<tables>}
-        Значения словаря по умолчанию: None'''
-        #
-        self.DataTable={}.fromkeys(['mend-table'])
-        if isinstance(dict_tbl,dict):
-            new_dict_tbl={k:v for k,v in dict_tbl.items() if isinstance(v,db.tables)}
-            self.DataTable={k:v for k,v in new_dict_tbl.items() if k in self.DataTable}
-            #
-            self.__fldname['num']='номер'
-            self.__fldname['name']='Название'
-            self.__fldname['smb']='Символ'
-            self.__fldname['latname']='Латинское название'
-            self.__fldname['period']='Период'
-            self.__fldname['grp']='Группа'
-            self.__fldname['mass']='Атомная масса(г/моль)'
-            self.__fldname['ro']='Плотность,г/см (при 20 град C)'
-            self.__fldname['tpl']='Температура плавления ( град C)'
-            self.__fldname['tkip']='Температура кипения (град C)'
-            self.__fldname['year']='Год открытия'
-            self.__fldname['fml']='Первооткрыватель'
-            self.__fldname['name1']='Произношение'
-            self.__fldname['coment']='Коментарий'
-            #
-            self.__filds=list(self.__fldname.keys())
-            #
-    #
-    def get_elementlist(self):
-        '''Метод возвращает множество символов элементов'''
-        return {x[0] for x in self.DataTable['mend-table'].select('1=1','smb')}
-    #
-    def get_numlist(self):
-        '''Метод возвращает множество номеров элементов'''
-        return {x[0] for x in self.DataTable['mend-table'].select('1=1','num')}
-    #
-    def iselement(self,smb):
-        '''Возвращает True, если значение smb соответствует химическому элементу.
-        Параметры:
-            smb - символ (номер) элемента'''
-        #
-        return True if(smb in self.get_elementlist())or(smb in self.get_numlist()) else False
-    #
-    def get_attrinfo(self):
-        '''Метод возвращает словарь атрибутов элемента
-        Формат возвращаемых данных:
-            {<поле>:<имя атрибута>,}'''
-        #
-        return self.__fldname
-    #
-    def get_fldlist(self):
-        '''Метод возвращает список полей таблицы свойств элементов'''
-        #
-        return self.__filds
-    #
-    def get_period(self,period):
-        '''Возвращает список элементов периода.
-        Параметры:
-            period - номер периода'''
-        #
-        res=self.DataTable['mend-table'].select('period={0}'.format(period),['num','smb'])
-        if res:
-            res=[x[1] for x in sorted(res,key=lambda x: x[0])]
-        else:
-            res=None
-        return  res
-    #
-    def get_group(self,grp):
-        '''Метод возвращает список элементов группы.
-        Параметры:
-            grp - номер группы'''
-        #
-        res=self.DataTable['mend-table'].select('grp={0}'.format(grp),['num','smb'])
-        if res:
-            res=[x[1] for x in sorted(res,key=lambda x: x[0])]
-        return  res
-    #
-    def get_attrvalue(self,elem=None,attr=None):
-        '''Метод возвращает значение атрибута элемента.
-         Параметры:
-            elem - символ (номер) элемента
-            attr - аттрибут
-            Список значений:
-                num - номер
-                name - Название
-                smb - Символ
-                latname - Латинское название
-                period - Период
-                grp - Группа
-                mass - Атомная масса(г/моль)
-                ro - Плотность,г/см (при 20 град C)
-                tpl - Температура плавления ( град C)
-                tkip - Температура кипения (град C)
-                year - Год открытия
-                fml - Первооткрыватель
-                name1 - Произношение
-                coment - Коментарий
-        '''
-        #
-        if((attr in self.__filds)and(self.iselement(elem))):
-            fld='smb' if isinstance(elem,str) else 'num'
-            q=self.DataTable['mend-table'].select('{0}="{1}"'.format(fld,elem),[attr])
-            res=q[0][0]
-        else:
-            res=None
-        return res
-    #
-    def get_element(self,elem,lstattr='*'):
-        '''Метод позволяет получить информацию об элементе
-         по его символу или номеру. Возвращает словарь вида:
-            {<атрибут>:<значение>,}
-         Параметры:
-            elem - символ (номер) элемента
-            lstattr - аттрибуты, которые необходимы (по умолчанию выдаются все)
-            Список атрибутов:
-                num - номер
-                name - Название
-                smb - Символ
-                latname - Латинское название
-                period - Период
-                grp - Группа
-                mass - Атомная масса(г/моль)
-                ro - Плотность,г/см (при 20 град C)
-                tpl - Температура плавления ( град C)
-                tkip - Температура кипения (град C)
-                year - Год открытия
-                fml - Первооткрыватель
-                name1 - Произношение
-                coment - Коментарий
-            '''
-        #
-        if isinstance(lstattr,list):
-            lst=[attr for attr in lstattr if attr in self.__filds]
-            if len(lst)==0:
-                lst=self.__filds
-        else:
-            lst=self.__filds
-        #
-        if self.iselement(elem):
-            fld='smb' if isinstance(elem,str) else 'num'
-            q=self.DataTable['mend-table'].select('{0}="{1}"'.format(fld,elem),lst)
-            res={self.__fldname[k]:v for k,v in zip(lst,q[0])}
-        else:
-            res=None
-        return res
-    #
-    def get_table(self):
-        '''Метод возвращает структуру таблицы Менделеева.
-        Список списков вида:
-            [[{элемент 1},...<элементы 1-го периода>],
-             [{элемент 1},...<элементы 2-го периода>],
-            ...
-             [{элемент 1},...<элементы 7-го периода>]]
-        '''
-        #
-        res=[]
-        p=1
-        period=self.get_period(p)
-        while period!=None:
-            res.append(period)
-            p+=1
-            period=self.get_period(p)
-        return res
-    #
-    def get_attrtable(self,attr):
-        '''Метод возвращает таблицу одного из свойств для всех веществ.
-        Список списков вида:
-            {<элемент>:<значение свойства>,}
-        Параметры:
-            attr - свойства, которые необходимы (по умолчанию выдаются все)
-            Список атрибутов:
-                mass - Атомная масса(г/моль)
-                ro - Плотность,г/см (при 20 град C)
-                tpl - Температура плавления ( град C)
-                tkip - Температура кипения (град C)
-        '''
-        if attr in self.__filds:
-             res={x[0]:x[1] for x in self.DataTable['mend-table'].select('1=1',['smb',attr])}
-        else:
-            res={}
-        return res
-    #
-
-    def molar_mass(self,el_matrix):
-        '''Метод возвращает молярную массу комбинации элементов.
-        Параметры:
-            el_matrix - элементная матрица. Словарь вида:
-                {<Символ элемента>:<индекс>, }
-        '''
-        #
-        if isinstance(el_matrix,dict):
-            lst=1
-            new_matrix={k:v for k,v in el_matrix.items() if((self.iselement(k))and((isinstance(v,int))or(isinstance(v,float))))}
-        if len(new_matrix)>0:
-            res=np.sum([self.get_attrvalue(k,'mass')*v for k,v in new_matrix.items()])
-        return res
-    #
-    def molar_volume(self,elem):
-        '''Метод возвращает молярный объем элемннта
-        Параметры:
-            elem - символ или номер элемента'''
-        #
-        res=None
-        if self.iselement(elem):
-            ro,mass=self.get_attrvalue(elem,'ro'),self.get_attrvalue(elem,'mass')
-            if(ro>0)and(ro!=None):
-                res=mass/ro
-        return res
-    #
-#
-#
-#
-class chem_parametr(object):
-    '''Класс хранит информацию связанную с параметром
-    (температура, давление, объем, площадь)
-    В самом общем случае объект класса представляет интервал значений
-     с заданными единицами измерения'''
-    #
-    def __init__(self,name,units,value=None,standart_value=None):
-        self.__name=name
-        self.__units=units
-        self.__lstunits=[]
-        self.__standartvalue=standart_value
-        self.set_value(value)
-    #
-    def get_value(self):
-        '''Набор значений параметра'''
-        #
-        return self.__value
-    #
-    def get_name(self):
-        '''Название параметра'''
-        #
-        return self.__name
-    #
-    def set_lstunits(self,newlist):
-        '''Метод устанавливает список значений параметра'''
-        #
-        if isinstance(newlist,list):
-            self.__lstunits=newlist
-    #
-    def get_lstunits(self):
-        '''Метод возвращает список значений параметра'''
-        #
-        return self.__lstunits
-    #
-    def get_units(self):
-        '''Единица измерения'''
-        #
-        return self.__units
-    #
-    def set_units(self,newunits):
-        '''Установить новую единицу измерения'''
-        #
-        old=self.get_units()
-        if (old!=newunits)and(newunits in self.get_lstunits()):
-            self.__units=newunits
-    #
-    def get_parametr(self):
-        '''Основные характеристики области определения параметра'''
-        #
-        return {'min':self.__minvalue,'max':self.__maxvalue,'step':self.__stepvalue,'standart_value':self.__standartvalue}
-    #
-    def set_value(self,value):
-        '''Установка значения параметра'''
-        #
-        if isinstance(value,list):
-            self.__minvalue=value[0]
-            self.__maxvalue=value[1]
-            self.__stepvalue=value[2]
-            self.__value=np.arange(self.__minvalue,self.__maxvalue,self.__stepvalue,float)
-        elif(isinstance(value,int))or(isinstance(value,float)):
-            self.__minvalue=value
-            self.__maxvalue=value
-            self.__stepvalue=0
-            self.__value=np.array([value],float)
-        elif isinstance(value,np.ndarray):
-            self.__stepvalue=1
-            self.__value=np.array(value,float)
-            self.__minvalue=np.min(self.__value)
-            self.__maxvalue=np.max(self.__value)
-        else:
-            self.__minvalue=0
-            self.__maxvalue=0
-            self.__stepvalue=0
-            self.__value=np.zeros(1)
-    #
-    def get_info(self):
-        '''Общая информация о параметре'''
-        #
-        return {'name':self.__name,'units':self.__units,'value':self.__value,'standart_value':self.__standartvalue}
-    #
-    def get_size(self):
-        '''Количество значений в интервале'''
-        #
-        return np.size(self.__value)
-    #
-    def add_value(self,add=0):
-        '''Добавить к значениям параметра число'''
-        #
-        self.__value+=add
-        self.__standartvalue+=add
-        self.__minvalue=self.__value[0]
-        self.__maxvalue=self.__value[-1]
-
-        self.__stepvalue=(self.__maxvalue-self.__minvalue)/(np.size(self.__value)-1)
-        return self.__value
-    #
-    def mul_value(self,mul):
-        '''Умножить значение на одно число'''
-        #
-        self.__value=self.__value*mul
-        self.__standartvalue*=mul
-        self.__minvalue=self.__value[0]
-        self.__maxvalue=self.__value[-1]
-        self.__stepvalue=(self.__maxvalue-self.__minvalue)/(np.size(self.__value)-1)
-    #
-#,temperature, pressure, volume, area
-class temperature(chem_parametr):
-    '''Параметр температура'''
-    #
-    def __init__(self,value):
-        chem_parametr.__init__(self,'temperatur','K',value,298)
-        self.set_lstunits(['K','C','F'])
-    def set_units(self,newunits):
-        '''Установить единицу измерения newunits
-        Значения:
-            'K' - Кельвин
-            'C' - градус Цельсия
-            'F' - градус Фаренгейта'''
-        #
-        old=self.get_units()
-        #
-        if(old=='K')and(newunits=='C'):
-            self.add_value(-273)
-        elif(old=='C')and(newunits=='K'):
-            self.add_value(273)
-        if(old=='C')and(newunits=='F'):
-            self.mul_value(9/5)
-            self.add_value(32)
-        elif(old=='F')and(newunits=='C'):
-            self.add_value(-32)
-            self.mul_value(5/9)
-        super().set_units(newunits)
-    #
-#
-#
-#
-class pressure(chem_parametr):
-    '''Параметр давление'''
-    #
-    def __init__(self,value):
-        chem_parametr.__init__(self,'pressure','Pa',value,100000)
-        self.set_lstunits(['Pa','bar','at'])
-    #
-    def set_units(self,newunits):
-        '''Установить единицу измерения newunits
-        Значения:
-            'Pa' - Паскаль
-            'bar' - Бар
-            'at' - атмосфера'''
-        #
-        old=self.get_units()
-        #
-        if(old=='Pa')and(newunits=='bar'):
-            self.mul_value(0.00001)
-        elif(old=='bar')and(newunits=='Pa'):
-            self.mul_value(100000)
-        if(old=='Pa')and(newunits=='at'):
-            self.mul_value(1/101325)
-        elif(old=='at')and(newunits=='Pa'):
-            self.mul_value(101325)
-        super().set_units(newunits)
-    #
-#
-#
-#
-class volume(chem_parametr):
-    '''Объем'''
-    #
-    def __init__(self,value):
-        chem_parametr.__init__(self,'volume','m3',value,1)
-    #
-#
-#
-class area(chem_parametr):
-    '''Площадь'''
-    #
-    def __init__(self,value):
-        chem_parametr.__init__(self,'area','m2',value,1)
-    #
-#
-#Функции
-#
-def getsumbols(frm):
-    '''Функция позволяет получить список символов для матрицы элементов
-    frm - строка формула вещества'''
-    #
-    result=[]
-    uk={'root':result,'this':result,'history':[result]}
-    #
-    grpur=0
-    grpind=0
-    #
-    for s in frm:
-        if s.isupper():
-            if len(uk['history'])-grpur+1>2:
-                uk['history'].pop(-1)
-                uk['this']=uk['history'][-1]
-            uk['this'].append([])
-            uk['this']=uk['this'][-1]
-            uk['history'].append(uk['this'])
-            uk['this'].append(s)
-        elif s.islower():
-            uk['this'].append(s)
-        elif s.isdigit():
-            uk['this'].append(s)
-        elif(s=='(')or(s=='['):
-            if len(uk['history'])>1:
-                uk['history'].pop(-1)
-                uk['this']=uk['history'][-1]
-            uk['this'].append([])
-            uk['this']=uk['this'][-1]
-            uk['history'].append(uk['this'])
-            grpur+=1
-        elif(s==')')or(s==']'):
-            uk['history'].pop(-1)
-            uk['this']=uk['history'][-1]
-            grpur-=1
-    #
-    if(grpur!=0):
-        msg_error={'error':True,'typeerror':'syntaxis'}
-    return result
-#
-def gettreematrix(lstsumbols):
-    '''Метод позволяет получить структурированную элементную матрицу для вещества
-    lstsumbols - список симвлов, подготовленный функцией getsumbols(frm)'''
-    #
-    result=[]
-    str_el=''
-    str_ind=''
-    for el in lstsumbols:
-        if isinstance(el,list):
-            result.append(gettreematrix(el))
-        elif isinstance(el,str):
-            if el.isalpha():
-                str_el+=el
-            elif el.isdigit():
-                str_ind+=el
-    if str_ind=='':
-        str_ind=1
-    else:
-        str_ind=int(str_ind)
-    if str_el=='':
-        result.append(str_ind)
-    else:
-        result.extend([str_el,str_ind])
-    return result
-#
-def getsimplifymatrix(lstfrm):
-    '''Функция для получения упрощенной элементной матрицы
-    lstfrm - древовидная матрица, подготовленная функцией gettreematrix()'''
-    #
-    result={}
-    if isinstance(lstfrm[0],list):
-        add=map(lambda els:getsimplifymatrix(els[0:-1]+[els[-1]*lstfrm[-1]]),lstfrm[0:-1])
-        for frm in add:
-            for k,v in frm.items():
-                if k in result:
-                    result[k]+=v
-                else:
-                    result[k]=v
-
-    elif isinstance(lstfrm[0],str):
-        result={lstfrm[0]:lstfrm[-1]}
-    return result
-#
-def to_substmatrix(frm,tp=1):
-    '''Функция для получения элементной матрицы вещества
-    возвращает словарь {<элемент>:<индекс>}
-    frm - формула вещества
-    tp - тип матрицы
-        tp=1 - упрощенная
-        tp=2 - древовидная'''
-    #
-    if tp==1:
-        return getsimplifymatrix(gettreematrix(getsumbols(frm)))
-    else:
-        return gettreematrix(getsumbols(frm))
-#
-def to_formula(frm,prn_format='html'):
-    '''Возвращает html представление формулы вещества
-    frm - строка формулы вещества ('Fe2O3','Fe2(SO4)3',...)
-    prn_format - параметр, определяющий представление фомулы ('html', 'tex', 'txt')'''
-    #
-    if prn_format=='txt':
-        res=frm.strip()
-    else:
-        if prn_format=='html':
-            sep_begin='<sub>'
-            sep_end='</sub>'
-        elif prn_format=='tex':
-            sep_begin='_{'
-            sep_end='}'
-        #
-        sumbols=list(frm+' ')
-        res=''
-        i_begin=0
-        i_end=len(sumbols)-1
-        for i in range(i_begin,i_end):
-            s1=sumbols[i]
-            s2=sumbols[i+1]
-            if (not s1.isdigit())and(s2.isdigit()):
-                res+=s1+sep_begin
-            elif(s1.isdigit())and(not s2.isdigit()):
-                res+=s1+sep_end
-            else:
-                res+=s1
-    return res
-#
-def to_stmatrix(name=None,tp=1):
-    '''Функция, преобразующая строку с описанием реакции в стехеометрическую матрицу
-    name - строка - представление реакции
-    tp - параметр, определяющий тип выводимой матрицы
-        tp=1 список кортежей [(<коэффициент>,<формула>,<фаза>),]
-        tp=2 - словарь {<формула>:<коэффициент>,}'''
-    #
-    res=[]
-    if isinstance(name,str):
-        if name.count('=')==1:
-            clear_name=name.replace(',','.').replace(' ','').split('=')
-            left_subst,right_subst=(s.split('+') for s in clear_name)
-            lst_subst=['-'+s for s in left_subst]+right_subst
-            for frm in lst_subst:
-                k=0
-                while(frm[k] not in string.ascii_uppercase):
-                    k+=1
-                if(frm[:k]=='-'):
-                    koeff=-1
-                elif(frm[:k]==''):
-                    koeff=1
-                else:
-                    koeff=float(frm[:k])
-                #
-                p=-1
-                if frm[p]==')':
-                    while(frm[p]!='('):
-                        p-=1
-                    phase=frm[p:].replace('(','').replace(')','')
-                else:
-                    phase=None
-                    p=len(frm)
-                #
-                formula=frm[k:p]
-                res.append((koeff,formula,phase))
-            #
-            if tp==2:
-                res={el[1]:el[0] for el in res}
-
-    return res
-#
-def main():
-    print('Модуль термодинамических расчетов. Версия 1.0')
-if __name__ == '__main__':
-    main()
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:         CHEMCAD TERMOD термодинамические расчеты
+# Purpose:      Компоненты для термодинамических расчетов
+#               связанных с веществом, реакцией и системой из нескольких веществ.
+#               Содержит классы subst, reaktion, chem_system, chem_table, chem_parametr, temperature, area, volume, pressure.
+#
+# Author:       Цымай Дмитрий
+#
+# Created:      24.06.2013
+# Copyright:    (c) Цымай Дмитрий 2013
+# Licence:      LGPL
+#-------------------------------------------------------------------------------
+#!/usr/bin/env python
+#
+import string
+import os
+import db_sqlite_py as db
+import sys
+import functools
+import fractions
+import math
+import contextvars
+import warnings
+import numpy as np
+#
+R_constant=8.31
+#Число знаков после запятой для округления
+round_digit=3
+#Расчет с полной точностью (без промежуточного округления) - значение по умолчанию для процесса
+full_precision=False
+#Режим полной точности, установленный calc_context (свой для каждого потока и контекста asyncio;
+#None - используется full_precision)
+var_full_precision=contextvars.ContextVar('full_precision',default=None)
+#список фазовых состояний
+lst_phase=['g','k','l','s']
+#Список полей основной таблицы термодинамических свойств (term-base)
+lst_termod_filds=["subst","dt1","dt2","dh298","da","db","dc","dd","ds298","uat0","m_coeff","n_coeff","dhh298","dhfp","z_coeff","phase"]
+#Хранилища термодинамических данных {(<файл БД>,<таблица>):<termod_store>}
+dict_stores={}
+#Индексы названий веществ {(<файл БД>,<таблица>):<subst_index>}
+dict_subst_index={}
+#Наибольшее число значений в одном условии IN (...) запроса к БД
+#(ограничение SQLite на число параметров запроса, SQLITE_MAX_VARIABLE_NUMBER=999 в старых версиях)
+in_chunk_size=500
+#Рекомендуемые индексы таблиц базы данных {<таблица>:[[<поля индекса>],]}
+dict_indexes={'term-base':[['subst']],
+              'term-name-fld':[['fld_name']],
+              'mend-table':[['smb'],['num'],['period'],['grp']]}
+#Параметры минимизации энергии Гиббса (gibbs_min); количества - в долях суммы количеств элементов
+#Количество элемента, при котором элемент считается отсутствующим
+gibbs_absent=1e-14
+#Начальное количество каждого газа
+gibbs_start=1e-8
+#Нижняя граница количества вещества
+gibbs_floor=1e-300
+#Граница следовых количеств (выделение основных веществ, следовые конденсированные фазы,
+#исчезновение газовой фазы, правило фаз, начальное количество появившейся фазы)
+gibbs_trace=1e-6
+#Граница основных газов (изменяются в линейном масштабе)
+gibbs_major=1e-10
+#Доля шага до обращения количества основного газа в 0
+gibbs_damping=0.99
+#Наибольшее увеличение логарифма количества основного газа за итерацию
+gibbs_max_ln_step=2.0
+#Наибольшее изменение логарифма следового количества за итерацию
+gibbs_max_log=50.0
+#Наименьшее допустимое увеличение логарифма количества следового газа за итерацию
+gibbs_min_up=2.0
+#Изменение логарифма мольной доли следового газа, при котором шаг ускоряется
+gibbs_accel_trigger=-0.5
+#Множитель и наибольшее значение ускорения шага следовых газов
+gibbs_accel_factor=2.0
+gibbs_accel_max=1024.0
+#Относительное изменение количества газа (u), при котором газовая фаза исчезает
+gibbs_gas_off=-0.5
+#Точность условия равновесия mu=A.T*pi для газов
+gibbs_mu_tol=1e-8
+
+def subst_cache(*attrs):
+    '''Декоратор кэширования результатов расчета свойств вещества (методов класса subst)
+    Ключ кэша: имя метода, аргументы, значения атрибутов attrs вещества.
+    Кэш вещества сбрасывается при изменении параметров состояния (объект и версия
+    температуры и давления), стехиометрического коэффициента, фазы, данных о веществе
+    и таблиц БД (set_database).
+    Возвращаются копии кэшированных массивов (их изменение не затрагивает кэш).'''
+    #
+    def wrap(func):
+        name=func.__name__
+        @functools.wraps(func)
+        def cached(self,*args,**kwargs):
+            key=(name,args,tuple(sorted(kwargs.items())))+tuple(getattr(self,a) for a in attrs)
+            return self._cached(key,func,args,kwargs)
+        return cached
+    return wrap
+#
+def get_full_precision():
+    '''Функция возвращает действующий режим полной точности:
+    установленный calc_context в текущем потоке (контексте) или full_precision'''
+    #
+    global full_precision
+    value=var_full_precision.get()
+    return full_precision if value==None else value
+#
+def to_round(value):
+    '''Округление результата расчета до round_digit знаков после запятой.
+    В режиме полной точности (full_precision=True) значение возвращается без изменений
+    (без округления и создания нового массива)'''
+    #
+    global round_digit
+    if get_full_precision():
+        return value
+    return np.around(value,round_digit)
+#
+class calc_context(object):
+    '''Контекст расчета: режим полной точности
+    with calc_context(): - расчеты внутри блока выполняются без промежуточного округления;
+    округление выполняется только при выводе (print_info, print_system_info).
+    Режим действует только в текущем потоке (контексте asyncio) и не влияет на другие потоки.
+    Результаты, рассчитанные в разных режимах, кэшируются раздельно'''
+    #
+    def __init__(self,full_precision=True):
+        '''full_precision=True - режим полной точности внутри блока'''
+        #
+        self.full_precision=full_precision
+        self.__tokens=[]
+    #
+    def __enter__(self):
+        self.__tokens.append(var_full_precision.set(self.full_precision))
+        return self
+    #
+    def __exit__(self,exc_type,exc_value,traceback):
+        var_full_precision.reset(self.__tokens.pop())
+        return False
+#
+class subst(object):
+    '''Класс subst предназначен для выполнения расчетов связанных с химическим
+    веществом, идентифицируемом по формуле
+    содержит методы определения элементного состава,
+    расчета молекулярной массы
+    расчета термодинамических характеристик'''
+    #
+    def __init__(self,formula,phase,newparametr,newtable,termod_data=None,fld_name=None,matrix=None,lazy=False):
+        '''Химическое вещество
+        formula - Формула (строка)
+        phase - Фазовое состояние (строка "g","k","l","s")
+        newparametr - Словарь, содержащий ссылки на параметры состояния
+        newdatabase - Словарь, содержащий ссылки на таблицы базы данных
+        Заранее полученные данные (используются методом from_many):
+        termod_data=None - данные о веществе в формате get_termod_info
+        fld_name=None - названия полей в формате get_fld_name
+        matrix=None - кортеж (<древовидная матрица>,<упрощенная матрица>)
+        lazy=False - отложенное создание: данные о веществе, названия полей
+        и элементные матрицы получаются при первом обращении к ним'''
+        #
+        #Список полей базы данных, используемой в расчетах
+        self.__lst_filds=lst_termod_filds
+        #Коэффициенты температурных интервалов (массивы, см. _intervals)
+        self.__intervals=None
+        #Кэш рассчитанных свойств
+        self.__cache={}
+        self.__cache_state=None
+        self.cache_hits=0
+        self.cache_misses=0
+        #Установка параметров БД
+        self.set_database(newtable)
+        #Получение названий полей
+        self.__lst_filds_name=fld_name
+        if (fld_name==None)and(not lazy):
+            self.get_fld_name()
+        #
+        #Список фазовых состояний
+        self.__lst_phase=lst_phase
+        #Фазовое состояние
+        self.set_phase(phase)
+        #Формула
+        self.__formula=formula
+        #Получение информации о веществе
+        self.__subst_termod_data=termod_data
+        if (termod_data==None)and(not lazy):
+            self.get_termod_info()
+        #Установка параметров
+        self.__parametr={}
+        self.set_parametr(newparametr)
+        #Получение элементной матрицы
+        self.__treematrix,self.__substmatrix=None,None
+        if matrix!=None:
+            self.__treematrix=matrix[0]
+            self.__substmatrix=dict(matrix[1])
+        elif not lazy:
+            self._load_matrix()
+        #Свойства
+        #Коэффициент (по умолчанию 1)
+        self.st_koeff=1
+        #Мольная доля (по умолчанию 1)
+        self.moll_konz=1
+        #Количество вещества
+        self.moll=0
+        #Масса вещества
+        self.massa=0
+    #
+    @classmethod
+    def from_many(cls,formula_phase,newparametr,newtable):
+        '''Создание набора веществ с получением данных общими запросами к БД
+        formula_phase - список кортежей [(<формула>,<фазовое состояние>),]
+        newparametr - Словарь, содержащий ссылки на параметры состояния
+        newtable - Словарь, содержащий ссылки на таблицы базы данных
+        Данные всех веществ выбираются запросами WHERE subst IN (...) по in_chunk_size формул
+        (или из хранилища termod_store), названия полей запрашиваются один раз,
+        каждая формула разбирается один раз.
+        Формат возвращаемых данных: список объектов subst (в порядке formula_phase)'''
+        #
+        formula_phase=list(formula_phase)
+        formulas=list(dict.fromkeys(frm for frm,ph in formula_phase))
+        datatable=to_datatable(newtable)
+        #Названия полей
+        fld_name=get_fld_names(datatable)
+        #Данные о веществах
+        termod_data=get_termod_data(datatable,formulas)
+        #Элементные матрицы
+        matrix={frm:(to_substmatrix(frm,2),to_substmatrix(frm)) for frm in formulas}
+        #
+        return [cls(frm,ph,newparametr,newtable,termod_data[frm],fld_name,matrix[frm]) for frm,ph in formula_phase]
+    #
+    def set_database(self,dict_tbl):
+        '''Метод устанавливает  ссылки на таблицы
+        с термодинамической информацией и проверяет их структуру
+        dict_tbl - Словарь, содержащий ссылки на таблицы
+        Формат словаря:
+        {'term-base':<tables>,'term-name-fld':<tables>,'term-ellingem':<tables>,
+        'term-ellingem-name':<tables>,'term-store':<termod_store>}
+        Значения словаря по умолчанию: None
+        Если задано хранилище 'term-store' (или оно создано функцией get_store
+        для таблицы 'term-base'), данные о веществе берутся из него без запросов к БД'''
+        #
+        self.DataTable=to_datatable(dict_tbl)
+        #Данные хранилища и таблиц могут отличаться - сброс рассчитанных свойств
+        self.__intervals=None
+        self.clear_cache()
+    #
+    def get_store(self):
+        '''Метод возвращает хранилище термодинамических данных (termod_store) или None'''
+        #
+        return get_datatable_store(self.DataTable)
+    #
+    def set_parametr(self,dict_param=None):
+        '''Метод устанавливает значения параметров состояния
+        Если они не заданы, то устанавливает стандартные значения
+        dict_param - Словарь, ключами которого являются наименования параметров,
+         а значениями соответствующие объекты'''
+        #
+        self.clear_cache()
+        self.__parametr['temperature']=temperature(298)
+        self.__parametr['pressure']=pressure(100000)
+        #
+        if isinstance(dict_param,dict):
+            if 'temperature' in dict_param:
+                if isinstance(dict_param['temperature'],temperature):
+                    self.__parametr['temperature']=dict_param['temperature']
+                    self.__parametr['temperature'].set_units('K')
+            if 'pressure' in dict_param:
+                if isinstance(dict_param['pressure'],pressure):
+                    self.__parametr['pressure']=dict_param['pressure']
+    #
+    def get_parametr(self):
+        '''Метод возвращает словарь с установленными параметрами системы'''
+        #
+        return self.__parametr
+    #
+    def get_subst_db_names(self):
+        '''Метод возвращает список веществ имеющихся в базе данных
+        Формат возвращаемых данных: множество (frozenset, общее для всех веществ)'''
+        #
+        return get_subst_index(self.DataTable['term-base']).get_names()
+    #
+    def is_valid_subst(self):
+        '''Метод проверяет наличие вещества, заданного формулой в базе данных
+        Возвращает логическое значение True или False'''
+        store=self.get_store()
+        if store!=None:
+            return store.has(self.__formula)
+        if 'term-base' not in self.DataTable:
+            return False
+        return get_subst_index(self.DataTable['term-base']).has(self.__formula)
+    #
+    def get_termod_info(self):
+        '''Метод запрашивает информацию о веществе из базы данных
+        Выполняется проверка наличия информации о веществе в базе данных
+        Формат возвращаемых данных: список словарей'''
+        #
+        self.__intervals=None
+        self.clear_cache()
+        store=self.get_store()
+        if store!=None:
+            self.__subst_termod_data=store.get_rows(self.__formula)
+        elif self.is_valid_subst():
+            res=self.DataTable['term-base'].select([('subst','=',self.__formula)],self.__lst_filds)
+            self.__subst_termod_data=[{k:v for k,v in zip(self.__lst_filds,t_res)} for t_res in res]
+        else: self.__subst_termod_data=False
+        return self.__subst_termod_data
+    #
+    def get_fld_name(self):
+        '''Метод запрашивает названия полей, хранимых в базе данных (основная таблица таблица термодинамических свойств)
+        Формат возвращаемых данных: словарь {<имя поля в таблице>:<полное название поля>}'''
+        #
+        self.__lst_filds_name=get_fld_names(self.DataTable,self.__lst_filds)
+        return self.__lst_filds_name
+    #
+    def clear_cache(self):
+        '''Сброс кэша рассчитанных свойств вещества'''
+        #
+        self.__cache={}
+        self.__cache_state=None
+    #
+    def get_cache_info(self):
+        '''Статистика кэша рассчитанных свойств
+        Формат возвращаемых данных: словарь {'hits':<попадания>,'misses':<промахи>,'size':<записей>}'''
+        #
+        return {'hits':self.cache_hits,'misses':self.cache_misses,'size':len(self.__cache)}
+    #
+    def _state_key(self):
+        '''Состояние, от которого зависят рассчитанные свойства:
+        объекты и версии параметров температуры и давления, стехиометрический коэффициент,
+        режим полной точности'''
+        #
+        tmp=self.__parametr['temperature']
+        prs=self.__parametr['pressure']
+        return (id(tmp),tmp.version,id(prs),prs.version,self.st_koeff,get_full_precision())
+    #
+    def _cached(self,key,func,args,kwargs):
+        '''Получение свойства из кэша или его расчет (см. subst_cache)'''
+        #
+        state=self._state_key()
+        if state!=self.__cache_state:
+            self.__cache={}
+            self.__cache_state=state
+        if key in self.__cache:
+            self.cache_hits+=1
+            res=self.__cache[key]
+        else:
+            self.cache_misses+=1
+            res=func(self,*args,**kwargs)
+            if isinstance(res,np.ndarray):
+                res.flags.writeable=False
+            self.__cache[key]=res
+        #Копия массива: вызывающий код может изменять результат
+        return res.copy() if isinstance(res,np.ndarray) else res
+    #
+    def _load_data(self):
+        '''Получение данных о веществе при первом обращении (отложенное создание)'''
+        #
+        if self.__subst_termod_data==None:
+            self.get_termod_info()
+        return self.__subst_termod_data
+    #
+    def _load_fld_name(self):
+        '''Получение названий полей при первом обращении (отложенное создание)'''
+        #
+        if self.__lst_filds_name==None:
+            self.get_fld_name()
+        return self.__lst_filds_name
+    #
+    def _load_matrix(self):
+        '''Разбор формулы при первом обращении (отложенное создание)'''
+        #
+        if self.__substmatrix==None:
+            self.__treematrix=to_substmatrix(self.__formula,2)
+            self.__substmatrix=to_substmatrix(self.__formula)
+        return self.__substmatrix
+    #
+    def get_subst_matrix(self):
+        '''Метод возвращает матрицу элементного состава вещества
+        Формат возвращаемых данных: словарь {<символ элемента>:<индекс>}'''
+        #
+        return self._load_matrix()
+    #
+    def print_subst_info(self):
+        '''Метод выводит на печать информации о веществе'''
+        #
+        self._load_data()
+        self._load_fld_name()
+        out=[]
+        if self.__subst_termod_data:
+            out.append('Табличные данные о веществе {0} '.format(self.__formula))
+            i=0
+            for subst_t_info in self.__subst_termod_data:
+                out.append('Температурный интервал: от {0} \t до {1} К '.format(subst_t_info['dt1'],subst_t_info['dt2']))
+                out.append('Основные параметры ')
+                if i==0:
+                    out.append('{0}: \t {1}'.format(self.__lst_filds_name['dh298'],subst_t_info['dh298']))
+                    out.append('{0}: \t {1}'.format(self.__lst_filds_name['ds298'],subst_t_info['ds298']))
+                    out.append('{0}: \t {1}'.format(self.__lst_filds_name['dhh298'],subst_t_info['dhh298']))
+                    out.append('{0}: \t {1}'.format(self.__lst_filds_name['uat0'],subst_t_info['uat0']))
+                out.append('{0}: \t {1} '.format(self.__lst_filds_name['dhfp'],subst_t_info['dhfp']))
+                out.append('{0}: \t {1} '.format(self.__lst_filds_name['phase'],subst_t_info['phase']))
+                if i==0:
+                    out.append('Структура')
+                    out.append('{0}: \t {1} '.format(self.__lst_filds_name['m_coeff'],subst_t_info['m_coeff']))
+                    out.append('{0}: \t {1} '.format(self.__lst_filds_name['n_coeff'],subst_t_info['n_coeff']))
+                    out.append('{0}: \t {1} '.format(self.__lst_filds_name['z_coeff'],subst_t_info['z_coeff']))
+                    #
+                out.append('теплоемкость (коэффициенты полинома)')
+                out.append('{0}: \t {1} '.format(self.__lst_filds_name['da'],subst_t_info['da']))
+                out.append('{0}: \t {1} '.format(self.__lst_filds_name['db'],subst_t_info['db']))
+                out.append('{0}: \t {1} '.format(self.__lst_filds_name['dc'],subst_t_info['dc']))
+                out.append('{0}: \t {1} '.format(self.__lst_filds_name['dd'],subst_t_info['dd']))
+                i+=1
+        else:
+            out.append('Вещество {0} отсутствует в базе данных'.format(self.__formula))
+        print('\n'.join(out))
+    #
+    @subst_cache()
+    def Cp_t(self):
+        '''Метод возвращает поправку для теплоемкости вещества в зависимости от изменения температуры
+        Формат возвращаемых данных: массив вещественных чисел'''
+        #
+        res=self._piecewise('cp')
+        #пересчет из Дж в кДж
+        return to_round(res*self.st_koeff/1000.0)
+    #
+    @subst_cache()
+    def delta_Int_S_Cp_t(self):
+        '''Метод возвращает поправку для теплоемкости вещества в зависимости от изменения температуры
+        Формат возвращаемых данных: массив вещественных чисел'''
+        #
+        res=self._piecewise('s')
+        #пересчет из Дж в кДж
+        return to_round(res*self.st_koeff/1000.0)
+    #
+    @subst_cache()
+    def delta_Int_Cp_t(self,fp=False):
+        '''Метод возвращает поправку для теплоемкости вещества в зависимости от изменения температуры
+        Формат возвращаемых данных: массив вещественных чисел
+        Параметры:
+        fp=False учитывать/не учитывать фазовые переходы (True/False)'''
+        #
+        res=self._piecewise('h',fp)
+        #пересчет из Дж в кДж
+        return to_round(res*self.st_koeff/1000.0)
+    #
+    def _intervals(self):
+        '''Коэффициенты температурных интервалов вещества в виде массивов
+        Формат возвращаемых данных: словарь {<поле>:<массив по интервалам>}
+        (False при отсутствии данных). Дополнительно содержит вклады полных
+        интервалов ('cp','h','h_fp','s'), их накопленные суммы ('cum_cp','cum_h','cum_h_fp','cum_s')
+        и признак упорядоченности интервалов ('ordered')'''
+        #
+        data=self._load_data()
+        if not data:
+            return False
+        if self.__intervals==None:
+            #Массивы коэффициентов: из хранилища (без преобразования записей) или из данных о веществе
+            store=self.get_store()
+            arrays=store.get_arrays(self.__formula) if store!=None else False
+            if arrays and len(arrays['dt1'])==len(data):
+                iv={k:np.array(arrays[k],float) for k in ('dt1','dt2','da','db','dc','dd','dhfp')}
+            else:
+                iv={k:np.array([x[k] for x in data],float) for k in ('dt1','dt2','da','db','dc','dd','dhfp')}
+            #Вклады полных интервалов (t>=dt2)
+            dt1,dt2,da,db_,dc,dd,dhfp=(iv[k] for k in ('dt1','dt2','da','db','dc','dd','dhfp'))
+            cp=[da,db_*dt2/1000.0,dc*(dt2**2)/1000000.0,-dd*(dt2**(-2))*100000.0]
+            h_fp=[da*(dt2-dt1),db_*(dt2**2-dt1**2)/2000.0,dc*(dt2**3-dt1**3)/3000000.0,-dd*(dt2**(-1)-dt1**(-1))*100000.0]
+            h=h_fp+[dhfp*1000.0]
+            s=[da*np.log(dt2/dt1),db_*(dt2-dt1)/1000.0,dc*(dt2**2-dt1**2)/2000000.0,-dd*(dt2**(-2)-dt1**(-2))*100000.0/3,
+                dhfp*1000.0/dt2]
+            #Слагаемые по интервалам: [[<слагаемые интервала 0>],[<слагаемые интервала 1>],...]
+            for name,terms in (('cp',cp),('h',h),('h_fp',h_fp),('s',s)):
+                iv[name]=[list(x) for x in zip(*terms)]
+            #Накопленные суммы вкладов полных интервалов (с учетом фазовых переходов)
+            #cum_<вид>[k] - сумма вкладов интервалов 0..k-1
+            for name in ('cp','h','h_fp','s'):
+                cum,res_t=[0.0],0.0
+                for terms in iv[name]:
+                    for term in terms:
+                        res_t+=term
+                    cum.append(res_t)
+                iv['cum_'+name]=np.array(cum)
+            #Интервалы упорядочены и не перекрываются
+            iv['ordered']=bool(np.all(iv['dt1']<=iv['dt2'])and np.all(iv['dt1'][1:]>=iv['dt2'][:-1]))
+            self.__intervals=iv
+        return self.__intervals
+    #
+    @staticmethod
+    def _partial(kinds,t,c):
+        '''Слагаемые функций kinds для значений температуры t внутри интервала
+        kinds - набор видов функций ('cp','h','s')
+        c - словарь коэффициентов интервала (массивы той же длины, что и t)
+        Общие промежуточные величины (t**2, t-dt1 и др.) вычисляются один раз
+        Формат возвращаемых данных: словарь {<вид>:<список слагаемых>}'''
+        #
+        res={}
+        t2=t**2
+        if ('cp' in kinds)or('s' in kinds):
+            t_2=t**(-2)
+        if ('h' in kinds)or('s' in kinds):
+            dt=t-c["dt1"]
+            dt1_2=c["dt1"]**2
+        if 'cp' in kinds:
+            res['cp']=[c["da"],c["db"]*t/1000.0,c["dc"]*t2/1000000.0,-c["dd"]*t_2*100000.0]
+        if 'h' in kinds:
+            res['h']=[c["da"]*dt,c["db"]*(t2-dt1_2)/2000.0,
+                c["dc"]*(t**3-c["dt1"]**3)/3000000.0,-c["dd"]*(t**(-1)-c["dt1"]**(-1))*100000.0]
+        if 's' in kinds:
+            res['s']=[c["da"]*np.log(t/c["dt1"]),c["db"]*dt/1000.0,
+                c["dc"]*(t2-dt1_2)/2000000.0,-c["dd"]*(t_2-c["dt1"]**(-2))*100000.0/3]
+        return res
+    #
+    def _piecewise(self,kind,fp=False):
+        '''Расчет кусочно-заданной функции для всех значений температуры одновременно
+        (в Дж, без учета стехиометрического коэффициента)
+        kind - вид функции:
+            'cp' - теплоемкость (Cp_t)
+            'h' - интеграл Cp dT (delta_Int_Cp_t)
+            's' - интеграл Cp/T dT (delta_Int_S_Cp_t)
+        fp=False - не учитывать (True) теплоты фазовых переходов (для kind='h')'''
+        #
+        return self._piecewise_many([kind],fp)[kind]
+    #
+    def _piecewise_many(self,kinds,fp=False):
+        '''Расчет нескольких кусочно-заданных функций (см. _piecewise) за один проход
+        kinds - список видов функций ('cp','h','s')
+        Интервал для каждой температуры определяется через np.searchsorted
+        по границам dt1; температуры ниже первого интервала приравниваются к dt1 первого интервала.
+        Вклад всех предшествующих интервалов берется из накопленных сумм,
+        поэтому для каждой температуры вычисляется только один неполный интервал
+        Формат возвращаемых данных: словарь {<вид>:<массив>}'''
+        #
+        n=self.__parametr['temperature'].get_size()
+        iv=self._intervals()
+        if not iv:
+            return {kind:np.zeros(n) for kind in kinds}
+        full_name={kind:('h_fp' if (kind=='h')and(fp==True) else kind) for kind in kinds}
+        dt1,dt2=iv['dt1'],iv['dt2']
+        #Проверка значения > нижней границы первого температурного интервала
+        t=np.maximum(self.__parametr['temperature'].get_value(),dt1[0])
+        if iv['ordered']:
+            #Полные (предшествующие) интервалы: накопленная сумма вкладов
+            full=np.searchsorted(dt2,t,side='right')
+            res={kind:iv['cum_'+full_name[kind]][full] for kind in kinds}
+            #Интервал, содержащий температуру
+            k=np.searchsorted(dt1,t,side='right')-1
+            part=t<dt2[k]
+            k=k[part]
+            c={x:iv[x][k] for x in ('dt1','da','db','dc','dd')}
+            for kind,terms in self._partial(kinds,t[part],c).items():
+                for term in terms:
+                    res[kind][part]+=term
+        else:
+            #Произвольный порядок интервалов
+            res={kind:np.zeros(n) for kind in kinds}
+            for k in range(len(dt1)):
+                full=t>=dt2[k]
+                part=(t<dt2[k])&(t>=dt1[k])
+                c={x:iv[x][k] for x in ('dt1','da','db','dc','dd')}
+                partial=self._partial(kinds,t[part],c)
+                for kind in kinds:
+                    for term in iv[full_name[kind]][k]:
+                        res[kind][full]+=term
+                    for term in partial[kind]:
+                        res[kind][part]+=term
+        return res
+    #
+    def properties(self,names=('Cp','H','S','G','A'),structured=False):
+        '''Расчет набора свойств вещества за один проход по температурным интервалам
+        names - список свойств:
+            'Cp' - теплоемкость (Cp_t)
+            'H' - энтальпия (entalp)
+            'S' - энтропия (entrop)
+            'G' - энергия Гиббса (gibbs)
+            'A' - энергия Гельмгольца (gelmgolz)
+        structured=False - формат возвращаемых данных:
+            False - словарь {<свойство>:<массив вещественных чисел>}
+            True - структурированный массив NumPy с полями 'T' и names
+        Значения совпадают с результатами соответствующих методов'''
+        #
+        global R_constant
+        names=[x for x in names if x in ('Cp','H','S','G','A')]
+        temperatur=self.__parametr['temperature'].get_value()
+        n=self.__parametr['temperature'].get_size()
+        data=self._load_data()
+        kinds=[]
+        if 'Cp' in names:
+            kinds.append('cp')
+        if set(names)&{'H','G','A'}:
+            kinds.append('h')
+        if set(names)&{'S','G','A'}:
+            kinds.append('s')
+        raw=self._piecewise_many(kinds)
+        res={}
+        if 'cp' in raw:
+            res['Cp']=to_round(raw['cp']*self.st_koeff/1000.0)
+        if 'h' in raw:
+            h=np.zeros(n)
+            if data:
+                h+=data[0]["dh298"]+to_round(raw['h']*self.st_koeff/1000.0)
+            res['H']=to_round(h*self.st_koeff)
+        if 's' in raw:
+            s=np.zeros(n)
+            if data:
+                s+=data[0]["ds298"]/1000+to_round(raw['s']*self.st_koeff/1000.0)
+            res['S']=to_round(s*self.st_koeff)
+        if ('G' in names)or('A' in names):
+            g=np.zeros(n)
+            if data:
+                g+=res['H']-temperatur*res['S']
+            res['G']=to_round(g*self.st_koeff)
+        if 'A' in names:
+            a=np.zeros(n)
+            a+=res['G']
+            if self.__phase=='g':
+                a+=R_constant*temperatur*self.moll
+            res['A']=to_round(a)
+        res={k:res[k] for k in names}
+        if structured:
+            out=np.zeros(n,dtype=[('T',float)]+[(k,float) for k in names])
+            out['T']=temperatur
+            for k in names:
+                out[k]=res[k]
+            return out
+        return res
+    #
+    @subst_cache()
+    def entalp(self):
+        '''Энтальпия образования вещества при заданной температуре
+        Формат возвращаемых данных: массив вещественных чисел'''
+        #
+        temperatur=self.__parametr['temperature'].get_value()
+        res=np.zeros(self.__parametr['temperature'].get_size())
+        #
+        self._load_data()
+        if self.__subst_termod_data:
+            res+=self.__subst_termod_data[0]["dh298"]+self.delta_Int_Cp_t()
+        return to_round(res*self.st_koeff)
+    #
+    @subst_cache()
+    def entrop(self):
+        '''Энтропия образования вещества при заданной температуре
+        Формат возвращаемых данных: массив вещественных чисел'''
+        #
+        temperatur=self.__parametr['temperature'].get_value()
+        #
+        res=np.zeros(self.__parametr['temperature'].get_size())
+        self._load_data()
+        if self.__subst_termod_data:
+            res+=self.__subst_termod_data[0]["ds298"]/1000+self.delta_Int_S_Cp_t()
+        return to_round(res*self.st_koeff)
+    #
+    @subst_cache()
+    def gibbs(self):
+        '''Энергия Гиббса образования вещества при заданной температуре
+        Формат возвращаемых данных: массив вещественных чисел'''
+        #
+        temperatur=self.__parametr['temperature'].get_value()
+        #
+        res=np.zeros(self.__parametr['temperature'].get_size())
+        self._load_data()
+        if self.__subst_termod_data:
+            res+=self.entalp()-temperatur*self.entrop()
+        return to_round(res*self.st_koeff)
+    #
+    @subst_cache('moll')
+    def gelmgolz(self):
+        '''Энергия Гельмгольца образования вещества при заданной температуре
+        Формат возвращаемых данных: массив вещественных чисел'''
+        #
+        global R_constant
+        temperatur=self.__parametr['temperature'].get_value()
+        res=np.zeros(self.__parametr['temperature'].get_size())
+        res+=self.gibbs()
+        #
+        if self.__phase=='g':
+            res+=R_constant*temperatur*self.moll
+        return to_round(res)
+    #
+    @subst_cache()
+    def u_atomize(self,coord):
+        '''Энергия атомизации вещества
+        Формат возвращаемых данных: массив вещественных чисел
+        coord - параметр, определяющий:
+        расчитывать энергию, приходящуюся на одну связь (coord=True)
+        или полную энергию (coord=False)'''
+        #
+        global R_constant
+        #
+        temperatur=self.__parametr['temperature'].get_value()
+        res=np.zeros(self.__parametr['temperature'].get_size())
+        #
+        self._load_data()
+        if self.__subst_termod_data:
+            res+=self.__subst_termod_data[0]["uat0"]
+            res-=temperatur*(3*(self.__subst_termod_data[0]["m_coeff"]*2+self.__subst_termod_data[0]["n_coeff"])/2)*R_constant/1000.0
+            res-=self.delta_Int_Cp_t(True)
+            res=res/self.__subst_termod_data[0]["m_coeff"]
+            if coord==True:
+                res=res/self.__subst_termod_data[0]["z_coeff"]
+        #
+        return to_round(res)
+    #
+    @subst_cache('moll_konz')
+    def chem_potential(self):
+        '''Расчет химического потенциала вещества
+        Формат возвращаемых данных: массив вещественных чисел'''
+        #
+        global R_constant
+        #
+        temperatur=self.__parametr['temperature'].get_value()
+        res=np.zeros(self.__parametr['temperature'].get_size())
+        #
+        res+=self.gibbs()+R_constant*temperatur*np.log(self.moll_konz)
+        return to_round(res)
+    #
+    def set_phase(self,newphase):
+        '''Устанавливает фазовое состояние вещества
+        newphase - Новое фазовое состояние (строка 'g','k','l','s')'''
+        #
+        self.clear_cache()
+        if newphase in self.__lst_phase:
+            self.__phase=newphase
+        else:
+            self.__phase=self.__lst_phase[0]
+        return self.__phase
+    #
+    def get_phase(self):
+        '''Возвращает фазовое состояние'''
+        #
+        return self.__phase
+    #
+    def formula(self,prn_format='html'):
+        '''Возвращает html представление формулы вещества
+        prn_format - параметр, определяющий представление фомулы ('html', 'txt', 'tex')'''
+        #
+        return to_formula(self.__formula,prn_format)
+    #
+    def ellingem(self):
+        pass
+    #
+#
+#
+class reaktion(object):
+    '''Класс предназначен для расчетов связанных с химической реакцией
+    идентифицируемой по стехиометрической матрице
+    содержит методы выполнения стехиометрических расчетов,
+    уравнивания коэффициентов, расчета термодинамических характеристик
+    для химической реакции'''
+    #
+    def __init__(self,subst_koeff_phase,newparametr,newtable):
+        '''Определение химической реакции
+        Параметры:
+            subst_koeff_phase список, элементами которого являются кортежи:
+            [(формула вещества, стехеометрический коэффициент, фаза), ]
+            newtemperatur - интервал температур (объект класса temperature)
+            newparametr - Словарь, содержащий ссылки на параметры состояния
+            newdatable - Словарь, содержащий ссылки на таблицы базы данных'''
+        #Параметры,определяющие правильность задания реакции
+        #Существование веществ в базе данных
+        self.__validsubst={}
+        #правильность уравнивания коэффициентов
+        self.__validkoeff=True
+        #Список веществ (объектов subst)
+        self.__subst_list=[]
+        #Стехеометрическая матрица Словарь вида {<формула вещества>:<стехеометрический коэффициент>}
+        self.__subst_matrix={}
+        #Множество элементов
+        self.elems=set()
+        #Множество формул
+        self.forms=set()
+        #Определение веществ
+        lst_subst=subst.from_many([(els[0],els[2]) for els in subst_koeff_phase],newparametr,newtable)
+        for els,n_subst in zip(subst_koeff_phase,lst_subst):
+            subst_name,koeff,phase=els
+            if n_subst.is_valid_subst():
+                n_subst.st_koeff=koeff
+                self.__subst_list.append(n_subst)
+                self.elems.update(n_subst.get_subst_matrix().keys())
+                self.forms.add(n_subst.formula('txt'))
+                self.__validsubst[n_subst.formula('txt')]=True
+            else:
+                self.__validsubst[n_subst.formula('txt')]=False
+        #
+        self.koeff_calc()
+        #Матричный расчет мольных свойств веществ реакции
+        self.__engine=termod_engine(self.__subst_list,molar=True)
+        #Рассчитанные характеристики реакции и состояние, для которого они рассчитаны
+        self.__thermo={}
+        self.__thermo_state=None
+        #
+        if len(self.__subst_list)>0:
+            #Подключение таблиц БД
+            self.DataTable=self.__subst_list[0].DataTable
+            #Установка параметров системы
+            self.__parametr=self.__subst_list[0].get_parametr()
+            #
+            #Кинетические параметры
+            self.__energy=0 #Энергия активации
+            self.__factor=1 #Предэкспоненциальный множитель
+            self.__ordnung={}
+            self.set_ordnung() #Частные кинетические порядки реакции
+    #
+    def validate(self):
+        '''Проверка правильности задания параметров реакции'''
+        #
+        for frm,val in self.__validsubst.values():
+            if val==True:
+                print('Вещество {0} присутствует в базе даных')
+            else:
+                print('Вещество {0} отсутствует в базе даных')
+        #
+        if self.__validkoeff:
+            print('Коэффициенты реакции уравнены')
+        else:
+            print('Коэффициенты реакции не уравнены')
+    #
+    def is_valid(self):
+        '''Метод возвращает True, усли все вещества
+        указанные в реакции заданы правильно
+        и она правильно уравнена.'''
+        #
+        if (self.__validkoeff==True)and(False not in self.__validsubst.values()):
+            return True
+        else:
+            return False
+    #
+    def set_parametr(self,dict_param=None):
+        '''Изменяет параметры для всех веществ системы.
+        Параметры:
+            dict_param - Словарь, ключами которого являются наименования параметров,
+            а значениями соответствующие объекты'''
+        #
+        for sbs in self.__subst_list:
+            sbs.set_parametr(dict_param)
+    #
+    def get_matrix(self):
+        '''Метод для определения значения стехеометрической матрицы реакции'''
+        #
+        return self.__subst_matrix
+    #
+    def get_koeff_vector(self):
+        '''Вектор стехиометрических коэффициентов веществ реакции
+        (порядок веществ соответствует строкам get_property_matrix)
+        Формат возвращаемых данных: массив вещественных чисел'''
+        #
+        return np.array([sbs.st_koeff for sbs in self.__subst_list],float)
+    #
+    def get_property_matrix(self,name='G'):
+        '''Матрица мольных свойств веществ реакции (вещества x температуры)
+        name - свойство: 'Cp','H','S','G' (см. termod_engine)'''
+        #
+        return self.__engine.properties([name])[name]
+    #
+    def _thermo(self):
+        '''Расчет (или получение из кэша) характеристик реакции:
+        'H','S','G' - произведения матриц мольных свойств веществ на вектор коэффициентов,
+        'lnK','K' - логарифм и значение константы равновесия.
+        Характеристики рассчитываются один раз для данной температуры и коэффициентов
+        (массивы кэша доступны только для чтения, методы entalp и др. возвращают копии)'''
+        #
+        global R_constant
+        koeff=self.get_koeff_vector()
+        state=(self.__engine._state_key(),tuple(koeff))
+        if state!=self.__thermo_state:
+            props=self.__engine.properties(['H','S','G'])
+            temperatur=self.__engine.get_temperatur().get_value()
+            res={}
+            for name in ('H','S','G'):
+                res[name]=to_round(np.dot(koeff,props[name]))
+            log_k=-res['G']*1000/temperatur/R_constant
+            res['lnK']=to_round(log_k)
+            res['K']=to_round(np.exp(log_k))
+            for x in res.values():
+                x.flags.writeable=False
+            self.__thermo,self.__thermo_state=res,state
+        return self.__thermo
+    #
+    def entalp(self):
+        '''Расчет энтальпии реакции при заданной температуре'''
+        #
+        return self._thermo()['H'].copy()
+    #
+    def entrop(self):
+        '''Расчет энтропии реакции при заданной температуре'''
+        #
+        return self._thermo()['S'].copy()
+    #
+    def gibbs(self):
+        '''Расчет энергии Гиббса реакции при заданной температуре'''
+        #
+        return self._thermo()['G'].copy()
+    #
+    def gelmgolz(self):
+        '''Расчет энергии Гельмгольца реакции при заданной температуре'''
+        #
+        return to_round(np.dot(self.get_koeff_vector(),self.__engine.gelmgolz()))
+    #
+    def const_p(self):
+        '''Расчет константы равновесия реакции при заданной температуре'''
+        #
+        return self._thermo()['K'].copy()
+    #
+    def log_const_p(self):
+        '''Расчет натурального логарифма константы равновесия реакции при заданной температуре'''
+        #
+        return self._thermo()['lnK'].copy()
+    #
+    def temperatur_nr(self):
+        '''Расчет температуры начала реакции
+        возвращаемое значение: строка'''
+        #
+        global round_digit
+        old_parametr=self.__parametr.copy()
+        #
+        self.set_parametr()
+        ent298=self.entalp()[0]
+        entr298=self.entrop()[0]
+        tnr=np.around(ent298/entr298,round_digit)
+        self.set_parametr(old_parametr)
+        #
+        res=None
+        #
+        if (ent298>0)and(entr298<0):
+            res='реакция не может протекать при температуре T>0 K'
+        elif (ent298<0)and(entr298>0):
+            res='реакция всегда может протекать при температуре T>0 K'
+        elif (ent298<0)and(entr298<0):
+            res='T<{0} K'.format(tnr)
+        elif (ent298>0)and(entr298>0):
+            res='T>{0} K'.format(tnr)
+        return res
+    #
+    def print_info(self):
+        '''печать основной информации о реакции'''
+        #
+        str_right=[]
+        str_left=[]
+        for sbs in self.__subst_list:
+            str_koeff=''
+            if sbs.st_koeff>0:
+                if sbs.st_koeff!=1:
+                    str_koeff=str(sbs.st_koeff)
+                str_right.append(str_koeff+sbs.formula('txt')+'('+sbs.get_phase()+')')
+            else:
+                if sbs.st_koeff!=-1:
+                    str_koeff=str(-sbs.st_koeff)
+                str_left.append(str_koeff+sbs.formula('txt')+'('+sbs.get_phase()+')')
+        #
+        Q=round(-self.entalp()[0],round_digit)
+        return '{0} = {1}+{2} кДж ({3})'.format('+'.join(str_left),'+'.join(str_right),Q,self.temperatur_nr())
+    #
+    def set_reagents(self,form_moll):
+        '''Метод устанавливает значения количеств реагентов
+        form_moll - Словарь, ключами которого являются формулы веществ,
+         а значениями их количества, моль
+         {<формула вещества>:<количество вещества, моль>, }
+         Для вещества, входящего в реакцию в разных фазовых состояниях,
+         ключ может включать фазу: '<формула>(<фаза>)' (например 'H2O(l)')'''
+        #
+        if isinstance(form_moll,dict):
+            for sbs in self.__subst_list:
+                formula=sbs.formula('txt')
+                formula_phase='{0}({1})'.format(formula,sbs.get_phase())
+                if formula_phase in form_moll:
+                    sbs.moll=form_moll[formula_phase]
+                elif formula in form_moll:
+                    sbs.moll=form_moll[formula]
+    #
+    def get_reagents(self):
+        '''Метод возвращает количество вещества реагентов, моль'''
+        #
+        return {sbs.formula('txt'):sbs.moll for sbs in self.__subst_list}
+    #
+    def degree_max(self):
+        '''Метод возвращает максимальное значение степени полноты'''
+        #
+        return min([-sbs.moll/sbs.st_koeff for sbs in self.__subst_list if sbs.st_koeff<0])
+    #
+    def degree(self,x):
+        '''Метод пересчитывает количества вещества реагентов на величину x
+        x - степень полноты реакции'''
+        #
+        max_x=self.degree_max()
+        re_x=x if x<max_x else max_x
+        for sbs in self.__subst_list:
+            sbs.moll+=sbs.st_koeff*x
+        return self.get_reagents()
+    #
+    def __mul__(self,num):
+        '''Умножение реакции на коэфициент
+        num - Число, на которое умножаются коэффициенты реакции'''
+        #
+        if (isinstance(num,int) or isinstance(num,float))and(num!=0):
+            for sbs in self.__subst_list:
+                sbs.st_koeff*=num
+                self.__subst_matrix[sbs.formula('txt')]=sbs.st_koeff
+        elif num==0:
+            print('error num is non zero')
+        return self
+    #
+    def set_koeff(self,frm_koeff):
+        '''Метод устанавливает значения стехеометрических коэффициентов
+        для всех веществ, входящих в реакцию.
+        Параметры:
+            frm_koeff - Словарь, ключами которого являются формулы, а значениями коэффициенты
+            {<Формула>:<Стехеометрический коэффициент>}'''
+        #
+        if isinstance(frm_koeff,dict):
+            for sbs in self.__subst_list:
+                frm=sbs.formula('txt')
+                sbs.st_koeff=frm_koeff[frm] if frm in frm_koeff.keys() else 1
+                self.__subst_matrix[frm]=frm_koeff[frm]
+    #
+    def koeff_calc(self):
+        '''Расчет стехеометрических коэффициентов реакции (см. balance_koeff, scale_koeff)
+        Знаки определяются заданием веществ в левой (отрицательный коэффициент) и правой
+        частях реакции, величина - заданным коэффициентом последнего вещества.
+        Если уравнивание невозможно или неоднозначно, коэффициенты не изменяются,
+        а реакция считается неуравненной (результат - в атрибуте balance_status)
+        Возвращает стехеометрическую матрицу реакции
+        словарь вида:
+            {<формула вещества>:<стехеометрический коэффициент>,}'''
+        #
+        status,koeff=balance_koeff([sbs.formula('txt') for sbs in self.__subst_list],
+            [sbs.get_subst_matrix() for sbs in self.__subst_list],
+            [sbs.get_phase() for sbs in self.__subst_list])
+        self.balance_status=status
+        if status=='ok':
+            #Коэффициенты присваиваются по порядку веществ
+            #(одна формула может входить в реакцию в разных фазовых состояниях)
+            koeff,self.__validkoeff=scale_koeff(koeff,[sbs.st_koeff for sbs in self.__subst_list])
+            for sbs,k in zip(self.__subst_list,koeff):
+                sbs.st_koeff=k
+        else:
+            self.__validkoeff=False
+        for sbs in self.__subst_list:
+            self.__subst_matrix[sbs.formula('txt')]=sbs.st_koeff
+        #
+        return self.__subst_matrix
+    #
+    def rate(self,energy):
+        pass
+    #
+    def kinetik_koeff(self,factor=None,energy=None,log=False):
+        '''Метод расчитывает кинетический коэффициент реакции по уравнению Аррениуса.
+        Параметры метода:
+            energy - энергия активации
+            factor - предэкспоненциальный множитель
+            log - формат вывода
+                log=True логарифм константы
+                log=False константа'''
+        #
+        if energy!=None:
+            self.__energy=np.float(energy)
+        if factor!=None:
+            self.__factor=np.float(factor)
+        #
+        if log==True:
+            res=np.log(self.__factor)-self.__energy/(R_constant*self.__parametr['temperature'].get_value())
+        else:
+            res=self.__factor*np.exp(-self.__energy/(R_constant*self.__parametr['temperature'].get_value()))
+        return res
+    #
+    def parametr_kinetik(self,kin_konst,temp):
+        '''Метод возвращает параметры кинетической константы:
+            предэкспоненциальный множитель и энергию активацииив виде кортежа:
+                (<предэкспоненциальный множитель>,<энергия активации>).
+                Расчет выполняется по уравнению Аррениуса
+        Пераметры метода:
+            kin_konst - кортеж из двух кинетических констант, при различных температурах <float>
+            temp - кортеж из двух значений температуры <float>'''
+        #
+        energy,factor=0,0
+        if (isinstance(kin_konst,tuple))and(isinstance(temp,tuple)):
+            if (len(kin_konst)==2)and(len(temp)==2):
+                self.__energy=(R_constant*temp[0]*temp[1]/(temp[0]-temp[1]))*np.log(kin_konst[0]/kin_konst[1])
+                self.__factor=np.exp((temp[0]*np.log(kin_konst[0])-temp[1]*np.log(kin_konst[1]))/(temp[0]-temp[1]))
+            else:
+                print('Необходимы кортежи из двух элементов')
+        #
+        return (self.__factor,self.__energy)
+    #
+    def zdm(self,course='reversible',prn_format='html',variable='[]',ph='g'):
+        '''Метод, возвращающий выражение закона действующих масс для реакции
+        Возвращаемое выражение: строка в формате tex или html.
+        Параметры метода:
+            course - направление реакции.
+            Принимает значения:
+                course='forward' прямая
+                course='reverse' обратная
+                course='reversible' обратимая
+            prn_format='html' - Формат выводимых данных.
+            Принимает значения:
+                prn_format='tex' tex
+                prn_format='html' html
+            variable='[]' - тип переменных для вывода.
+            Принимает значения:
+                variable='[]' молярные концентрации (старая запись)
+                variable='x' мольные доли
+                variable='p' парциальные давления
+                variable='C' молярные концентрации (новая запись)
+            ph='g' - основная фаза. Принимает значения: 'g','k','l','s'.
+            (по обозначениям фаз)'''
+        #
+        mtr={sbs.formula('txt'):sbs.st_koeff for sbs in self.__subst_list if sbs.get_phase()==ph}
+        #
+        s_v,s_vb,s_ve='','[',']'
+        #
+        if prn_format=='html':
+            s_u,s_b,s_e,s_kb,s_ke='','<sup>','</sup>','<sub>','</sub>'
+            #
+            if variable!='[]':
+                s_v,s_vb,s_ve=str(variable),'<sub>','</sub>'
+        elif prn_format=='tex':
+            s_u,s_b,s_e,s_kb,s_ke='\cdot ','^{','}','_{','}'
+            #
+            if variable!='[]':
+                s_v,s_vb,s_ve=str(variable),'_{','}'
+        #
+        res=''
+        res1='k{0}+{1}'.format(s_kb,s_ke)+s_u.join(['{4}{5}{0}{6}{1}{2}{3}'.format(to_formula(frm,prn_format),s_b,-ind,s_e,s_v,s_vb,s_ve) for frm,ind in mtr.items() if ind<0])
+        res2='k{0}-{1}'.format(s_kb,s_ke)+s_u.join(['{4}{5}{0}{6}{1}{2}{3}'.format(to_formula(frm,prn_format),s_b,ind,s_e,s_v,s_vb,s_ve) for frm,ind in mtr.items() if ind>0])
+        if course=='forward':
+            res='v={0}'.format(res1)
+        elif course=='reverse':
+            res='v={0}'.format(res2)
+        elif course=='reversible':
+            res='v={0}-{1}'.format(res1,res2)
+        return res
+    #
+    def zdm_eval(self,val_degree=0,course='reversible',variable='x',ph='g',par=1):
+        '''Метод вычисляет значение скорости по закону действующих масс
+        при заданной величине степени полноты рекции val_degree.
+        По умолчанию val_degree=0.
+        Предварительно должна быть расчитана кинетическая константа при помощи
+        одного из методов kinetik_koeff() или parametr_kinetik().
+        По умолчанию кинетическая константа равна 1.
+        Параметры метода:
+            course - направление реакции.
+            Принимает значения:
+                course='forward' прямая
+                course='reverse' обратная
+                course='reversible' обратимая
+            variable='x' - тип переменных для вывода.
+            Принимает значения:
+                variable='x' мольные доли
+                variable='p' парциальные давления
+                (должен быть задан параметр давления)
+                variable='C' молярные концентрации
+                (должен быть задан параметр объема)
+            ph='g' - основная фаза. Принимает значения: 'g','k','l','s'.
+            (по обозначениям фаз)
+            par=1 - Дополнительный параметр
+            (давление или объем в зависимости от значения параметра variable)'''
+        #
+        k_kin1=self.kinetik_koeff()
+        k_kin2=1#k_kin1/self.const_p()
+        #
+        moll=self.degree(val_degree)
+        ordn=self.get_ordnung()
+        moll_s=np.sum([x for x in moll.values()])
+        #
+        if moll_s>0:
+            lst_frm1=[sbs.formula('txt') for sbs in self.__subst_list if (sbs.st_koeff<0)and(sbs.get_phase()==ph)]
+            lst_frm2=[sbs.formula('txt') for sbs in self.__subst_list if (sbs.st_koeff>0)and(sbs.get_phase()==ph)]
+            #
+            res1=k_kin1*np.prod([(moll[frm]/moll_s)**np.abs(ordn[frm]) for frm in lst_frm1])
+            res2=k_kin2*np.prod([(moll[frm]/moll_s)**np.abs(ordn[frm]) for frm in lst_frm2])
+            #
+            ordn_s1=np.sum([ordn[frm] for frm in lst_frm1])
+            ordn_s2=np.sum([ordn[frm] for frm in lst_frm2])
+            #
+            if course=='forward':
+                res=res1
+            elif course=='reverse':
+                res=res2
+            elif course=='reversible':
+                res=res1-res2
+            else:
+                res=res1
+            #
+            if (variable=='p')and(ph=='g'):
+                res1=res1*(par**ordn_s1)
+                res2=res2*(par**ordn_s2)
+            elif (variable=='C')and((ph=='s')or(ph=='l')or(ph=='g')):
+                res1=res1/((R_constant*self.__parametr['temperature'].get_value())**ordn_s1)
+                res2=res2/((R_constant*self.__parametr['temperature'].get_value())**ordn_s2)
+            elif (variable=='x')and((ph=='s')or(ph=='l')or(ph=='g')):
+                res1=res1/(par**ordn_s1)
+                res2=res2/(par**ordn_s2)
+        else:
+            res=0
+        return res
+    #
+    def set_ordnung(self,frm_val=None):
+        '''Метод устанавливает значения частных порядков реакции по реагентам.
+        Параметры метода:
+            frm_val=None - Порядки реакции.
+            Словарь вида: {<формула вещества>:<порядок реакции по веществу>}
+            Если значение не задано, то частные порядки реакции по веществам
+            определяются стехиометрическими коэффициентами.
+            Если концентрация данного вещества не определяет скорость реакции,
+            задайте значение порядка по веществу равным 0.'''
+        #
+        if isinstance(frm_val,dict):
+            frm_val1={k:v for k,v in frm_val.items() if (isinstance(v,int)or isinstance(v,float))}
+            for sbs in self.__subst_list:
+                frm=sbs.formula('txt')
+                if frm in frm_val1:
+                    self.__ordnung[frm]=frm_val1[frm]
+                else:
+                    self.__ordnung[frm]=sbs.st_koeff
+        else:
+            self.__ordnung={sbs.formula('txt'):sbs.st_koeff for sbs in self.__subst_list}
+    #
+    def get_ordnung(self):
+        '''Метод возвращает порядки реакции в формате словаря:
+            {<формула вещества>:<порядок реакции по веществу>}
+        '''
+        #
+        return self.__ordnung
+    #
+    def rawn_calc(self,params=None):
+        '''Расчет равновесной степени полноты реакции для всех значений температуры одновременно
+        Используются логарифм константы равновесия (log_const_p), количества веществ (set_reagents)
+        и давление. Газы считаются идеальными, активность конденсированных веществ равна 1.
+        Уравнение равновесия решается для всех температур векторно методом Ньютона
+        с ограничением интервала (при выходе за интервал - деление пополам).
+        Количества веществ (moll) не изменяются.
+        Константа равновесия рассчитывается в режиме полной точности (calc_context).
+        params=None - словарь:
+            'pressure' - давление (объект класса pressure), по умолчанию давление реакции
+            'tol' - точность по невязке уравнения равновесия (по умолчанию 1e-10)
+            'max_iter' - наибольшее число итераций (по умолчанию 200)
+        Формат возвращаемых данных: кортеж
+            (<массив степеней полноты>,{'<формула вещества>(<фаза>)':<массив равновесных количеств, моль>})
+            (ключи - как в chem_system.equilibrium)'''
+        #
+        params=params if isinstance(params,dict) else {}
+        prs=params.get('pressure',self.__parametr['pressure'])
+        tol=params.get('tol',1e-10)
+        max_iter=params.get('max_iter',200)
+        #
+        with calc_context():
+            log_k=np.asarray(self.log_const_p(),float)
+        size=log_k.size
+        koeff=self.get_koeff_vector()
+        moll0=np.array([sbs.moll for sbs in self.__subst_list],float)
+        gas=np.array([sbs.get_phase()=='g' for sbs in self.__subst_list])
+        #Изменение числа молей газов
+        d_gas=koeff[gas].sum()
+        #Давление, отнесенное к стандартному (100000 Па)
+        log_p=np.log(prs.get_value_pa()/100000.0)*np.ones(size)
+        #Границы степени полноты: исчерпание реагентов и продуктов
+        with np.errstate(divide='ignore',invalid='ignore'):
+            limit=np.where(koeff!=0,-moll0/koeff,np.nan)
+        hi=self.degree_max() if np.any(koeff<0) else 0.0
+        lo=max(limit[koeff>0]) if np.any(koeff>0) else 0.0
+        lo,hi=np.full(size,float(lo)),np.full(size,float(hi))
+        #
+        def func(x,base=None):
+            '''Невязка уравнения равновесия и ее производная (возрастающая функция x)
+            base=None - количества веществ при x=0'''
+            #
+            base=moll0[:,np.newaxis] if base is None else base
+            moll=base[gas]+koeff[gas][:,np.newaxis]*x[np.newaxis,:]
+            moll_s=moll.sum(axis=0)
+            f=(koeff[gas][:,np.newaxis]*np.log(moll)).sum(axis=0)-d_gas*np.log(moll_s)+d_gas*log_p-log_k
+            df=(koeff[gas][:,np.newaxis]**2/moll).sum(axis=0)-d_gas**2/moll_s
+            return f,df
+        #
+        x=(lo+hi)/2
+        with np.errstate(divide='ignore',invalid='ignore'):
+            #Степень полноты отсчитывается от ближайшей к решению границы интервала ref:
+            #количество исчерпываемого при x=ref вещества (равное koeff*x) рассчитывается
+            #с полной относительной точностью
+            ref=np.where(func(x)[0]>0,lo,hi)
+            base=moll0[:,np.newaxis]+koeff[:,np.newaxis]*ref[np.newaxis,:]
+            base[limit[:,np.newaxis]==ref[np.newaxis,:]]=0.0
+            lo,hi,x=lo-ref,hi-ref,x-ref
+            if gas.any():
+                done=np.zeros(size,bool)
+                for i in range(max_iter):
+                    f,df=func(x,base)
+                    #Сужение интервала
+                    hi=np.where(f>0,x,hi)
+                    lo=np.where(f<0,x,lo)
+                    #Шаг Ньютона, при выходе за интервал - деление пополам
+                    x_new=x-f/df
+                    bad=~np.isfinite(x_new)|(x_new<=lo)|(x_new>=hi)
+                    x_new=np.where(bad,(lo+hi)/2,x_new)
+                    #Достигнута точность либо интервал сужен до точности представления чисел
+                    done|=(np.abs(f)<=tol)|(hi-lo<=4*np.spacing(np.maximum(np.abs(lo),np.abs(hi))))
+                    x=np.where(done,x,x_new)
+                    if done.all():
+                        break
+            else:
+                #Только конденсированные вещества: реакция идет до исчерпания
+                x=np.where(log_k>0,hi,lo)
+        #
+        moll=base+koeff[:,np.newaxis]*x[np.newaxis,:]
+        res={'{0}({1})'.format(sbs.formula('txt'),sbs.get_phase()):moll[i] for i,sbs in enumerate(self.__subst_list)}
+        return ref+x,res
+#
+#
+class chem_system(object):
+    '''Класс chem_system
+    Предназначен для выполнения расчетов связанных с химической системой,
+    в которой протекают химические реакции и в которую входят химические вещества
+    Содержит методы выполнения расчетов связанных с системой'''
+    #
+    def __init__(self,name,subst_moll_phase,newtemperatur,newtable=None):
+        '''subst_moll_phase состав системы
+        список кортежей вида
+        [(<Название вещества>,<Содержание вещества в молях>,<фазовое состояние вещества>),...]
+        newtemperatur - температура (объект класса temperature)
+        newtable - Словарь, содержащий ссылки на таблицы базы данных'''
+        #
+        self.__name=name
+        #Список веществ
+        self.__subst_list=[]
+        #Таблицы БД
+        self.DataTable=newtable
+        #Температура
+        self.set_temperatur(newtemperatur)
+        #Инертный компонент в системе
+        self.__inerts=0.0
+        #Матричный расчет свойств веществ системы
+        self.__engine=termod_engine(self.__subst_list)
+        #Определяем состав системы (данные всех веществ получаются одним запросом)
+        lst_subst=subst.from_many([(els[0],els[2]) for els in subst_moll_phase],{'temperature':self.__temperatur},self.DataTable)
+        for els,n_subst in zip(subst_moll_phase,lst_subst):
+            #Добавляем новое вещество
+            self._add(n_subst,els[1])
+        #
+        #
+        #reakts стехеометрические матрицы реакций входящих в состав системы
+        #список словарей вида: [{<Название вещества>:<Стехеометрический коэффициент вещества>,...},...]
+    #
+    def get_info(self):
+        form_subst=map(lambda sb:sb.formula,self.__subst_list)
+        return [self.__name,form_subst]
+    def set_temperatur(self,value):
+        if isinstance(value,temperature):
+            self.__temperatur=value
+        else:
+            self.__temperatur=temperature(298)
+        #Устанавливаем температуру для всех веществ
+        for sbs in self.__subst_list:
+            sbs.set_parametr({'temperature':self.__temperatur})
+    #
+    def is_valid_system(self):
+        #Метод для проверки параметров системы
+        #Проверяет наличие в базе данных информации о веществах
+        #входящих в состав системы
+        #
+        #Проверка равенства суммы мольных долей компонентов системы 100%
+        res=True
+        res_sum=0.0
+        for sbs in self.__subst_list:
+            if not sbs.is_valid_subst():
+                res=False
+            res_sum+=sbs.moll_konz
+        res_sum=round(res_sum,2)
+        if res_sum==1.0 and res==True:
+            return True
+        else:
+            return False
+    #
+    def add_subst(self,formula,moll,phase):
+        #Метод добавляет новое вещество в систему
+        #formula - Формула нового вещества
+        #
+        #Возвращает True или False
+        #
+        n_subst=subst(formula,phase,{'temperature':self.__temperatur},self.DataTable)
+        return self._add(n_subst,moll)
+    #
+    def _add(self,n_subst,moll):
+        #Метод добавляет в систему созданное вещество n_subst
+        #moll - количество вещества, моль
+        #
+        if n_subst.is_valid_subst()and(moll>0):
+            n_subst.moll=moll
+            #Добавляем
+            self.__subst_list.append(n_subst)
+            self.__engine=termod_engine(self.__subst_list)
+            #Пересчитываем состав
+            self.get_sostav()
+            #
+            return True
+        #
+        else:
+            return False
+    #
+    def change_all(self,delta_moll):
+        #Метод изменяет количество инертного вещества в системе
+        #delta_moll - изменение количества вещества в молях
+        #units - единицы измерения
+        if(delta_moll+self.__inerts>0):
+            self.__inerts+=delta_moll
+        #
+        self.get_sostav()
+    #
+    def change_subst(self,formula,moll):
+        #Метод изменяет количество вещества в системе
+        #formula - Формула вещества
+        #
+        #Возвращает True или False
+        #
+        try:
+            my_num=map(lambda sbs:sbs.formula,self.__subst_list).index(formula)
+        except:
+            my_num=False
+        #
+        if(my_num!=False)and(moll>0):
+            self.__subst_list[my_num].moll=moll
+            #Пересчитываем состав
+            self.get_sostav()
+            #
+            return True
+        else:
+            return False
+    #
+    def del_subst(self,formula):
+        #Удаляет выбранное вещество из системы, если оно в ней присутствует
+        #
+        # formula - формула удаляемого вещества
+        #
+        try:
+            del_num=map(lambda sbs:sbs.formula,self.__subst_list).index(formula)
+        except:
+            del_num=False
+        #при наличии вещества в системе удаляем
+        if del_num:
+            del self.__subst_list[del_num]
+            self.__engine=termod_engine(self.__subst_list)
+            #Пересчитываем состав
+            self.get_sostav()
+            #
+            return True
+        #
+        else:
+            return False
+    #
+    def get_sostav(self):
+        #Метод для определения состава системы
+        #Суммарное количество вещества
+        self.__all_moll=np.sum([sbs.moll for sbs in self.__subst_list])+self.__inerts
+        #
+        for sbs in self.__subst_list:
+            sbs.moll_konz=sbs.moll*100/self.__all_moll
+    #
+    def u_midl_atomize(self):
+        #Средняя энергия атомизации системы
+        # при температуре temperatur
+        #
+        #
+        res=np.zeros(self.__temperatur.get_size())
+        #
+        for sbs in self.__subst_list:
+            res+=sbs.u_atomize(True)*sbs.moll_konz/100
+        return to_round(res)
+    #
+    def Kn(self):
+        #Коэффициент прочности системы
+        #
+        #
+        temp=subst('SiO2','k',{'temperature':self.__temperatur},self.DataTable)
+        return to_round(self.u_midl_atomize()/temp.u_atomize(True))
+    #
+    def entalp(self):
+        #Метод определяет энтальпию системы
+        #
+        #Произведение матрицы свойств веществ на вектор количеств веществ
+        moll=np.array([sbs.moll for sbs in self.__subst_list],float)
+        res=np.dot(moll,self.__engine.entalp())
+        return to_round(res)
+    #
+    def entrop(self):
+        #Метод определяет энтропию системы
+        #
+        #Произведение матрицы свойств веществ на вектор количеств веществ
+        moll=np.array([sbs.moll for sbs in self.__subst_list],float)
+        res=np.dot(moll,self.__engine.entrop())
+        return to_round(res)
+    #
+    def gibbs(self):
+        #Метод определяет энергию Гиббса системы
+        #
+        #Произведение матрицы свойств веществ на вектор количеств веществ
+        moll=np.array([sbs.moll for sbs in self.__subst_list],float)
+        res=np.dot(moll,self.__engine.chem_potential())
+        return to_round(res)
+    #
+    def equilibrium(self,params=None):
+        '''Расчет равновесного состава системы минимизацией энергии Гиббса
+        при сохранении количеств элементов (элементные матрицы веществ - to_substmatrix)
+        для всех значений температуры системы за один вызов.
+        Газовая фаза - идеальная смесь (включая инертный компонент),
+        конденсированные вещества - отдельные фазы с активностью 1.
+        Расчет для каждой температуры начинается с решения для предыдущей температуры.
+        Если для какой-либо температуры равновесие не достигнуто за max_iter итераций,
+        выдается предупреждение RuntimeWarning со списком таких температур.
+        Количества веществ системы (moll) не изменяются.
+        params=None - словарь:
+            'candidates' - список кортежей [(<формула>,<фазовое состояние>),] веществ,
+                которые могут образоваться в системе (начальное количество 0)
+            'pressure' - давление (объект класса pressure), по умолчанию давление веществ системы
+            'warm_start' - начинать расчет с решения для предыдущей температуры (по умолчанию True)
+            'tol' - точность (по умолчанию 1e-10)
+            'max_iter' - наибольшее число итераций для одной температуры (по умолчанию 500)
+        Формат возвращаемых данных: кортеж
+            ({<формула вещества(фаза)>:<массив равновесных количеств, моль>},
+            <массив энергии Гиббса системы в равновесии, кДж>)'''
+        #
+        global R_constant
+        params=params if isinstance(params,dict) else {}
+        tol=params.get('tol',1e-10)
+        max_iter=params.get('max_iter',500)
+        warm_start=params.get('warm_start',True)
+        #Вещества системы и возможные продукты
+        lst_subst=list(self.__subst_list)
+        names=set((sbs.formula('txt'),sbs.get_phase()) for sbs in lst_subst)
+        candidates=[x for x in params.get('candidates',[]) if (to_formula(x[0],'txt'),x[1]) not in names]
+        if candidates:
+            lst_new=subst.from_many(candidates,{'temperature':self.__temperatur},self.DataTable)
+            lst_subst+=[sbs for sbs in lst_new if sbs.is_valid_subst()]
+        moll0=np.array([sbs.moll for sbs in self.__subst_list]+[0.0]*(len(lst_subst)-len(self.__subst_list)),float)
+        #Элементная матрица (элементы x вещества) и количества элементов
+        matrix=[sbs.get_subst_matrix() for sbs in lst_subst]
+        elems=sorted(set(el for x in matrix for el in x.keys()))
+        a_matrix=np.array([[x.get(el,0) for x in matrix] for el in elems],float).reshape(len(elems),len(lst_subst))
+        b_vector=np.dot(a_matrix,moll0)
+        gas=np.array([sbs.get_phase()=='g' for sbs in lst_subst],bool)
+        #Приведенные стандартные потенциалы G/RT (вещества x температуры)
+        temperatur=self.__temperatur.get_value()
+        with calc_context():
+            gibbs=termod_engine(lst_subst,self.__temperatur,molar=True).gibbs()
+        g_rt=gibbs*1000.0/R_constant/temperatur
+        #Давление, отнесенное к стандартному (100000 Па)
+        prs=params.get('pressure',None)
+        if prs==None:
+            prs=lst_subst[0].get_parametr()['pressure'] if lst_subst else pressure(100000)
+        log_p=np.log(prs.get_value_pa()/100000.0)*np.ones(len(temperatur))
+        #Расчет для всех температур
+        res=np.zeros((len(lst_subst),len(temperatur)))
+        res_g=np.zeros(len(temperatur))
+        start=moll0
+        failed=[]
+        for t in range(len(temperatur)):
+            moll,mu,converged=gibbs_min(a_matrix,b_vector,g_rt[:,t],gas,start,self.__inerts,log_p[t],tol,max_iter)
+            if not converged:
+                failed.append(temperatur[t])
+            res[:,t]=moll
+            res_g[t]=np.dot(moll,mu)*R_constant*temperatur[t]/1000.0
+            if warm_start:
+                start=moll
+        if failed:
+            warnings.warn('Равновесие не достигнуто за {0} итераций при T={1} K'.format(max_iter,failed),RuntimeWarning)
+        #
+        res_moll={'{0}({1})'.format(sbs.formula('txt'),sbs.get_phase()):res[i] for i,sbs in enumerate(lst_subst)}
+        return res_moll,res_g
+    #
+    def print_system_info(self,units='prozent'):
+        #Выводит информацию о составе системы
+        #Результат вывода - словарь {<формула вещества>:<количество вещества (в абсолютных или относительных единицах)>}
+        #
+        global round_digit
+        res={}
+        if units=='moll':
+            for sbs in self.__subst_list:
+                res[sbs.formula]=round(sbs.moll,round_digit)
+            res['inerts']=round(self.__inerts,round_digit)
+            res['itogo']=round(self.__all_moll,round_digit)
+            res['units']='moll'
+        elif units=='prozent':
+            for sbs in self.__subst_list:
+                res[sbs.formula]=round(sbs.moll_konz,round_digit)
+            res['inerts']=round(self.__inerts*100/self.__all_moll,round_digit)
+            res['itogo']=100
+            res['units']='%'
+        #
+        return res
+#
+class termod_engine(object):
+    '''Класс выполняет расчет термодинамических функций набора веществ
+    (N веществ x M значений температуры) одним векторным вычислением.
+    Коэффициенты температурных интервалов веществ сводятся в таблицу,
+    дополненную до одинакового числа интервалов; интервал определяется
+    для каждого вещества и каждой температуры.
+    Строки результатов совпадают с результатами соответствующих методов subst
+    (при molar=True - для стехиометрических коэффициентов, равных 1),
+    поэтому суммы по реакции и системе сводятся к произведению матрицы на вектор.'''
+    #
+    def __init__(self,lst_subst,newtemperatur=None,molar=False):
+        '''lst_subst - список веществ (объекты subst)
+        newtemperatur=None - температура (объект класса temperature),
+        по умолчанию температура первого вещества
+        molar=False - рассчитывать мольные свойства (без учета стехиометрических коэффициентов)'''
+        #
+        self.__subst_list=list(lst_subst)
+        self.__temperatur=newtemperatur
+        self.molar=molar
+        #Таблица коэффициентов и данные, по которым она построена
+        self.__table=None
+        self.__table_src=None
+        #Кэш рассчитанных свойств
+        self.__res={}
+        self.__res_state=None
+    #
+    def get_subst_list(self):
+        '''Список веществ'''
+        #
+        return self.__subst_list
+    #
+    def get_temperatur(self):
+        '''Температура (объект класса temperature)'''
+        #
+        if self.__temperatur!=None:
+            return self.__temperatur
+        if self.__subst_list:
+            return self.__subst_list[0].get_parametr()['temperature']
+        return temperature(298)
+    #
+    def _table(self):
+        '''Таблица коэффициентов температурных интервалов веществ
+        Формат возвращаемых данных: словарь {<поле>:<массив N x K>}
+        (для накопленных сумм 'cum_<вид>' - N x (K+1)), где K - наибольшее число интервалов.
+        Недостающие интервалы имеют границы inf, накопленные суммы дополняются последним значением.
+        Дополнительно: 'valid' - наличие данных, 'ordered' - упорядоченность интервалов,
+        'dh298', 'ds298' - стандартные значения'''
+        #
+        lst_iv=[sbs._intervals() for sbs in self.__subst_list]
+        src=[id(x) for x in lst_iv]
+        if (self.__table!=None)and(src==self.__table_src):
+            return self.__table
+        n=len(lst_iv)
+        kmax=max([len(iv['dt1']) for iv in lst_iv if iv]+[1])
+        tbl={x:np.full((n,kmax),np.inf) for x in ('dt1','dt2')}
+        for x in ('da','db','dc','dd'):
+            tbl[x]=np.zeros((n,kmax))
+        for x in ('cp','h','h_fp','s'):
+            tbl['cum_'+x]=np.zeros((n,kmax+1))
+        tbl['valid']=np.zeros(n,bool)
+        tbl['ordered']=np.zeros(n,bool)
+        tbl['dh298']=np.zeros(n)
+        tbl['ds298']=np.zeros(n)
+        for i,(sbs,iv) in enumerate(zip(self.__subst_list,lst_iv)):
+            if not iv:
+                continue
+            data=sbs._load_data()
+            k=len(iv['dt1'])
+            tbl['valid'][i]=True
+            tbl['ordered'][i]=iv['ordered']
+            tbl['dh298'][i]=data[0]["dh298"]
+            tbl['ds298'][i]=data[0]["ds298"]
+            for x in ('dt1','dt2','da','db','dc','dd'):
+                tbl[x][i,:k]=iv[x]
+            for x in ('cp','h','h_fp','s'):
+                tbl['cum_'+x][i,:k+1]=iv['cum_'+x]
+                tbl['cum_'+x][i,k+1:]=iv['cum_'+x][-1]
+        self.__table=tbl
+        self.__table_src=src
+        return tbl
+    #
+    def _piecewise_many(self,kinds,fp=False):
+        '''Расчет кусочно-заданных функций kinds ('cp','h','s') для всех веществ
+        (в Дж, без учета стехиометрических коэффициентов, см. subst._piecewise_many)
+        Формат возвращаемых данных: словарь {<вид>:<массив N x M>}'''
+        #
+        tbl=self._table()
+        temperatur=self.get_temperatur().get_value()
+        n,m=len(self.__subst_list),len(temperatur)
+        full_name={kind:('h_fp' if (kind=='h')and(fp==True) else kind) for kind in kinds}
+        res={kind:np.zeros((n,m)) for kind in kinds}
+        rows=np.nonzero(tbl['valid']&tbl['ordered'])[0]
+        if len(rows)>0:
+            dt1,dt2=tbl['dt1'][rows],tbl['dt2'][rows]
+            #Проверка значения > нижней границы первого температурного интервала
+            t=np.maximum(temperatur[np.newaxis,:],dt1[:,:1])
+            #Число полных интервалов и интервал, содержащий температуру
+            full,k=np.split(self._count_le(np.vstack((dt2,dt1)),temperatur,np.tile(dt1[:,0],2)),2)
+            k=k-1
+            part=t<np.take_along_axis(dt2,k,axis=1)
+            c={x:np.take_along_axis(tbl[x][rows],k,axis=1)[part] for x in ('dt1','da','db','dc','dd')}
+            partial=subst._partial(kinds,t[part],c)
+            for kind in kinds:
+                val=np.take_along_axis(tbl['cum_'+full_name[kind]][rows],full,axis=1)
+                for term in partial[kind]:
+                    val[part]+=term
+                res[kind][rows]=val
+        #Вещества с неупорядоченными интервалами
+        for i in np.nonzero(tbl['valid']&~tbl['ordered'])[0]:
+            val=self.__subst_list[i]._piecewise_many(kinds,fp)
+            for kind in kinds:
+                res[kind][i]=val[kind]
+        return res
+    #
+    @staticmethod
+    def _count_le(bounds,temperatur,lower):
+        '''Число границ bounds (массив N x K, недостающие - inf), не превышающих
+        max(<температура>,lower) для каждого значения temperatur (массив длины M)
+        lower - нижняя граница температуры для каждой строки (массив длины N)
+        Границы и температуры заменяются номерами в отсортированном массиве температур
+        (сравнение номеров точно совпадает со сравнением значений); номера границ всех строк,
+        сдвинутые на (M+1)*<номер строки>, подсчитываются одним вызовом bincount,
+        накопленная сумма по строке дает искомое число для каждого номера температуры
+        Формат возвращаемых данных: массив N x M'''
+        #
+        n=len(bounds)
+        ts=np.sort(temperatur)
+        step=len(ts)+1
+        #Номер границы: число температур меньше нее (0..M, M - больше всех температур),
+        #границы не выше lower учитываются для всех температур (номер 0)
+        keys=np.where(bounds<=lower[:,np.newaxis],0,np.searchsorted(ts,bounds))+np.arange(n)[:,np.newaxis]*step
+        counts=np.bincount(keys.ravel(),minlength=n*step).reshape(n,step)
+        counts=counts.cumsum(axis=1,dtype=np.int32 if bounds.shape[1]>127 else np.int8)
+        #Номер температуры: 0..M-1
+        return counts[:,np.searchsorted(ts,temperatur)]
+    #
+    def _state_key(self):
+        '''Состояние, от которого зависят рассчитанные свойства'''
+        #
+        tmp=self.get_temperatur()
+        return (id(tmp),tmp.version,get_full_precision(),tuple(self._koeff()),
+            tuple(id(sbs._intervals()) for sbs in self.__subst_list))
+    #
+    def _koeff(self):
+        '''Стехиометрические коэффициенты веществ, учитываемые в строках результатов
+        Формат возвращаемых данных: массив длины N'''
+        #
+        if self.molar:
+            return np.ones(len(self.__subst_list))
+        return np.array([sbs.st_koeff for sbs in self.__subst_list],float)
+    #
+    def _properties(self,names=('Cp','H','S','G')):
+        '''Расчет (или получение из кэша) матриц свойств names ('Cp','H','S','G')
+        с учетом стехиометрических коэффициентов веществ.
+        Рассчитываются только отсутствующие в кэше свойства'''
+        #
+        state=self._state_key()
+        if state!=self.__res_state:
+            self.__res,self.__res_state={},state
+        res=self.__res
+        need=set(x for x in names if x not in res)
+        if 'G' in need:
+            need.update(x for x in ('H','S') if x not in res)
+        if need:
+            kinds=[kind for name,kind in (('Cp','cp'),('H','h'),('S','s')) if name in need]
+            raw=self._piecewise_many(kinds)
+            tbl=self._table()
+            temperatur=self.get_temperatur().get_value()
+            st=self._koeff()[:,np.newaxis]
+            valid=tbl['valid'][:,np.newaxis]
+            if 'Cp' in need:
+                res['Cp']=to_round(raw['cp']*st/1000.0)
+            if 'H' in need:
+                h=np.where(valid,tbl['dh298'][:,np.newaxis]+to_round(raw['h']*st/1000.0),0.0)
+                res['H']=to_round(h*st)
+            if 'S' in need:
+                s=np.where(valid,tbl['ds298'][:,np.newaxis]/1000+to_round(raw['s']*st/1000.0),0.0)
+                res['S']=to_round(s*st)
+            if 'G' in need:
+                g=np.where(valid,res['H']-temperatur*res['S'],0.0)
+                res['G']=to_round(g*st)
+            for x in need:
+                res[x].flags.writeable=False
+        return res
+    #
+    def Cp_t(self):
+        '''Теплоемкость веществ (см. subst.Cp_t)
+        Формат возвращаемых данных: массив N x M'''
+        #
+        return self._properties(['Cp'])['Cp']
+    #
+    def entalp(self):
+        '''Энтальпия образования веществ (см. subst.entalp)
+        Формат возвращаемых данных: массив N x M'''
+        #
+        return self._properties(['H'])['H']
+    #
+    def entrop(self):
+        '''Энтропия образования веществ (см. subst.entrop)
+        Формат возвращаемых данных: массив N x M'''
+        #
+        return self._properties(['S'])['S']
+    #
+    def gibbs(self):
+        '''Энергия Гиббса образования веществ (см. subst.gibbs)
+        Формат возвращаемых данных: массив N x M'''
+        #
+        return self._properties(['G'])['G']
+    #
+    def gelmgolz(self):
+        '''Энергия Гельмгольца образования веществ (см. subst.gelmgolz)
+        Формат возвращаемых данных: массив N x M'''
+        #
+        global R_constant
+        temperatur=self.get_temperatur().get_value()
+        gas=np.array([(sbs.get_phase()=='g')*sbs.moll for sbs in self.__subst_list],float)
+        return to_round(self.gibbs()+R_constant*temperatur*gas[:,np.newaxis])
+    #
+    def chem_potential(self):
+        '''Химический потенциал веществ (см. subst.chem_potential)
+        Формат возвращаемых данных: массив N x M'''
+        #
+        global R_constant
+        temperatur=self.get_temperatur().get_value()
+        konz=np.array([sbs.moll_konz for sbs in self.__subst_list],float)
+        return to_round(self.gibbs()+R_constant*temperatur*np.log(konz)[:,np.newaxis])
+    #
+    def properties(self,names=('Cp','H','S','G')):
+        '''Набор свойств веществ
+        Формат возвращаемых данных: словарь {<свойство>:<массив N x M>}'''
+        #
+        names=[k for k in names if k in ('Cp','H','S','G')]
+        res=self._properties(names)
+        return {k:res[k] for k in names}
+#
+#
+class reaktion_lib(object):
+    '''Класс предназначен для расчета термодинамических характеристик
+    большого набора химических реакций, заданных строками.
+    Вещества всех реакций объединяются (каждое вещество создается и загружается
+    из базы данных один раз), свойства веществ рассчитываются одной матрицей
+    (termod_engine), характеристики реакций - произведением матрицы
+    стехиометрических коэффициентов (реакции x вещества) на матрицу свойств.'''
+    #
+    def __init__(self,lst_reaktion,newparametr,newtable,balance=False):
+        '''lst_reaktion - список строк с уравнениями реакций (см. to_stmatrix)
+        newparametr - Словарь, содержащий ссылки на параметры состояния
+        newtable - Словарь, содержащий ссылки на таблицы базы данных
+        balance=False - уравнивать коэффициенты реакций (см. balance_koeff)'''
+        #
+        self.__names=list(lst_reaktion)
+        #Вещества всех реакций {(<формула>,<фаза>):<номер>}
+        self.__subst_index={}
+        #Реакции: списки (<номера веществ>,<коэффициенты>)
+        self.__reakts=[]
+        for name in self.__names:
+            lst_idx,lst_koeff=[],[]
+            for koeff,formula,phase in to_stmatrix(name):
+                key=(formula,phase if phase in lst_phase else lst_phase[0])
+                if key not in self.__subst_index:
+                    self.__subst_index[key]=len(self.__subst_index)
+                lst_idx.append(self.__subst_index[key])
+                lst_koeff.append(koeff)
+            self.__reakts.append((lst_idx,lst_koeff))
+        self.__subst_keys=sorted(self.__subst_index,key=self.__subst_index.get)
+        #Создание веществ (данные всех веществ получаются одним запросом)
+        self.__subst_list=subst.from_many(self.__subst_keys,newparametr,newtable)
+        valid_subst=np.array([sbs.is_valid_subst() for sbs in self.__subst_list],bool)
+        #Уравнивание коэффициентов
+        self.__valid=np.array([len(idx)>0 and bool(valid_subst[idx].all()) for idx,k in self.__reakts],bool)
+        if balance:
+            for i,(idx,koeff) in enumerate(self.__reakts):
+                if not self.__valid[i]:
+                    continue
+                status,res=balance_koeff([self.__subst_keys[j][0] for j in idx],
+                    [self.__subst_list[j].get_subst_matrix() for j in idx],
+                    [self.__subst_keys[j][1] for j in idx])
+                if status=='ok':
+                    #Правило приведения коэффициентов то же, что в reaktion.koeff_calc
+                    res,self.__valid[i]=scale_koeff(res,koeff)
+                    self.__reakts[i]=(idx,[float(x) for x in res])
+                else:
+                    self.__valid[i]=False
+        #Матричный расчет мольных свойств веществ
+        self.__valid_subst=valid_subst
+        self.__engine=termod_engine([sbs for sbs,v in zip(self.__subst_list,valid_subst) if v],
+            self.__subst_list[0].get_parametr()['temperature'] if self.__subst_list else None,molar=True)
+        #Номера веществ в матрице свойств
+        self.__column=np.cumsum(valid_subst)-1
+    #
+    def get_names(self):
+        '''Список уравнений реакций'''
+        #
+        return self.__names
+    #
+    def get_subst(self):
+        '''Список веществ всех реакций [(<формула>,<фазовое состояние>),]'''
+        #
+        return self.__subst_keys
+    #
+    def is_valid(self):
+        '''Признаки правильности реакций (все вещества присутствуют в базе данных,
+        при balance=True - реакция уравнена)
+        Формат возвращаемых данных: массив логических значений'''
+        #
+        return self.__valid
+    #
+    def get_temperatur(self):
+        '''Температура (объект класса temperature)'''
+        #
+        return self.__engine.get_temperatur()
+    #
+    def get_stmatrix(self,start=0,stop=None):
+        '''Матрица стехиометрических коэффициентов реакций start..stop-1
+        (реакции x вещества с данными в базе данных)'''
+        #
+        stop=len(self.__reakts) if stop==None else min(stop,len(self.__reakts))
+        res=np.zeros((max(stop-start,0),int(self.__valid_subst.sum())))
+        for i in range(start,stop):
+            if self.__valid[i]:
+                idx,koeff=self.__reakts[i]
+                np.add.at(res[i-start],self.__column[idx],koeff)
+        return res
+    #
+    def _calc(self,names,start,stop):
+        '''Характеристики реакций start..stop-1 (см. calc)'''
+        #
+        global R_constant
+        unknown=[x for x in names if x not in ('H','S','G','lnK')]
+        if unknown:
+            raise ValueError('Неизвестные характеристики реакций: {0}'.format(', '.join(map(str,unknown))))
+        props=self.__engine.properties([x for x in ('H','S','G') if (x in names)or((x=='G')and('lnK' in names))])
+        temperatur=self.get_temperatur().get_value()
+        matrix=self.get_stmatrix(start,stop)
+        valid=self.__valid[start:stop]
+        res={}
+        for name in ('H','S','G'):
+            if name in props:
+                res[name]=to_round(np.dot(matrix,props[name]))
+        if 'lnK' in names:
+            res['lnK']=to_round(-res['G']*1000/temperatur/R_constant)
+        res={k:res[k] for k in names}
+        for x in res.values():
+            x[~valid]=np.nan
+        return res
+    #
+    def calc(self,names=('H','S','G','lnK')):
+        '''Расчет характеристик всех реакций для всех значений температуры
+        names - характеристики: 'H' - энтальпия, 'S' - энтропия, 'G' - энергия Гиббса,
+            'lnK' - логарифм константы равновесия
+        Для неправильно заданных реакций значения - nan,
+        для неизвестной характеристики - исключение ValueError
+        Формат возвращаемых данных: словарь {<характеристика>:<массив реакции x температуры>}'''
+        #
+        return self._calc(names,0,len(self.__reakts))
+    #
+    def iter_calc(self,names=('H','S','G','lnK'),chunk_size=1000):
+        '''Потоковый расчет характеристик реакций частями по chunk_size реакций
+        (для больших наборов реакций; см. calc)
+        Генератор кортежей (<номер первой реакции части>,{<характеристика>:<массив>})'''
+        #
+        for start in range(0,len(self.__reakts),chunk_size):
+            yield start,self._calc(names,start,start+chunk_size)
+#
+#
+class termod_store(object):
+    '''Класс хранит таблицу термодинамических свойств (term-base) в памяти
+    в виде массивов NumPy (по одному массиву на поле).
+    Записи отсортированы по формуле вещества с сохранением порядка
+    температурных интервалов; для каждой формулы хранится диапазон строк.
+    Таблица загружается из базы данных один раз и используется всеми веществами.'''
+    #
+    def __init__(self,tbl):
+        '''tbl - ссылка на таблицу термодинамических свойств (объект tables)'''
+        #
+        self.__table=tbl
+        self.load()
+    #
+    def load(self):
+        '''Загрузка (перезагрузка) таблицы из базы данных'''
+        #
+        rows=[]
+        for chunk in self.__table.iter_select('1=1',lst_termod_filds,chunks=True):
+            rows.extend(chunk)
+        cols=list(zip(*rows)) if rows else [()]*len(lst_termod_filds)
+        col={k:v for k,v in zip(lst_termod_filds,cols)}
+        #Сортировка по формуле (устойчивая - порядок интервалов сохраняется)
+        names=np.array(col['subst'],dtype=object)
+        order=np.argsort(names.astype(str),kind='stable') if len(names)>0 else np.zeros(0,int)
+        self.subst=names[order]
+        self.phase=np.array(col['phase'],dtype=object)[order]
+        #Числовые поля
+        self.columns={}
+        for k in lst_termod_filds:
+            if k in ('subst','phase'):
+                continue
+            self.columns[k]=np.array([np.nan if x==None else x for x in col[k]],float)[order]
+        #Индекс {<формула>:(<первая строка>,<последняя строка+1>)}
+        self.__index={}
+        if len(self.subst)>0:
+            frm,first=np.unique(self.subst.astype(str),return_index=True)
+            last=list(first[1:])+[len(self.subst)]
+            self.__index={f:(int(a),int(b)) for f,a,b in zip(frm,first,last)}
+        return len(self.subst)
+    #
+    def has(self,formula):
+        '''Наличие вещества formula в хранилище'''
+        #
+        return formula in self.__index
+    #
+    def names(self):
+        '''Множество формул веществ'''
+        #
+        return set(self.__index.keys())
+    #
+    def get_range(self,formula):
+        '''Диапазон строк вещества formula: кортеж (<начало>,<конец>) или None'''
+        #
+        return self.__index.get(formula)
+    #
+    def get_arrays(self,formula):
+        '''Данные о веществе formula в виде словаря массивов {<поле>:<массив по интервалам>}
+        Возвращает False при отсутствии вещества'''
+        #
+        rng=self.__index.get(formula)
+        if rng==None:
+            return False
+        res={k:v[rng[0]:rng[1]] for k,v in self.columns.items()}
+        res['subst']=self.subst[rng[0]:rng[1]]
+        res['phase']=self.phase[rng[0]:rng[1]]
+        return res
+    #
+    def get_rows(self,formula):
+        '''Данные о веществе formula в формате get_termod_info (список словарей)
+        Возвращает False при отсутствии вещества'''
+        #
+        rng=self.__index.get(formula)
+        if rng==None:
+            return False
+        res=[]
+        for i in range(rng[0],rng[1]):
+            row={k:(None if np.isnan(v[i]) else float(v[i])) for k,v in self.columns.items()}
+            row['subst']=self.subst[i]
+            row['phase']=self.phase[i]
+            res.append({k:row[k] for k in lst_termod_filds})
+        return res
+#
+#
+class subst_index(object):
+    '''Класс хранит множество названий веществ таблицы термодинамических свойств.
+    Множество строится при первом обращении и используется всеми веществами.
+    Сброс выполняется явно (invalidate) либо, при auto_check=True,
+    при изменении данных БД (PRAGMA data_version)'''
+    #
+    def __init__(self,tbl,auto_check=False):
+        '''tbl - ссылка на таблицу термодинамических свойств (объект tables)
+        auto_check=False - проверять изменение данных БД при каждом обращении'''
+        #
+        self.__table=tbl
+        self.auto_check=auto_check
+        self.__names=None
+        self.__version=None
+    #
+    def invalidate(self):
+        '''Сброс индекса (будет построен заново при следующем обращении)'''
+        #
+        self.__names=None
+    #
+    def get_names(self):
+        '''Множество названий веществ (frozenset)'''
+        #
+        if self.auto_check:
+            version=self.__table.data_version()
+            if version!=self.__version:
+                self.__names=None
+                self.__version=version
+        if self.__names==None:
+            res=self.__table.group_by(['subst'],[])
+            self.__names=frozenset(x[0] for x in res) if res else frozenset()
+        return self.__names
+    #
+    def has(self,formula):
+        '''Наличие вещества formula в базе данных'''
+        #
+        return formula in self.get_names()
+#
+#
+class chemstring(object):
+    '''Класс объединяет методы обработки и синтаксического анализа строк
+     для последующего применения при создании химических объектов'''
+    #
+    def __init__(self):
+        print('f')
+
+#
+class chem_table(object):
+    def __init__(self,tbl=None):
+        '''Метод создает объект таблицы
+        '''
+        #
+        self.__fldname={}
+        self.__filds=[]
+        self.set_database(tbl)
+    #
+    def set_database(self,dict_tbl=None):
+        '''Метод устанавливает  ссылки на таблицы
+        с информацией об элементах и проверяет их структуру
+        Параметры:
+            dict_tbl - Словарь, содержащий ссылки на таблицы
+            Формат словаря: {'mend-table':<tables>}
+        Значения словаря по умолчанию: None'''
+        #
+        self.DataTable={}.fromkeys(['mend-table'])
+        if isinstance(dict_tbl,dict):
+            new_dict_tbl={k:v for k,v in dict_tbl.items() if isinstance(v,db.tables)}
+            self.DataTable={k:v for k,v in new_dict_tbl.items() if k in self.DataTable}
+            #
+            self.__fldname['num']='номер'
+            self.__fldname['name']='Название'
+            self.__fldname['smb']='Символ'
+            self.__fldname['latname']='Латинское название'
+            self.__fldname['period']='Период'
+            self.__fldname['grp']='Группа'
+            self.__fldname['mass']='Атомная масса(г/моль)'
+            self.__fldname['ro']='Плотность,г/см (при 20 град C)'
+            self.__fldname['tpl']='Температура плавления ( град C)'
+            self.__fldname['tkip']='Температура кипения (град C)'
+            self.__fldname['year']='Год открытия'
+            self.__fldname['fml']='Первооткрыватель'
+            self.__fldname['name1']='Произношение'
+            self.__fldname['coment']='Коментарий'
+            #
+            self.__filds=list(self.__fldname.keys())
+            #
+    #
+    def get_elementlist(self):
+        '''Метод возвращает множество символов элементов'''
+        return {x[0] for x in self.DataTable['mend-table'].select('1=1','smb')}
+    #
+    def get_numlist(self):
+        '''Метод возвращает множество номеров элементов'''
+        return {x[0] for x in self.DataTable['mend-table'].select('1=1','num')}
+    #
+    def iselement(self,smb):
+        '''Возвращает True, если значение smb соответствует химическому элементу.
+        Параметры:
+            smb - символ (номер) элемента'''
+        #
+        return True if(smb in self.get_elementlist())or(smb in self.get_numlist()) else False
+    #
+    def get_attrinfo(self):
+        '''Метод возвращает словарь атрибутов элемента
+        Формат возвращаемых данных:
+            {<поле>:<имя атрибута>,}'''
+        #
+        return self.__fldname
+    #
+    def get_fldlist(self):
+        '''Метод возвращает список полей таблицы свойств элементов'''
+        #
+        return self.__filds
+    #
+    def get_period(self,period):
+        '''Возвращает список элементов периода.
+        Параметры:
+            period - номер периода'''
+        #
+        res=self.DataTable['mend-table'].select([('period','=',period)],['num','smb'])
+        if res:
+            res=[x[1] for x in sorted(res,key=lambda x: x[0])]
+        else:
+            res=None
+        return  res
+    #
+    def get_group(self,grp):
+        '''Метод возвращает список элементов группы.
+        Параметры:
+            grp - номер группы'''
+        #
+        res=self.DataTable['mend-table'].select([('grp','=',grp)],['num','smb'])
+        if res:
+            res=[x[1] for x in sorted(res,key=lambda x: x[0])]
+        return  res
+    #
+    def get_attrvalue(self,elem=None,attr=None):
+        '''Метод возвращает значение атрибута элемента.
+         Параметры:
+            elem - символ (номер) элемента
+            attr - аттрибут
+            Список значений:
+                num - номер
+                name - Название
+                smb - Символ
+                latname - Латинское название
+                period - Период
+                grp - Группа
+                mass - Атомная масса(г/моль)
+                ro - Плотность,г/см (при 20 град C)
+                tpl - Температура плавления ( град C)
+                tkip - Температура кипения (град C)
+                year - Год открытия
+                fml - Первооткрыватель
+                name1 - Произношение
+                coment - Коментарий
+        '''
+        #
+        if((attr in self.__filds)and(self.iselement(elem))):
+            fld='smb' if isinstance(elem,str) else 'num'
+            q=self.DataTable['mend-table'].select([(fld,'=',elem)],[attr])
+            res=q[0][0]
+        else:
+            res=None
+        return res
+    #
+    def get_element(self,elem,lstattr='*'):
+        '''Метод позволяет получить информацию об элементе
+         по его символу или номеру. Возвращает словарь вида:
+            {<атрибут>:<значение>,}
+         Параметры:
+            elem - символ (номер) элемента
+            lstattr - аттрибуты, которые необходимы (по умолчанию выдаются все)
+            Список атрибутов:
+                num - номер
+                name - Название
+                smb - Символ
+                latname - Латинское название
+                period - Период
+                grp - Группа
+                mass - Атомная масса(г/моль)
+                ro - Плотность,г/см (при 20 град C)
+                tpl - Температура плавления ( град C)
+                tkip - Температура кипения (град C)
+                year - Год открытия
+                fml - Первооткрыватель
+                name1 - Произношение
+                coment - Коментарий
+            '''
+        #
+        if isinstance(lstattr,list):
+            lst=[attr for attr in lstattr if attr in self.__filds]
+            if len(lst)==0:
+                lst=self.__filds
+        else:
+            lst=self.__filds
+        #
+        if self.iselement(elem):
+            fld='smb' if isinstance(elem,str) else 'num'
+            q=self.DataTable['mend-table'].select([(fld,'=',elem)],lst)
+            res={self.__fldname[k]:v for k,v in zip(lst,q[0])}
+        else:
+            res=None
+        return res
+    #
+    def get_table(self):
+        '''Метод возвращает структуру таблицы Менделеева.
+        Список списков вида:
+            [[{элемент 1},...<элементы 1-го периода>],
+             [{элемент 1},...<элементы 2-го периода>],
+            ...
+             [{элемент 1},...<элементы 7-го периода>]]
+        '''
+        #
+        res=[]
+        p=1
+        period=self.get_period(p)
+        while period!=None:
+            res.append(period)
+            p+=1
+            period=self.get_period(p)
+        return res
+    #
+    def get_attrtable(self,attr):
+        '''Метод возвращает таблицу одного из свойств для всех веществ.
+        Список списков вида:
+            {<элемент>:<значение свойства>,}
+        Параметры:
+            attr - свойства, которые необходимы (по умолчанию выдаются все)
+            Список атрибутов:
+                mass - Атомная масса(г/моль)
+                ro - Плотность,г/см (при 20 град C)
+                tpl - Температура плавления ( град C)
+                tkip - Температура кипения (град C)
+        '''
+        if attr in self.__filds:
+             res={x[0]:x[1] for x in self.DataTable['mend-table'].select('1=1',['smb',attr])}
+        else:
+            res={}
+        return res
+    #
+
+    def molar_mass(self,el_matrix):
+        '''Метод возвращает молярную массу комбинации элементов.
+        Параметры:
+            el_matrix - элементная матрица. Словарь вида:
+                {<Символ элемента>:<индекс>, }
+        '''
+        #
+        if isinstance(el_matrix,dict):
+            lst=1
+            new_matrix={k:v for k,v in el_matrix.items() if((self.iselement(k))and((isinstance(v,int))or(isinstance(v,float))))}
+        if len(new_matrix)>0:
+            res=np.sum([self.get_attrvalue(k,'mass')*v for k,v in new_matrix.items()])
+        return res
+    #
+    def molar_volume(self,elem):
+        '''Метод возвращает молярный объем элемннта
+        Параметры:
+            elem - символ или номер элемента'''
+        #
+        res=None
+        if self.iselement(elem):
+            ro,mass=self.get_attrvalue(elem,'ro'),self.get_attrvalue(elem,'mass')
+            if(ro>0)and(ro!=None):
+                res=mass/ro
+        return res
+    #
+#
+#
+#
+class chem_parametr(object):
+    '''Класс хранит информацию связанную с параметром
+    (температура, давление, объем, площадь)
+    В самом общем случае объект класса представляет интервал значений
+     с заданными единицами измерения'''
+    #
+    def __init__(self,name,units,value=None,standart_value=None):
+        self.__name=name
+        self.__units=units
+        self.__lstunits=[]
+        self.__standartvalue=standart_value
+        #Версия значения (увеличивается при каждом изменении)
+        self.version=0
+        self.set_value(value)
+    #
+    def get_value(self):
+        '''Набор значений параметра'''
+        #
+        return self.__value
+    #
+    def get_name(self):
+        '''Название параметра'''
+        #
+        return self.__name
+    #
+    def set_lstunits(self,newlist):
+        '''Метод устанавливает список значений параметра'''
+        #
+        if isinstance(newlist,list):
+            self.__lstunits=newlist
+    #
+    def get_lstunits(self):
+        '''Метод возвращает список значений параметра'''
+        #
+        return self.__lstunits
+    #
+    def get_units(self):
+        '''Единица измерения'''
+        #
+        return self.__units
+    #
+    def set_units(self,newunits):
+        '''Установить новую единицу измерения'''
+        #
+        old=self.get_units()
+        if (old!=newunits)and(newunits in self.get_lstunits()):
+            self.__units=newunits
+    #
+    def get_parametr(self):
+        '''Основные характеристики области определения параметра'''
+        #
+        return {'min':self.__minvalue,'max':self.__maxvalue,'step':self.__stepvalue,'standart_value':self.__standartvalue}
+    #
+    def set_value(self,value):
+        '''Установка значения параметра'''
+        #
+        self.version+=1
+        if isinstance(value,list):
+            self.__minvalue=value[0]
+            self.__maxvalue=value[1]
+            self.__stepvalue=value[2]
+            self.__value=np.arange(self.__minvalue,self.__maxvalue,self.__stepvalue,float)
+        elif(isinstance(value,int))or(isinstance(value,float)):
+            self.__minvalue=value
+            self.__maxvalue=value
+            self.__stepvalue=0
+            self.__value=np.array([value],float)
+        elif isinstance(value,np.ndarray):
+            self.__stepvalue=1
+            self.__value=np.array(value,float)
+            self.__minvalue=np.min(self.__value)
+            self.__maxvalue=np.max(self.__value)
+        else:
+            self.__minvalue=0
+            self.__maxvalue=0
+            self.__stepvalue=0
+            self.__value=np.zeros(1)
+    #
+    def get_info(self):
+        '''Общая информация о параметре'''
+        #
+        return {'name':self.__name,'units':self.__units,'value':self.__value,'standart_value':self.__standartvalue}
+    #
+    def get_size(self):
+        '''Количество значений в интервале'''
+        #
+        return np.size(self.__value)
+    #
+    def add_value(self,add=0):
+        '''Добавить к значениям параметра число'''
+        #
+        self.version+=1
+        self.__value+=add
+        self.__standartvalue+=add
+        self.__minvalue=self.__value[0]
+        self.__maxvalue=self.__value[-1]
+
+        self.__stepvalue=(self.__maxvalue-self.__minvalue)/(np.size(self.__value)-1)
+        return self.__value
+    #
+    def mul_value(self,mul):
+        '''Умножить значение на одно число'''
+        #
+        self.version+=1
+        self.__value=self.__value*mul
+        self.__standartvalue*=mul
+        self.__minvalue=self.__value[0]
+        self.__maxvalue=self.__value[-1]
+        self.__stepvalue=(self.__maxvalue-self.__minvalue)/(np.size(self.__value)-1)
+    #
+#,temperature, pressure, volume, area
+class temperature(chem_parametr):
+    '''Параметр температура'''
+    #
+    def __init__(self,value):
+        chem_parametr.__init__(self,'temperatur','K',value,298)
+        self.set_lstunits(['K','C','F'])
+    def set_units(self,newunits):
+        '''Установить единицу измерения newunits
+        Значения:
+            'K' - Кельвин
+            'C' - градус Цельсия
+            'F' - градус Фаренгейта'''
+        #
+        old=self.get_units()
+        #
+        if(old=='K')and(newunits=='C'):
+            self.add_value(-273)
+        elif(old=='C')and(newunits=='K'):
+            self.add_value(273)
+        if(old=='C')and(newunits=='F'):
+            self.mul_value(9/5)
+            self.add_value(32)
+        elif(old=='F')and(newunits=='C'):
+            self.add_value(-32)
+            self.mul_value(5/9)
+        super().set_units(newunits)
+    #
+#
+#
+#
+class pressure(chem_parametr):
+    '''Параметр давление'''
+    #
+    def __init__(self,value):
+        chem_parametr.__init__(self,'pressure','Pa',value,100000)
+        self.set_lstunits(['Pa','bar','at'])
+    #
+    def set_units(self,newunits):
+        '''Установить единицу измерения newunits
+        Значения:
+            'Pa' - Паскаль
+            'bar' - Бар
+            'at' - атмосфера'''
+        #
+        old=self.get_units()
+        #
+        if(old=='Pa')and(newunits=='bar'):
+            self.mul_value(0.00001)
+        elif(old=='bar')and(newunits=='Pa'):
+            self.mul_value(100000)
+        if(old=='Pa')and(newunits=='at'):
+            self.mul_value(1/101325)
+        elif(old=='at')and(newunits=='Pa'):
+            self.mul_value(101325)
+        super().set_units(newunits)
+    #
+    def get_value_pa(self):
+        '''Значение давления в Па (независимо от текущей единицы измерения)'''
+        #
+        mul={'Pa':1.0,'bar':100000.0,'at':101325.0}.get(self.get_units(),1.0)
+        return np.asarray(self.get_value(),float)*mul
+    #
+#
+#
+#
+class volume(chem_parametr):
+    '''Объем'''
+    #
+    def __init__(self,value):
+        chem_parametr.__init__(self,'volume','m3',value,1)
+    #
+#
+#
+class area(chem_parametr):
+    '''Площадь'''
+    #
+    def __init__(self,value):
+        chem_parametr.__init__(self,'area','m2',value,1)
+    #
+#
+#Функции
+#
+def getsumbols(frm):
+    '''Функция позволяет получить список символов для матрицы элементов
+    frm - строка формула вещества'''
+    #
+    result=[]
+    uk={'root':result,'this':result,'history':[result]}
+    #
+    grpur=0
+    grpind=0
+    #
+    for s in frm:
+        if s.isupper():
+            if len(uk['history'])-grpur+1>2:
+                uk['history'].pop(-1)
+                uk['this']=uk['history'][-1]
+            uk['this'].append([])
+            uk['this']=uk['this'][-1]
+            uk['history'].append(uk['this'])
+            uk['this'].append(s)
+        elif s.islower():
+            uk['this'].append(s)
+        elif s.isdigit():
+            uk['this'].append(s)
+        elif(s=='(')or(s=='['):
+            if len(uk['history'])>1:
+                uk['history'].pop(-1)
+                uk['this']=uk['history'][-1]
+            uk['this'].append([])
+            uk['this']=uk['this'][-1]
+            uk['history'].append(uk['this'])
+            grpur+=1
+        elif(s==')')or(s==']'):
+            uk['history'].pop(-1)
+            uk['this']=uk['history'][-1]
+            grpur-=1
+    #
+    if(grpur!=0):
+        msg_error={'error':True,'typeerror':'syntaxis'}
+    return result
+#
+def gettreematrix(lstsumbols):
+    '''Метод позволяет получить структурированную элементную матрицу для вещества
+    lstsumbols - список симвлов, подготовленный функцией getsumbols(frm)'''
+    #
+    result=[]
+    str_el=''
+    str_ind=''
+    for el in lstsumbols:
+        if isinstance(el,list):
+            result.append(gettreematrix(el))
+        elif isinstance(el,str):
+            if el.isalpha():
+                str_el+=el
+            elif el.isdigit():
+                str_ind+=el
+    if str_ind=='':
+        str_ind=1
+    else:
+        str_ind=int(str_ind)
+    if str_el=='':
+        result.append(str_ind)
+    else:
+        result.extend([str_el,str_ind])
+    return result
+#
+def getsimplifymatrix(lstfrm):
+    '''Функция для получения упрощенной элементной матрицы
+    lstfrm - древовидная матрица, подготовленная функцией gettreematrix()'''
+    #
+    result={}
+    if isinstance(lstfrm[0],list):
+        add=map(lambda els:getsimplifymatrix(els[0:-1]+[els[-1]*lstfrm[-1]]),lstfrm[0:-1])
+        for frm in add:
+            for k,v in frm.items():
+                if k in result:
+                    result[k]+=v
+                else:
+                    result[k]=v
+
+    elif isinstance(lstfrm[0],str):
+        result={lstfrm[0]:lstfrm[-1]}
+    return result
+#
+def to_substmatrix(frm,tp=1):
+    '''Функция для получения элементной матрицы вещества
+    возвращает словарь {<элемент>:<индекс>}
+    frm - формула вещества
+    tp - тип матрицы
+        tp=1 - упрощенная
+        tp=2 - древовидная'''
+    #
+    if tp==1:
+        return getsimplifymatrix(gettreematrix(getsumbols(frm)))
+    else:
+        return gettreematrix(getsumbols(frm))
+#
+def to_formula(frm,prn_format='html'):
+    '''Возвращает html представление формулы вещества
+    frm - строка формулы вещества ('Fe2O3','Fe2(SO4)3',...)
+    prn_format - параметр, определяющий представление фомулы ('html', 'tex', 'txt')'''
+    #
+    if prn_format=='txt':
+        res=frm.strip()
+    else:
+        if prn_format=='html':
+            sep_begin='<sub>'
+            sep_end='</sub>'
+        elif prn_format=='tex':
+            sep_begin='_{'
+            sep_end='}'
+        #
+        sumbols=list(frm+' ')
+        res=''
+        i_begin=0
+        i_end=len(sumbols)-1
+        for i in range(i_begin,i_end):
+            s1=sumbols[i]
+            s2=sumbols[i+1]
+            if (not s1.isdigit())and(s2.isdigit()):
+                res+=s1+sep_begin
+            elif(s1.isdigit())and(not s2.isdigit()):
+                res+=s1+sep_end
+            else:
+                res+=s1
+    return res
+#
+def get_store(tbl,create=True):
+    '''Функция возвращает общее для процесса хранилище термодинамических данных
+    (termod_store) для таблицы tbl
+    tbl - ссылка на таблицу термодинамических свойств (объект tables)
+    create=True - загрузить хранилище, если оно еще не создано
+    (при create=False возвращает None для незагруженной таблицы)'''
+    #
+    if not isinstance(tbl,db.tables):
+        return None
+    key=(tbl.dbname,tbl.get_name())
+    if (key not in dict_stores)and(create):
+        dict_stores[key]=termod_store(tbl)
+    return dict_stores.get(key)
+#
+def get_subst_index(tbl,auto_check=None):
+    '''Функция возвращает общий для процесса индекс названий веществ (subst_index)
+    для таблицы tbl
+    auto_check=None - изменить режим проверки изменения данных БД (True/False)'''
+    #
+    key=(tbl.dbname,tbl.get_name())
+    if key not in dict_subst_index:
+        dict_subst_index[key]=subst_index(tbl)
+    if auto_check!=None:
+        dict_subst_index[key].auto_check=auto_check
+    return dict_subst_index[key]
+#
+def to_datatable(dict_tbl):
+    '''Функция отбирает из словаря dict_tbl ссылки на таблицы с термодинамической информацией
+    (формат словаря - см. subst.set_database)
+    Формат возвращаемых данных: словарь {<ключ таблицы>:<tables или termod_store>}'''
+    #
+    res={}.fromkeys(['term-base','term-name-fld','term-ellingem','term-ellingem-name'])
+    if isinstance(dict_tbl,dict):
+        new_dict_tbl={k:v for k,v in dict_tbl.items() if isinstance(v,db.tables)}
+        res={k:v for k,v in new_dict_tbl.items() if k in res}
+        if isinstance(dict_tbl.get('term-store'),termod_store):
+            res['term-store']=dict_tbl['term-store']
+    return res
+#
+def get_datatable_store(datatable):
+    '''Функция возвращает хранилище термодинамических данных (termod_store) для набора
+    таблиц datatable (результат to_datatable) или None'''
+    #
+    if 'term-store' in datatable:
+        return datatable['term-store']
+    if 'term-base' in datatable:
+        return get_store(datatable['term-base'],False)
+    return None
+#
+def get_fld_names(datatable,lst_filds=lst_termod_filds):
+    '''Функция запрашивает названия полей основной таблицы термодинамических свойств
+    datatable - набор таблиц (результат to_datatable)
+    Формат возвращаемых данных: словарь {<имя поля в таблице>:<полное название поля>}'''
+    #
+    if datatable.get('term-name-fld'):
+        fld_nm=datatable['term-name-fld'].select(filds=['fld_name','fld_full_name'])
+    else:
+        fld_nm=[[x,x] for x in lst_filds]
+    return {x[0]:x[1] for x in fld_nm}
+#
+def get_termod_data(datatable,formulas):
+    '''Функция получает данные о веществах formulas из хранилища termod_store
+    или из таблицы 'term-base' запросами WHERE subst IN (...) по in_chunk_size формул
+    datatable - набор таблиц (результат to_datatable)
+    Формат возвращаемых данных: словарь {<формула>:<список словарей (см. subst.get_termod_info)>}
+    (False для веществ, отсутствующих в базе данных)'''
+    #
+    formulas=list(dict.fromkeys(formulas))
+    store=get_datatable_store(datatable)
+    if store!=None:
+        return {frm:store.get_rows(frm) for frm in formulas}
+    res={frm:[] for frm in formulas}
+    if 'term-base' in datatable:
+        for i in range(0,len(formulas),in_chunk_size):
+            rows=datatable['term-base'].select([('subst','in',formulas[i:i+in_chunk_size])],lst_termod_filds)
+            for t_res in rows or []:
+                res[t_res[0]].append({k:v for k,v in zip(lst_termod_filds,t_res)})
+    return {k:(v if v else False) for k,v in res.items()}
+#
+def create_indexes(dict_tbl):
+    '''Функция создает рекомендуемые индексы (dict_indexes) для таблиц базы данных
+    dict_tbl - Словарь, содержащий ссылки на таблицы
+        {'term-base':<tables>,'term-name-fld':<tables>,'mend-table':<tables>}
+    Возвращает список имен созданных индексов'''
+    #
+    res=[]
+    if isinstance(dict_tbl,dict):
+        for k,tbl in dict_tbl.items():
+            if (k in dict_indexes)and(isinstance(tbl,db.tables)):
+                for filds in dict_indexes[k]:
+                    index_name=tbl.create_index(filds)
+                    if index_name:
+                        res.append(index_name)
+    return res
+#
+def to_stmatrix(name=None,tp=1):
+    '''Функция, преобразующая строку с описанием реакции в стехеометрическую матрицу
+    name - строка - представление реакции
+    tp - параметр, определяющий тип выводимой матрицы
+        tp=1 список кортежей [(<коэффициент>,<формула>,<фаза>),]
+        tp=2 - словарь {<формула>:<коэффициент>,}'''
+    #
+    res=[]
+    if isinstance(name,str):
+        if name.count('=')==1:
+            clear_name=name.replace(',','.').replace(' ','').split('=')
+            left_subst,right_subst=(s.split('+') for s in clear_name)
+            lst_subst=['-'+s for s in left_subst]+right_subst
+            for frm in lst_subst:
+                k=0
+                while(frm[k] not in string.ascii_uppercase):
+                    k+=1
+                if(frm[:k]=='-'):
+                    koeff=-1
+                elif(frm[:k]==''):
+                    koeff=1
+                else:
+                    koeff=float(frm[:k])
+                #
+                p=-1
+                if frm[p]==')':
+                    while(frm[p]!='('):
+                        p-=1
+                    phase=frm[p:].replace('(','').replace(')','')
+                else:
+                    phase=None
+                    p=len(frm)
+                #
+                formula=frm[k:p]
+                res.append((koeff,formula,phase))
+            #
+            if tp==2:
+                res={el[1]:el[0] for el in res}
+
+    return res
+#
+@functools.lru_cache(maxsize=1024)
+def null_space(rows,n):
+    '''Базис нулевого пространства матрицы rows (кортеж строк длины n),
+    найденный точным приведением в рациональных числах
+    Формат возвращаемых данных: кортеж векторов (кортежей наименьших целых чисел);
+    для каждого свободного столбца вектор содержит 1 в этом столбце и 0 в остальных свободных столбцах'''
+    #
+    rows=[[fractions.Fraction(x).limit_denominator(1000000) for x in row] for row in rows]
+    #Приведение к ступенчатому виду
+    pivots=[]
+    r=0
+    for c in range(n):
+        p=next((i for i in range(r,len(rows)) if rows[i][c]!=0),None)
+        if p==None:
+            continue
+        rows[r],rows[p]=rows[p],rows[r]
+        rows[r]=[x/rows[r][c] for x in rows[r]]
+        for i in range(len(rows)):
+            if (i!=r)and(rows[i][c]!=0):
+                f=rows[i][c]
+                rows[i]=[x-f*y for x,y in zip(rows[i],rows[r])]
+        pivots.append(c)
+        r+=1
+    res=[]
+    for free in [c for c in range(n) if c not in pivots]:
+        #Вектор нулевого пространства, приведенный к наименьшим целым числам
+        vec=[fractions.Fraction(0)]*n
+        vec[free]=fractions.Fraction(1)
+        for i,c in enumerate(pivots):
+            vec[c]=-rows[i][free]
+        lcm=1
+        for x in vec:
+            lcm=lcm*x.denominator//math.gcd(lcm,x.denominator)
+        vec=[int(x*lcm) for x in vec]
+        gcd=0
+        for x in vec:
+            gcd=math.gcd(gcd,x)
+        res.append(tuple(x//gcd for x in vec))
+    return tuple(res)
+#
+@functools.lru_cache(maxsize=1024)
+def balance_basis(key):
+    '''Уравнивание реакции по ключу - отсортированному кортежу
+    (<формула>,<фаза>,<кортеж пар (<элемент>,<индекс>)> или None) (см. balance_koeff);
+    при None элементная матрица вычисляется по формуле (to_substmatrix)
+    Формат возвращаемых данных: кортеж (<результат>,<кортеж целых коэффициентов>)'''
+    #
+    matrix=[to_substmatrix(frm) if mtr==None else dict(mtr) for frm,phs,mtr in key]
+    elems=sorted(set(el for x in matrix for el in x.keys()))
+    basis=null_space(tuple(tuple(x.get(el,0) for x in matrix) for el in elems),len(matrix))
+    if len(basis)==0:
+        return 'over',()
+    if len(basis)>1:
+        return 'under',()
+    return 'ok',basis[0]
+#
+def balance_koeff(forms,matrix=None,phases=None):
+    '''Уравнивание реакции: базис нулевого пространства элементной матрицы
+    (элементы x вещества), найденный точным приведением в рациональных числах.
+    forms - список формул веществ
+    matrix=None - список элементных матриц веществ (словари {<элемент>:<индекс>}),
+        по умолчанию to_substmatrix(<формула>)
+    phases=None - список фазовых состояний веществ
+    Результат кэшируется по отсортированному набору (<формула>,<фаза>,<элементная матрица>)
+    (balance_basis, не более 1024 реакций).
+    Формат возвращаемых данных: кортеж (<результат>,<список целых коэффициентов>)
+        результат: 'ok' - единственное уравнение реакции,
+        'over' - уравнивание невозможно (переопределенная система),
+        'under' - уравнение неоднозначно (несколько независимых реакций);
+        для 'over' и 'under' список коэффициентов пустой'''
+    #
+    if phases==None:
+        phases=['']*len(forms)
+    if matrix==None:
+        matrix=[None]*len(forms)
+    else:
+        matrix=[tuple(sorted(x.items())) for x in matrix]
+    order=sorted(range(len(forms)),key=lambda i:(forms[i],phases[i],matrix[i] or ()))
+    status,koeff=balance_basis(tuple((forms[i],phases[i],matrix[i]) for i in order))
+    res=[0]*len(forms)
+    for j,i in enumerate(order):
+        if koeff:
+            res[i]=koeff[j]
+    return status,(res if koeff else [])
+#
+def scale_koeff(koeff,st_koeff):
+    '''Приведение коэффициентов уравнения реакции (balance_koeff) к заданным:
+    направление реакции - по большинству знаков заданных коэффициентов,
+    величина - по заданному коэффициенту последнего вещества, входящего в уравнение
+    koeff - целые коэффициенты уравнения реакции
+    st_koeff - заданные коэффициенты (в том же порядке веществ)
+    Формат возвращаемых данных: кортеж
+        (<список коэффициентов>,<признак совпадения знаков с заданными>)'''
+    #
+    sign=np.sign(st_koeff)
+    if np.sum(np.sign(koeff)*sign)<0:
+        koeff=[-k for k in koeff]
+    last=max(i for i,k in enumerate(koeff) if k!=0)
+    factor=fractions.Fraction(abs(st_koeff[last])).limit_denominator(1000000)/abs(koeff[last])
+    res=[k*factor for k in koeff]
+    res=[int(k) if k.denominator==1 else float(k) for k in res]
+    return res,bool(np.all(np.sign(res)==sign))
+#
+def gibbs_min(a_matrix,b_vector,g_rt,gas,moll,inerts=0.0,log_p=0.0,tol=1e-10,max_iter=500):
+    '''Минимизация энергии Гиббса при заданных количествах элементов (метод RAND)
+    a_matrix - элементная матрица (элементы x вещества)
+    b_vector - количества элементов
+    g_rt - приведенные стандартные потенциалы веществ G/RT
+    gas - признаки газообразных веществ (идеальная газовая смесь); остальные вещества -
+        отдельные конденсированные фазы с активностью 1 (фаза может исчезать и появляться)
+    moll - начальное приближение (количества веществ)
+    inerts=0.0 - количество инертного газа
+    log_p=0.0 - логарифм давления, отнесенного к стандартному
+    tol - точность, max_iter - наибольшее число итераций
+    Расчет завершается, когда изменение количеств веществ не превышает tol*<количество элементов>,
+    а условие равновесия mu=A.T*pi выполняется для всех газов (включая следовые количества)
+    с точностью gibbs_mu_tol (кроме газов, количество которых уменьшилось до нижней границы gibbs_floor).
+    Пороговые значения задаются параметрами модуля gibbs_*.
+    Если газовая фаза неустойчива (без инертного газа), количества газов равны 0,
+    химические потенциалы газов рассчитываются по мольным долям
+    Формат возвращаемых данных: кортеж
+        (<равновесные количества веществ>,<приведенные химические потенциалы mu/RT>,
+        <признак сходимости (False - достигнуто max_iter итераций)>)'''
+    #
+    a_matrix=np.asarray(a_matrix,float)
+    b_vector=np.asarray(b_vector,float)
+    gas=np.asarray(gas,bool)
+    n_all=a_matrix.shape[1]
+    scale=max(b_vector.sum(),gibbs_floor)
+    #Элементы, отсутствующие в системе, и вещества, которые их содержат
+    absent=b_vector<=scale*gibbs_absent
+    used=~(a_matrix[absent]>0).any(axis=0)
+    a_matrix,b_vector=a_matrix[~absent][:,used],b_vector[~absent]
+    g_rt,gas=np.asarray(g_rt,float)[used],gas[used]
+    cond=~gas
+    n_el,n_gas,n_cond=len(b_vector),int(gas.sum()),int(cond.sum())
+    #Начальное приближение: газы - положительные количества
+    moll=np.asarray(moll,float)[used].copy()
+    moll[gas]=np.maximum(moll[gas],scale*gibbs_start)
+    moll[cond]=np.maximum(moll[cond],0.0)
+    active=moll[cond]>0
+    floor=scale*gibbs_floor
+    #
+    def potential(n):
+        '''Приведенные химические потенциалы веществ'''
+        #
+        mu=g_rt.copy()
+        if n_gas>0:
+            n_g=n[gas]
+            mu[gas]+=np.log(n_g/(n_g.sum()+inerts))+log_p
+        return mu
+    #
+    dict_basis={}
+    def basis(major):
+        '''Матрица перехода к базису элементов [U V] (строки - векторы базиса)
+        V - целочисленный базис векторов, для которых V*a=0 для элементных столбцов a основных
+        веществ major (равенство выполняется точно), U - ортонормированный базис линейной
+        оболочки этих столбцов. Уравнения баланса в строках V не содержат вкладов основных веществ,
+        поэтому количества следовых газов определяются без потери точности
+        (None - преобразование не требуется)'''
+        #
+        key=tuple(major)
+        if key not in dict_basis:
+            cols=a_matrix[:,major]
+            v=np.array(null_space(tuple(tuple(x) for x in cols.T.tolist()),n_el),float).reshape(-1,n_el)
+            if len(v)==0:
+                dict_basis[key]=None
+            else:
+                u=np.linalg.svd(cols)[0][:,:n_el-len(v)] if cols.size else np.zeros((n_el,0))
+                dict_basis[key]=np.vstack((u.T,v))
+        return dict_basis[key]
+    #
+    dict_rank={}
+    def rank(active):
+        '''Ранг элементной матрицы активных конденсированных фаз'''
+        #
+        key=tuple(active)
+        if key not in dict_rank:
+            dict_rank[key]=np.linalg.matrix_rank(a_matrix[:,cond][:,active]) if active.any() else 0
+        return dict_rank[key]
+    #
+    converged,gas_off,fresh=False,False,-1
+    accel=np.ones(n_gas)
+    for i in range(max_iter):
+        #Правило фаз: при наличии газовой фазы без инертного газа активные конденсированные
+        #фазы не могут содержать все элементы (система уравнений вырождена) - исключается
+        #фаза с наименьшим количеством, кроме последней появившейся (при устойчивости
+        #исключенная фаза появится снова)
+        if (n_gas>0)and(inerts<=0)and(moll[gas].sum()>scale*gibbs_trace)and(rank(active)==n_el):
+            drop=active.copy()
+            if (fresh>=0)and(drop.sum()>1):
+                drop[fresh]=False
+            m=np.nonzero(drop)[0][np.argmin(moll[cond][drop])]
+            active[m]=False
+            new_c=moll[cond]
+            new_c[m]=0.0
+            moll[cond]=new_c
+        n_g=moll[gas]
+        mu=potential(moll)
+        mu_g=mu[gas]
+        #Элементная матрица и количества элементов в базисе, выделяющем следовые газы
+        basic=np.zeros(len(moll),bool)
+        basic[gas]=n_g>scale*gibbs_trace
+        basic[cond]=active&(moll[cond]>scale*gibbs_trace)
+        t_basis=basis(basic)
+        if t_basis is None:
+            a_el,b_el=a_matrix,b_vector
+        else:
+            a_el,b_el=np.dot(t_basis,a_matrix),np.dot(t_basis,b_vector)
+        a_gas,a_cond=a_el[:,gas],a_el[:,cond]
+        #Система линейных уравнений для множителей Лагранжа pi,
+        #относительного изменения количества газа u и изменений количеств конденсированных веществ
+        size=n_el+1+n_cond
+        lhs=np.zeros((size,size))
+        rhs=np.zeros(size)
+        an=a_gas*n_g
+        b_gas=an.sum(axis=1)
+        lhs[:n_el,:n_el]=np.dot(an,a_gas.T)
+        lhs[:n_el,n_el]=b_gas
+        lhs[:n_el,n_el+1:]=a_cond*active
+        rhs[:n_el]=b_el-np.dot(a_el,moll)+np.dot(an,mu_g)
+        if n_gas>0:
+            lhs[n_el,:n_el]=b_gas
+            lhs[n_el,n_el]=-inerts
+            rhs[n_el]=np.dot(n_g,mu_g)
+        else:
+            lhs[n_el,n_el]=1.0
+        for m in range(n_cond):
+            if active[m]:
+                lhs[n_el+1+m,:n_el]=a_cond[:,m]
+                rhs[n_el+1+m]=g_rt[cond][m]
+            else:
+                lhs[n_el+1+m,n_el+1+m]=1.0
+        #Масштабирование (диагональные элементы строк V малы при следовых количествах газов)
+        diag=np.sqrt(np.abs(np.diag(lhs)))
+        diag[diag==0]=1.0
+        lhs=lhs/diag[:,np.newaxis]/diag[np.newaxis,:]
+        try:
+            sol=np.linalg.solve(lhs,rhs/diag)/diag
+        except np.linalg.LinAlgError:
+            sol=np.linalg.lstsq(lhs,rhs/diag,rcond=None)[0]/diag
+        pi,u,dn_cond=sol[:n_el],sol[n_el],sol[n_el+1:]
+        #Изменения количеств газов
+        d_ln=np.dot(a_gas.T,pi)+u-mu_g
+        dn_gas=n_g*d_ln
+        #Ограничение шага: основные газы и конденсированные вещества остаются положительными,
+        #количества основных газов увеличиваются не более чем в 1+gibbs_max_ln_step раз
+        major=n_g>scale*gibbs_major
+        trace_c=active&(moll[cond]<=scale*gibbs_trace)
+        step=1.0
+        lim=major&(dn_gas<0)
+        if lim.any():
+            step=min(step,gibbs_damping*np.min(-n_g[lim]/dn_gas[lim]))
+        lim=major&(d_ln>gibbs_max_ln_step)
+        if lim.any():
+            step=min(step,gibbs_max_ln_step/np.max(d_ln[lim]))
+        lim_c=active&~trace_c&(dn_cond<0)
+        vanish=np.zeros(n_cond,bool)
+        if lim_c.any():
+            ratio=-moll[cond][lim_c]/dn_cond[lim_c]
+            if np.min(ratio)<step:
+                step=np.min(ratio)
+                vanish[np.nonzero(lim_c)[0][np.argmin(ratio)]]=True
+        #Новые количества: малые количества газов изменяются в логарифмическом масштабе
+        #(увеличение - не более чем до scale*gibbs_trace, далее в линейном масштабе).
+        #Шаг Ньютона для следовых газов, количества которых стремятся к 0, уменьшает их
+        #лишь в e^|d_ln| раз, поэтому при уменьшении на нескольких итерациях подряд шаг умножается на gibbs_accel_factor
+        #(только для изменения относительно газовой фазы в целом d_ln-u)
+        accel=np.where((~major)&(d_ln-u<gibbs_accel_trigger),np.minimum(accel*gibbs_accel_factor,gibbs_accel_max),1.0)
+        up=np.clip(np.log(scale*gibbs_trace/n_g),gibbs_min_up,gibbs_max_log)
+        new_g=np.where(major,n_g+step*dn_gas,n_g*np.exp(np.clip(step*(u+(d_ln-u)*accel),-gibbs_max_log,up)))
+        new_g=np.maximum(new_g,floor)
+        new_c=np.where(active,moll[cond]+step*dn_cond,0.0)
+        #Следовые количества конденсированных веществ уменьшаются не более чем в exp(gibbs_max_log) раз
+        #(фаза исчезает при достижении нижней границы количества либо если шаг Ньютона
+        #превышает ее количество более чем вдвое - отличие от потери точности при вычитании)
+        vanish|=trace_c&(new_c<-moll[cond])
+        new_c=np.where(trace_c,np.maximum(new_c,moll[cond]*np.exp(-gibbs_max_log)),new_c)
+        new_c[vanish|(new_c<=floor)]=0.0
+        active=active&~vanish&(new_c>0)
+        delta=max(np.max(np.abs(new_g-n_g),initial=0.0),np.max(np.abs(new_c-moll[cond]),initial=0.0))
+        #Газовая фаза исчезает: количество газа следовое и уменьшается (u<0) при выполнении
+        #условия равновесия для мольных долей (d_ln=u для всех газов)
+        gas_off=(inerts<=0)and(u<=gibbs_gas_off)and(new_g.sum()<=scale*gibbs_trace)
+        #Условие равновесия для всех газов, кроме достигших нижней границы количества
+        delta_ln=np.max(np.abs((d_ln-u if gas_off else d_ln)[~((new_g<=floor)&(d_ln<0))]),initial=0.0)
+        moll[gas],moll[cond]=new_g,new_c
+        #Баланс элементов
+        delta_b=np.max(np.abs(b_vector-np.dot(a_matrix,moll)),initial=0.0)
+        if (delta<=tol*scale)and(delta_ln<=gibbs_mu_tol)and(not vanish.any()):
+            #Проверка устойчивости отсутствующих конденсированных фаз (в том числе когда
+            #без них баланс элементов недостижим)
+            force=g_rt[cond]-np.dot(a_cond.T,pi)
+            appear=(~active)&(force<-tol)
+            if not appear.any():
+                if delta_b<=tol*scale:
+                    converged=True
+                    break
+                continue
+            m=np.nonzero(appear)[0][np.argmin(force[appear])]
+            active[m]=True
+            fresh=m
+            new_c=moll[cond]
+            new_c[m]=scale*gibbs_trace
+            moll[cond]=new_c
+    #
+    mu=np.zeros(n_all)
+    mu[used]=potential(moll)
+    if converged and gas_off:
+        moll[gas]=0.0
+    res=np.zeros(n_all)
+    res[used]=moll
+    return res,mu,converged
+#
+def main():
+    print('Модуль термодинамических расчетов. Версия 1.0')
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,470 @@
+# -*- coding: utf-8 -*-
+'''Тесты модуля db_sqlite_py (пул соединений, пакетная запись, потоковая выборка,
+журнал, агрегаты, условия запросов, кэш схемы, индексы, снимок в памяти, настройки)
+Запуск: python -m unittest test_db_sqlite_py (или python -m pytest)'''
+#
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+import db_sqlite_py as db
+#
+def make_db(path,dbname='test.db',count=10):
+    '''Создание тестовой БД с таблицей term_base (subst,phase,t1,value)
+    Формат возвращаемых данных: объект database'''
+    #
+    con=sqlite3.connect(os.path.join(path,dbname))
+    con.execute('CREATE TABLE term_base(subst TEXT,phase TEXT,t1 REAL,value REAL)')
+    con.executemany('INSERT INTO term_base VALUES (?,?,?,?)',
+        [('S{0}'.format(i),'g' if i%2 else 'l',298.0+i,float(i)) for i in range(count)])
+    con.commit()
+    con.close()
+    return db.database(dbname,os.path.join(path,''))
+#
+#
+class db_test_case(unittest.TestCase):
+    '''Тесты с временной БД; файлы журналов создаются во временном каталоге'''
+    #
+    def setUp(self):
+        self.cwd=os.getcwd()
+        self.path=tempfile.mkdtemp()
+        os.chdir(self.path)
+        self.base=make_db(self.path)
+        self.table=self.base.get_table('term_base')
+    #
+    def tearDown(self):
+        self.base.close()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.path,ignore_errors=True)
+#
+#
+class test_pool(db_test_case):
+    '''Пул соединений: одно соединение на поток, закрытие соединений завершившихся потоков'''
+    #
+    def test_reuse(self):
+        pool=self.base.get_pool()
+        self.assertIs(self.table.get_pool(),pool)
+        conn=pool.get_connection()
+        for i in range(5):
+            self.table.count()
+        self.assertIs(pool.get_connection(),conn)
+        self.assertEqual(pool.get_stats()['active'],1)
+        self.assertGreaterEqual(pool.get_stats()['served'],5)
+    #
+    def test_evict(self):
+        pool=self.base.get_pool()
+        self.table.count()
+        threads=[threading.Thread(target=self.table.update,args=({'value':-1.0},'"subst"=?',('S{0}'.format(i),))) for i in range(3)]
+        for thread in threads:
+            thread.start()
+            thread.join()
+        #Соединения завершившихся потоков закрываются при открытии новых соединений
+        self.assertLessEqual(pool.get_stats()['active'],2)
+        pool.evict()
+        self.assertEqual(pool.get_stats()['active'],1)
+        #Изменения через закрытые соединения учитываются
+        self.assertEqual(pool.total_changes(),3)
+        self.assertEqual(self.table.count('"value"=-1'),3)
+    #
+    def test_close(self):
+        pool=self.base.get_pool()
+        self.table.count()
+        self.base.close()
+        self.assertEqual(pool.get_stats()['active'],0)
+        #После закрытия соединение открывается заново
+        self.assertEqual(self.table.count(),10)
+#
+#
+class test_write_many(db_test_case):
+    '''Пакетная запись порциями через executemany'''
+    #
+    def test_chunks(self):
+        rows=[('N{0}'.format(i),'g',300.0,float(i)) for i in range(25)]
+        self.assertEqual(self.table.insert_many(rows,chunk_size=10),25)
+        self.assertFalse(self.table.error)
+        self.assertEqual(self.table.count(),35)
+        #Одна транзакция и один вызов executemany на порцию
+        zapros=[z for z in self.base.get_pool().queries if z.startswith('INSERT INTO')]
+        self.assertEqual(len(zapros),1)
+        self.assertEqual(self.base.get_pool().queries[zapros[0]],3)
+    #
+    def test_rows(self):
+        #Словари, кортежи с заданными полями, генератор
+        self.assertEqual(self.table.insert_many([{'subst':'A','value':1.0,'unknown':0}]),1)
+        self.assertEqual(self.table.insert_many((('B',2.0) for i in range(3)),filds=['subst','value'],chunk_size=2),3)
+        self.assertEqual(self.table.sum('value','"subst" IN (?,?)',('A','B')),7.0)
+        self.assertEqual(self.table.insert_many([]),0)
+        self.assertEqual(self.table.insert_many([('C',)],filds=['unknown']),0)
+    #
+    def test_upsert(self):
+        self.base.create_index('term_base','subst',unique=True)
+        rows=[('S0','g',1.0,100.0),('Z','g',1.0,200.0)]
+        self.assertEqual(self.table.upsert_many(rows),2)
+        self.assertEqual(self.table.count(),11)
+        self.assertEqual(self.table.select('"subst"=?',['value'],('S0',)),[(100.0,)])
+    #
+    def test_error(self):
+        #Ошибочная порция откатывается, предыдущие порции сохраняются
+        self.base.create_index('term_base','subst',unique=True)
+        rows=[('N{0}'.format(i),'g',1.0,0.0) for i in range(4)]+[('S0','g',1.0,0.0)]
+        self.assertEqual(self.table.insert_many(rows,chunk_size=4),4)
+        self.assertTrue(self.table.error)
+        self.assertEqual(self.table.count(),14)
+        #Признак ошибки сбрасывается следующей пакетной записью
+        self.assertEqual(self.table.insert_many([('M','g',1.0,0.0)]),1)
+        self.assertFalse(self.table.error)
+#
+#
+class test_iter_select(db_test_case):
+    '''Потоковая выборка (генератор)'''
+    #
+    def test_rows(self):
+        rows=list(self.table.iter_select(filds=['subst','value'],batch_size=3))
+        self.assertEqual(rows,self.table.select(filds=['subst','value']))
+        self.assertEqual(list(self.table.iter_select('"value">=?',['subst'],params=(8,))),[('S8',),('S9',)])
+        self.assertEqual(list(self.table.iter_select([('phase','=','l'),('value','<',4)],['subst'])),[('S0',),('S2',)])
+    #
+    def test_chunks(self):
+        chunks=list(self.table.iter_select(batch_size=4,chunks=True))
+        self.assertEqual([len(x) for x in chunks],[4,4,2])
+    #
+    def test_lazy(self):
+        #Записи не читаются до начала итерации и не сохраняются в объекте
+        rows=self.table.iter_select(batch_size=2)
+        self.table.insert({'subst':'N','value':0.0})
+        self.assertEqual(len(list(rows)),11)
+        self.assertEqual(next(self.table.iter_select('"subst"=?',params=('N',)))[0],'N')
+        #Прерванная итерация закрывает курсор
+        rows=self.table.iter_select(batch_size=2)
+        next(rows)
+        rows.close()
+        self.assertEqual(self.table.delete('"subst"=?',('N',)),False)
+        self.assertEqual(self.table.count(),10)
+    #
+    def test_error(self):
+        self.assertEqual(list(self.table.iter_select('unknown=1')),[])
+        self.assertTrue(self.table.error)
+        self.assertEqual(list(self.table.iter_select([('subst','between','A')])),[])
+#
+#
+class test_journal(db_test_case):
+    '''Журнал: кольцевой буфер, построчная запись в файл, общий файл для одного имени'''
+    #
+    def read(self,file_name):
+        with open(file_name,encoding='utf-8') as f_in:
+            return [line.rstrip('\n').split('\t') for line in f_in]
+    #
+    def test_buffer(self):
+        log=db.Journal(False,'test',maxlen=3)
+        for i in range(5):
+            log.add('metod',[(1,),(2,)],'zapros {0}'.format(i),0.5)
+        self.assertEqual([x[3] for x in log.getJournal()],['zapros 2','zapros 3','zapros 4'])
+        self.assertEqual(log.getJournal()[-1][2],'записей: 2')
+        log.close()
+        #В файл записываются все записи, при открытии восстанавливаются последние
+        self.assertEqual(len(self.read('test.out')),5)
+        log=db.Journal(True,'test',maxlen=2)
+        log.output=False
+        self.assertEqual([x[3] for x in log.getJournal()],['zapros 3','zapros 4'])
+        log.clear()
+        self.assertEqual(log.getJournal(),[])
+        self.assertEqual(self.read('test.out'),[])
+        log.close()
+    #
+    def test_rotation(self):
+        log=db.Journal(False,'test',max_size=200)
+        for i in range(10):
+            log.add('metod','comment','zapros {0}'.format(i))
+        log.close()
+        self.assertTrue(os.path.exists('test.out.1'))
+        self.assertLessEqual(os.path.getsize('test.out'),200)
+        self.assertEqual(self.read('test.out')[-1][3],'zapros 9')
+    #
+    def test_shared(self):
+        #Закрытие одного журнала не закрывает файл других журналов с тем же именем
+        log1,log2=db.Journal(False,'test'),db.Journal(False,'test')
+        log1.add('metod','log1','')
+        log1.close()
+        log1.close()
+        log2.add('metod','log2','')
+        self.assertIn('test.out',db.dict_journal_files)
+        del log1
+        log2.add('metod','log2','')
+        self.assertEqual([x[2] for x in self.read('test.out')],['log1','log2','log2'])
+        shared=db.dict_journal_files['test.out']
+        log2.close()
+        self.assertNotIn('test.out',db.dict_journal_files)
+        self.assertEqual(shared['file'],None)
+        #Запись после закрытия снова открывает файл
+        log2.add('metod','log2','')
+        self.assertEqual(len(self.read('test.out')),4)
+        log2.close()
+#
+#
+class test_aggregate(db_test_case):
+    '''Агрегатные функции, вычисляемые в БД'''
+    #
+    def test_scalar(self):
+        self.assertEqual(self.table.count(),10)
+        self.assertEqual(self.table.count('"phase"=?',('g',)),5)
+        self.assertEqual(self.table.count([('subst','in',['S1','S2','X'])]),2)
+        self.assertEqual(self.table.min('t1'),298.0)
+        self.assertEqual(self.table.max('value','"phase"=?',('l',)),8.0)
+        self.assertEqual(self.table.sum('value'),45.0)
+        self.assertEqual(self.table.avg('value',[('phase','=','g')]),5.0)
+        self.assertTrue(self.table.exists('"subst"=?',('S3',)))
+        self.assertFalse(self.table.exists('"subst"=?',('X',)))
+    #
+    def test_empty(self):
+        self.assertEqual(self.table.count('"subst"=?',('X',)),0)
+        self.assertEqual(self.table.max('value','"subst"=?',('X',)),None)
+        self.assertEqual(self.table.group_by(['phase'],[('count','*')],'"subst"=?',('X',)),[])
+    #
+    def test_group_by(self):
+        res=self.table.group_by('phase',[('count','*'),('min','t1'),('sum','value')])
+        self.assertEqual(sorted(res),[('g',5,299.0,25.0),('l',5,298.0,20.0)])
+        res=self.table.group_by(['phase'],[('max','value')],[('value','<',5)])
+        self.assertEqual(sorted(res),[('g',3.0),('l',4.0)])
+    #
+    def test_invalid(self):
+        #Неизвестные функции и поля не передаются в запрос
+        self.assertEqual(self.table.sum('unknown'),None)
+        self.assertEqual(self.table._aggregate('median','value'),None)
+        self.assertEqual(self.table._aggregate_expr('sum','*'),False)
+        self.assertEqual(self.table.group_by(['phase'],[('median','value')]),False)
+        self.assertEqual(self.table.group_by(['unknown'],[('count','*')]),False)
+#
+#
+class test_where(db_test_case):
+    '''Условия запросов с параметрами (знаками ?)'''
+    #
+    def test_to_where(self):
+        self.assertEqual(db.to_where(('subst','=','S1')),('"subst" = ?',('S1',)))
+        self.assertEqual(db.to_where([('subst','in',('S1','S2')),('value','>=',1)]),
+            ('"subst" IN (?,?) AND "value" >= ?',('S1','S2',1)))
+        self.assertEqual(db.to_where([('phase','NOT IN',['g']),('t1','is not',None)]),
+            ('"phase" NOT IN (?) AND "t1" IS NOT ?',('g',None)))
+        self.assertEqual(db.to_where([]),('1=1',()))
+        self.assertEqual(db.to_where([('subst','=','S1'),('value','; DROP',1)]),(False,()))
+    #
+    def test_reuse(self):
+        #Текст условия не зависит от значений - один подготовленный запрос
+        for i in range(5):
+            self.assertEqual(self.table.select([('subst','=','S{0}'.format(i))],['value']),[(float(i),)])
+        zapros=[z for z in self.base.get_pool().queries if z.startswith('SELECT value')]
+        self.assertEqual(zapros,['SELECT value FROM term_base WHERE "subst" = ?'])
+        self.assertEqual(self.base.get_pool().queries[zapros[0]],5)
+    #
+    def test_empty(self):
+        self.assertEqual(self.table._where([]),('1=1',()))
+        self.assertEqual(len(self.table.select([])),10)
+        self.assertEqual(self.table.count([]),10)
+        self.assertTrue(self.table.update({'value':0.0},[]))
+        self.assertEqual(self.table.sum('value'),0.0)
+    #
+    def test_invalid(self):
+        #Неизвестные поля и операторы - запрос не выполняется
+        self.assertEqual(self.table._where([('unknown','=',1)]),(False,()))
+        self.assertEqual(self.table.select([('subst','=','S1'),('unknown','=',1)]),False)
+        self.assertFalse(self.table.update({'value':0.0},[('subst','~','S1')]))
+        self.assertEqual(self.table.delete([('unknown','=',1)]),False)
+        self.assertEqual(self.table.count(),10)
+    #
+    def test_values(self):
+        #Значения передаются параметрами, а не текстом запроса
+        self.assertTrue(self.table.update({'phase':"'); DROP TABLE term_base; --"},[('subst','=','S1')]))
+        self.assertEqual(self.table.select([('phase','=',"'); DROP TABLE term_base; --")],['subst']),[('S1',)])
+        self.table.delete([('subst','in',['S1','S2'])])
+        self.assertEqual(self.table.count(),8)
+#
+#
+class test_schema(db_test_case):
+    '''Кэш схемы БД (имена таблиц, информация о полях)'''
+    #
+    def external(self,zapros):
+        #Изменение схемы через стороннее соединение
+        con=sqlite3.connect(self.base.dbname)
+        con.execute(zapros)
+        con.commit()
+        con.close()
+    #
+    def test_cache(self):
+        base=db.database('test.db',os.path.join(self.path,''),schema_ttl=None)
+        self.assertEqual(base.list_tables(),['term_base'])
+        self.assertEqual(base.get_tables_info('term_base')[0],['subst','TEXT'])
+        count=sum(base.get_pool().queries.values())
+        for i in range(5):
+            base.get_table('term_base')
+            base.exists_tables('term_base')
+        self.assertEqual(sum(base.get_pool().queries.values()),count)
+        #schema_ttl=None - стороннее изменение схемы не отслеживается
+        self.external('CREATE TABLE other(x REAL)')
+        self.assertFalse(base.exists_tables('other'))
+        base.invalidate_schema()
+        self.assertTrue(base.exists_tables('other'))
+        base.close()
+    #
+    def test_version(self):
+        #schema_ttl=0 - проверка PRAGMA schema_version при каждом обращении
+        self.base.schema_ttl=0
+        self.assertFalse(self.base.exists_tables('other'))
+        self.external('CREATE TABLE other(x REAL)')
+        self.assertTrue(self.base.exists_tables('other'))
+        self.external('ALTER TABLE other ADD COLUMN y TEXT')
+        self.assertEqual(self.base.get_tables_info('other'),[['x','REAL'],['y','TEXT']])
+    #
+    def test_changes(self):
+        #Изменения схемы через объект сбрасывают кэш
+        self.assertTrue(self.base.create_table('other',{'x':'REAL'}))
+        self.assertIn('other',self.base.list_tables())
+        self.assertTrue(self.base.delete_table('other'))
+        self.assertEqual(self.base.list_tables(),['term_base'])
+    #
+    def test_tables_only(self):
+        #Индексы не считаются таблицами
+        index_name=self.base.create_index('term_base','subst')
+        self.assertIn((index_name,'term_base'),self.base.list_indexes())
+        self.assertEqual(self.base.list_tables(),['term_base'])
+        self.assertFalse(self.base.exists_tables(index_name))
+        self.assertFalse(self.base.get_table(index_name))
+#
+#
+class test_indexes(db_test_case):
+    '''Управление индексами и анализ планов выполненных запросов'''
+    #
+    def test_manage(self):
+        self.assertEqual(self.table.create_index('subst'),'idx_term_base_subst')
+        self.assertEqual(self.base.create_index('term_base',['phase','t1'],'idx_pt',unique=False),'idx_pt')
+        self.assertEqual(sorted(self.table.list_indexes()),[('idx_pt','term_base'),('idx_term_base_subst','term_base')])
+        self.assertFalse(self.table.create_index('unknown'))
+        self.assertFalse(self.base.create_index('other','subst'))
+        self.assertTrue(self.base.drop_index('idx_pt'))
+        self.assertEqual(self.base.list_indexes('term_base'),[('idx_term_base_subst','term_base')])
+    #
+    def test_explain(self):
+        zapros='SELECT * FROM term_base WHERE "subst"=?'
+        self.assertTrue(self.base.explain(zapros)[0].startswith('SCAN'))
+        self.table.create_index('subst')
+        self.assertIn('USING INDEX idx_term_base_subst',self.base.explain(zapros,('S1',))[0])
+    #
+    def test_advise(self):
+        self.table.select([('subst','=','S1')])
+        self.table.count([('value','>',1)])
+        self.table.select()
+        self.base.get_pragma('journal_mode')
+        res=self.base.advise_indexes()
+        self.assertEqual(sorted(x['filds'][0] for x in res),['subst','value'])
+        self.assertTrue(all(x['table']=='term_base' for x in res))
+        self.assertEqual([x['count'] for x in res],[1,1])
+        #После создания индекса полный просмотр не выполняется
+        self.table.create_index('subst')
+        self.table.create_index('value')
+        self.assertEqual(self.base.advise_indexes(),[])
+    #
+    def test_not_table(self):
+        #Строки плана с именами индексов и т.п. не считаются таблицами
+        index_name=self.table.create_index('subst')
+        self.table.select([('value','=',1)])
+        plans=[]
+        self.base.explain=lambda zapros,param=None:plans
+        for plan in ('SCAN {0}'.format(index_name),'SCAN CONSTANT ROW','SCAN sqlite_master'):
+            plans[:]=[plan]
+            self.assertEqual(self.base.advise_indexes(),[])
+        plans[:]=['SCAN term_base']
+        self.assertEqual([x['table'] for x in self.base.advise_indexes()],['term_base'])
+#
+#
+class test_snapshot(db_test_case):
+    '''Работа с копией БД в памяти'''
+    #
+    def file_count(self):
+        con=sqlite3.connect(self.base.dbname)
+        res=con.execute('SELECT COUNT(*) FROM term_base').fetchone()[0]
+        con.close()
+        return res
+    #
+    def snapshot(self,**kwargs):
+        base=db.database('test.db',os.path.join(self.path,''),in_memory=True,**kwargs)
+        return base,base.get_table('term_base')
+    #
+    def test_snapshot(self):
+        base,table=self.snapshot()
+        self.assertEqual(table.count(),10)
+        #Изменения копии не затрагивают файл до save_snapshot
+        table.insert_many([('N','g',1.0,0.0)])
+        self.assertEqual(table.count(),11)
+        self.assertEqual(self.file_count(),10)
+        self.assertTrue(base.save_snapshot())
+        self.assertEqual(self.file_count(),11)
+        self.assertTrue(base.save_snapshot(os.path.join(self.path,'copy.db')))
+        base.close()
+        self.assertFalse(self.base.save_snapshot())
+    #
+    def test_write_back(self):
+        base,table=self.snapshot(write_back=True)
+        table.delete([('phase','=','l')])
+        self.assertEqual(self.file_count(),10)
+        base.close()
+        self.assertEqual(self.file_count(),5)
+    #
+    def test_threads(self):
+        #Запись во время чтения другими потоками (общее соединение со снимком)
+        base,table=self.snapshot()
+        errors,stop=[],threading.Event()
+        def reader():
+            while not stop.is_set():
+                if (table.count()<10)or(len(list(table.iter_select(batch_size=7)))<10):
+                    errors.append('read')
+        def writer(k):
+            for i in range(150):
+                if not table.insert({'subst':'W{0}_{1}'.format(k,i),'value':0.0}):
+                    errors.append('write')
+        readers=[threading.Thread(target=reader) for i in range(4)]
+        writers=[threading.Thread(target=writer,args=(k,)) for k in range(2)]
+        for thread in readers+writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        stop.set()
+        for thread in readers:
+            thread.join()
+        self.assertEqual(errors,[])
+        self.assertEqual(table.count('"subst" LIKE ?',('W%',)),300)
+        self.assertEqual(base.get_pool().total_changes(),300)
+        base.close()
+#
+#
+class test_pragmas(db_test_case):
+    '''Профили и явно заданные настройки SQLite'''
+    #
+    def test_to_pragmas(self):
+        self.assertEqual(db.to_pragmas(),{})
+        self.assertEqual(db.to_pragmas('safe'),{'journal_mode':'DELETE','synchronous':'FULL'})
+        res=db.to_pragmas('read-mostly',{'cache_size':-20000,'busy_timeout':500})
+        self.assertEqual(res['journal_mode'],'WAL')
+        self.assertEqual(res['cache_size'],-20000)
+        self.assertEqual(res['busy_timeout'],500)
+        #Неизвестные профили, настройки и недопустимые значения отбрасываются
+        self.assertEqual(db.to_pragmas('unknown',{'user_version':1,'synchronous':'OFF; DROP TABLE x'}),{})
+    #
+    def test_database(self):
+        base=db.database('test.db',os.path.join(self.path,''),profile='read-mostly',pragmas={'cache_size':-20000})
+        self.assertEqual(base.get_pragma('journal_mode'),'wal')
+        self.assertEqual(base.get_pragma('synchronous'),1)
+        self.assertEqual(base.get_pragma('cache_size'),-20000)
+        self.assertEqual(base.get_pragma('user_version'),None)
+        #Настройки применяются к соединениям всех потоков
+        res=[]
+        thread=threading.Thread(target=lambda:res.append(base.get_pragma('cache_size')))
+        thread.start()
+        thread.join()
+        self.assertEqual(res,[-20000])
+        self.assertEqual(base.get_table('term_base').count(),10)
+        base.close()
+        #По умолчанию настройки не меняются
+        self.assertEqual(self.base.get_pragma('synchronous'),2)
+#
+if __name__=='__main__':
+    unittest.main()
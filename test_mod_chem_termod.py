@@ -0,0 +1,809 @@
+# -*- coding: utf-8 -*-
+'''Тесты расчета равновесия (rawn_calc, gibbs_min, chem_system.equilibrium)
+и уравнивания реакций (balance_koeff, reaktion.koeff_calc, reaktion_lib)
+Запуск: python -m unittest test_mod_chem_termod (или python -m pytest)'''
+#
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+import warnings
+import numpy as np
+import db_sqlite_py as db
+import mod_chem_termod as m
+#
+#Термодинамические данные веществ (поля таблицы term_base)
+lst_fields=['subst','dt1','dt2','dh298','da','db','dc','dd','ds298','uat0',
+    'm_coeff','n_coeff','dhh298','dhfp','z_coeff','phase']
+lst_rows=[
+    ('H2',298,3000,0,27.28,3.26,0,0.5,130.52,432,1,0,8.468,0,1,'g'),
+    ('O2',298,3000,0,31.46,3.39,0,3.77,205.04,498,1,0,8.66,0,1,'g'),
+    ('H2O',298,1000,-241.81,30.0,10.71,0,-0.33,188.72,917,1,2,9.9,0,2,'g'),
+    ('H2O',1000,3000,0,36.0,6.0,1.0,0,0,0,1,2,0,0,2,'g'),
+    ('CO',298,2500,-110.53,28.41,4.1,0,0.46,197.55,1072,1,1,8.67,0,1,'g'),
+    ('CO2',298,2500,-393.51,44.14,9.04,0,8.54,213.66,1598,1,2,9.36,0,2,'g'),
+    ('CH4',298,1500,-74.85,14.32,74.66,-17.43,0,186.27,1642,1,4,10.03,0,4,'g'),
+]
+#
+def make_db(path):
+    '''Создание тестовой БД в каталоге path
+    Формат возвращаемых данных: словарь таблиц БД для subst/reaktion'''
+    #
+    con=sqlite3.connect(os.path.join(path,'termod.db'))
+    con.execute('CREATE TABLE term_base({0})'.format(','.join(
+        '{0} {1}'.format(f,'TEXT' if f in ('subst','phase') else 'REAL') for f in lst_fields)))
+    con.executemany('INSERT INTO term_base VALUES ({0})'.format(','.join('?'*len(lst_fields))),lst_rows)
+    con.execute('CREATE TABLE term_name_fld(fld_name TEXT,fld_full_name TEXT)')
+    con.executemany('INSERT INTO term_name_fld VALUES (?,?)',[(f,f.upper()) for f in lst_fields])
+    con.commit()
+    con.close()
+    base=db.database('termod.db',os.path.join(path,''))
+    return base,{'term-base':base.get_table('term_base'),'term-name-fld':base.get_table('term_name_fld')}
+#
+def random_data(rng,ordered=True):
+    '''Случайные данные вещества с 1-4 температурными интервалами
+    (ordered=False - интервалы в обратном порядке)
+    Формат возвращаемых данных: список словарей (см. subst.get_termod_info)'''
+    #
+    bounds=298.0+np.cumsum(np.r_[0,rng.uniform(100,1500,rng.integers(1,5))])
+    res=[]
+    for t1,t2 in zip(bounds[:-1],bounds[1:]):
+        row=dict.fromkeys(m.lst_termod_filds,0.0)
+        row.update({'subst':'X','phase':'g','dt1':t1,'dt2':t2,'da':rng.uniform(20,60),'db':rng.uniform(-10,30),
+            'dc':rng.uniform(-5,5),'dd':rng.uniform(-5,10),'dhfp':rng.choice([0,rng.uniform(0,50)]),
+            'dh298':rng.uniform(-500,100),'ds298':rng.uniform(100,300)})
+        res.append(row)
+    return res if ordered else res[::-1]
+#
+def loop_piecewise(data,temperatur,kind,fp=False):
+    '''Расчет кусочно-заданной функции циклом по температурам и интервалам
+    (исходный алгоритм Cp_t, delta_Int_Cp_t, delta_Int_S_Cp_t; в Дж)'''
+    #
+    res=np.zeros(len(temperatur))
+    for j,t in enumerate(temperatur):
+        if t<=data[0]["dt1"]: t=data[0]["dt1"]
+        res_t=0
+        for c in data:
+            if t>=c["dt2"]:
+                tt=c["dt2"]
+            elif (t<c["dt2"])and(t>=c["dt1"]):
+                tt=t
+            else:
+                continue
+            if kind=='cp':
+                res_t+=c["da"]+c["db"]*tt/1000.0+c["dc"]*(tt**2)/1000000.0-c["dd"]*(tt**(-2))*100000.0
+            elif kind=='h':
+                res_t+=c["da"]*(tt-c["dt1"])+c["db"]*(tt**2-c["dt1"]**2)/2000.0+c["dc"]*(tt**3-c["dt1"]**3)/3000000.0
+                res_t-=c["dd"]*(tt**(-1)-c["dt1"]**(-1))*100000.0
+                if (t>=c["dt2"])and(fp!=True):
+                    res_t+=c["dhfp"]*1000.0
+            else:
+                res_t+=c["da"]*np.log(tt/c["dt1"])+c["db"]*(tt-c["dt1"])/1000.0+c["dc"]*(tt**2-c["dt1"]**2)/2000000.0
+                res_t-=c["dd"]*(tt**(-2)-c["dt1"]**(-2))*100000.0/3
+                if t>=c["dt2"]:
+                    res_t+=c["dhfp"]*1000.0/c["dt2"]
+        res[j]=res_t
+    return res
+#
+def data_subst(data,temperatur):
+    '''Вещество с заданными данными (без обращения к БД)'''
+    #
+    return m.subst('X','g',{'temperature':temperatur},{},termod_data=data,fld_name={},matrix=({},{}))
+#
+def random_temperatur(rng,data):
+    '''Температуры: случайные, ниже первого интервала и на границах интервалов'''
+    #
+    bounds=[x['dt1'] for x in data]+[x['dt2'] for x in data]
+    return m.temperature(np.r_[rng.uniform(200,6000,30),200.0,bounds])
+#
+#
+class db_test_case(unittest.TestCase):
+    '''Тесты, использующие тестовую БД; файлы журналов создаются во временном каталоге'''
+    #
+    @classmethod
+    def setUpClass(cls):
+        cls.cwd=os.getcwd()
+        cls.path=tempfile.mkdtemp()
+        os.chdir(cls.path)
+        cls.base,cls.table=make_db(cls.path)
+    #
+    @classmethod
+    def tearDownClass(cls):
+        cls.base.close()
+        os.chdir(cls.cwd)
+        shutil.rmtree(cls.path,ignore_errors=True)
+    #
+    def reakt(self,subst_koeff_phase,temperatur):
+        return m.reaktion(subst_koeff_phase,{'temperature':temperatur},self.table)
+    #
+    def served(self):
+        #Количество выполненных запросов к БД
+        return self.base.get_pool().get_stats()['served']
+#
+#
+class test_store(db_test_case):
+    '''Хранилище термодинамических данных в памяти (termod_store)'''
+    #
+    def tearDown(self):
+        m.dict_stores.clear()
+    #
+    def test_load(self):
+        tbl=self.table['term-base']
+        self.assertEqual(m.get_store(tbl,False),None)
+        store=m.get_store(tbl)
+        self.assertIs(m.get_store(tbl),store)
+        self.assertIs(m.get_store(tbl,False),store)
+        self.assertEqual(store.names(),{'H2','O2','H2O','CO','CO2','CH4'})
+        self.assertTrue(store.has('H2O'))
+        self.assertFalse(store.has('X'))
+        #Строки отсортированы по формуле, порядок интервалов сохраняется
+        self.assertEqual(store.get_range('CH4'),(0,1))
+        self.assertEqual(store.get_range('H2O'),(4,6))
+        arrays=store.get_arrays('H2O')
+        self.assertEqual(list(arrays['dt1']),[298,1000])
+        self.assertEqual(list(arrays['phase']),['g','g'])
+        self.assertEqual(store.get_arrays('X'),False)
+        self.assertEqual(store.get_rows('X'),False)
+        self.assertEqual(m.get_store(None),None)
+    #
+    def test_rows(self):
+        #Данные хранилища совпадают с данными, полученными запросом к БД
+        store=m.get_store(self.table['term-base'])
+        for frm in store.names():
+            rows=self.table['term-base'].select([('subst','=',frm)],m.lst_termod_filds)
+            self.assertEqual(store.get_rows(frm),[dict(zip(m.lst_termod_filds,x)) for x in rows])
+    #
+    def test_subst(self):
+        temperatur=m.temperature([300,1500,100])
+        sbs=m.subst('H2O','g',{'temperature':temperatur},self.table)
+        h=sbs.entalp()
+        m.get_store(self.table['term-base'])
+        #Данные о веществе берутся из хранилища без запросов к БД
+        served=self.served()
+        sbs_store=m.subst('H2O','g',{'temperature':temperatur},self.table,fld_name={})
+        self.assertTrue(sbs_store.is_valid_subst())
+        self.assertEqual(sbs_store.get_termod_info(),sbs.get_termod_info())
+        self.assertTrue(np.array_equal(sbs_store.entalp(),h))
+        self.assertEqual(self.served(),served)
+        #Явно заданное хранилище
+        store=m.termod_store(self.table['term-base'])
+        sbs=m.subst('CO','g',{'temperature':temperatur},{'term-store':store},fld_name={})
+        self.assertIs(sbs.get_store(),store)
+        self.assertEqual(sbs.get_termod_info()[0]['dh298'],-110.53)
+#
+#
+class test_subst_index(db_test_case):
+    '''Общий для процесса индекс названий веществ'''
+    #
+    def tearDown(self):
+        m.dict_subst_index.clear()
+    #
+    def test_shared(self):
+        temperatur=m.temperature([300,400,100])
+        lst=[m.subst(frm,'g',{'temperature':temperatur},self.table) for frm in ('H2','O2','X')]
+        self.assertEqual([sbs.is_valid_subst() for sbs in lst],[True,True,False])
+        names=lst[0].get_subst_db_names()
+        self.assertEqual(names,frozenset(['H2','O2','H2O','CO','CO2','CH4']))
+        self.assertIs(lst[1].get_subst_db_names(),names)
+        #Повторные проверки выполняются без запросов к БД
+        served=self.served()
+        for sbs in lst*10:
+            sbs.is_valid_subst()
+        self.assertEqual(self.served(),served)
+    #
+    def test_invalidate(self):
+        tbl=self.table['term-base']
+        index=m.get_subst_index(tbl)
+        self.assertIs(m.get_subst_index(tbl),index)
+        self.assertFalse(index.has('N2'))
+        tbl.insert({'subst':'N2','dt1':298,'dt2':3000,'phase':'g'})
+        try:
+            #Без проверки изменения данных индекс не перестраивается
+            self.assertFalse(index.has('N2'))
+            index.invalidate()
+            self.assertTrue(index.has('N2'))
+            #auto_check=True - индекс перестраивается при изменении данных БД
+            m.get_subst_index(tbl,auto_check=True)
+            tbl.delete('"subst"=?',('N2',))
+            self.assertFalse(index.has('N2'))
+        finally:
+            tbl.delete('"subst"=?',('N2',))
+#
+#
+class test_from_many(db_test_case):
+    '''Создание набора веществ общими запросами к БД'''
+    #
+    def setUp(self):
+        self.in_chunk_size=m.in_chunk_size
+    #
+    def tearDown(self):
+        m.in_chunk_size=self.in_chunk_size
+    #
+    def test_same(self):
+        temperatur=m.temperature([300,1500,200])
+        formula_phase=[('H2O','g'),('CO','g'),('X','g'),('H2O','l'),('CH4','g')]
+        lst=m.subst.from_many(formula_phase,{'temperature':temperatur},self.table)
+        self.assertEqual([(sbs.formula('txt'),sbs.get_phase()) for sbs in lst],formula_phase)
+        for sbs,(frm,ph) in zip(lst,formula_phase):
+            one=m.subst(frm,ph,{'temperature':temperatur},self.table)
+            self.assertEqual(sbs.get_termod_info(),one.get_termod_info())
+            self.assertEqual(sbs.get_fld_name(),one.get_fld_name())
+            self.assertEqual(sbs.get_subst_matrix(),one.get_subst_matrix())
+            self.assertTrue(np.array_equal(sbs.gibbs(),one.gibbs()))
+        self.assertFalse(lst[2].get_termod_info())
+    #
+    def test_chunks(self):
+        #Формулы запрашиваются порциями по in_chunk_size, названия полей - один раз
+        m.in_chunk_size=2
+        pool=self.base.get_pool()
+        pool.queries.clear()
+        formulas=['H2','O2','H2O','CO','CO2','CH4','H2']
+        lst=m.subst.from_many([(frm,'g') for frm in formulas],{},self.table)
+        self.assertEqual(len(lst),7)
+        self.assertEqual(sum(v for z,v in pool.queries.items() if ' IN (' in z),3)
+        self.assertEqual(sum(v for z,v in pool.queries.items() if 'term_name_fld' in z),1)
+        self.assertEqual([len(sbs.get_termod_info()) for sbs in lst],[1,1,2,1,1,1,1])
+    #
+    def test_datatable(self):
+        #Все таблицы и хранилище сохраняются, прочие значения отбрасываются
+        tbl=self.table['term-base']
+        store=m.termod_store(tbl)
+        res=m.to_datatable({'term-base':tbl,'term-ellingem':tbl,'term-ellingem-name':tbl,
+            'term-store':store,'term-name-fld':None,'other':tbl})
+        self.assertEqual(sorted(res),['term-base','term-ellingem','term-ellingem-name','term-store'])
+        self.assertEqual(m.to_datatable(None),dict.fromkeys(['term-base','term-name-fld','term-ellingem','term-ellingem-name']))
+#
+#
+class test_lazy(db_test_case):
+    '''Отложенное создание вещества'''
+    #
+    def test_lazy(self):
+        temperatur=m.temperature([300,1500,200])
+        served=self.served()
+        sbs=m.subst('H2O','g',{'temperature':temperatur},self.table,lazy=True)
+        #При создании запросы к БД не выполняются
+        self.assertEqual(self.served(),served)
+        one=m.subst('H2O','g',{'temperature':temperatur},self.table)
+        served=self.served()
+        self.assertEqual(sbs.get_subst_matrix(),one.get_subst_matrix())
+        self.assertEqual(self.served(),served)
+        #Данные запрашиваются при первом обращении к свойству, один раз
+        self.assertTrue(np.array_equal(sbs.entalp(),one.entalp()))
+        self.assertTrue(np.array_equal(sbs.entrop(),one.entrop()))
+        self.assertEqual(self.served(),served+1)
+        self.assertEqual(sbs.get_fld_name(),one.get_fld_name())
+    #
+    def test_missing(self):
+        sbs=m.subst('X','g',{},self.table,lazy=True)
+        self.assertFalse(sbs.is_valid_subst())
+        self.assertTrue(np.array_equal(sbs.gibbs(),np.zeros(1)))
+        self.assertFalse(sbs.get_termod_info())
+#
+#
+class test_piecewise(unittest.TestCase):
+    '''Векторный расчет кусочно-заданных функций (совпадение с расчетом циклом)'''
+    #
+    def check(self,data,temperatur,st_koeff):
+        sbs=data_subst(data,temperatur)
+        sbs.st_koeff=st_koeff
+        t=temperatur.get_value()
+        scale=st_koeff/1000.0
+        with m.calc_context():
+            for value,kind,fp in ((sbs.Cp_t(),'cp',False),(sbs.delta_Int_Cp_t(),'h',False),
+                                  (sbs.delta_Int_Cp_t(True),'h',True),(sbs.delta_Int_S_Cp_t(),'s',False)):
+                ref=loop_piecewise(data,t,kind,fp)*scale
+                self.assertLessEqual(np.max(np.abs(value-ref)),1e-12*np.max(np.abs(ref)),(kind,fp))
+        #Режим по умолчанию - округление результата
+        self.assertTrue(np.allclose(sbs.Cp_t(),np.around(loop_piecewise(data,t,'cp')*scale,3),rtol=0,atol=1.001e-3))
+    #
+    def test_parity(self):
+        rng=np.random.default_rng(11)
+        for i in range(40):
+            data=random_data(rng)
+            self.check(data,random_temperatur(rng,data),rng.choice([1,2,0.5]))
+    #
+    def test_unordered(self):
+        #Интервалы в произвольном порядке - расчет по каждому интервалу
+        rng=np.random.default_rng(12)
+        for i in range(10):
+            data=random_data(rng,ordered=False)
+            self.check(data,random_temperatur(rng,data),1)
+    #
+    def test_empty(self):
+        sbs=data_subst(False,m.temperature([300,400,50]))
+        self.assertTrue(np.array_equal(sbs.Cp_t(),np.zeros(2)))
+        self.assertTrue(np.array_equal(sbs.entalp(),np.zeros(2)))
+#
+#
+class test_intervals(unittest.TestCase):
+    '''Накопленные суммы вкладов полных температурных интервалов'''
+    #
+    def test_cum(self):
+        rng=np.random.default_rng(13)
+        for i in range(20):
+            data=random_data(rng)
+            iv=data_subst(data,m.temperature(300))._intervals()
+            self.assertTrue(iv['ordered'])
+            #cum_<вид>[k] - значение функции для интервалов 0..k-1 на верхней границе интервала k-1
+            for name,kind,fp in (('cum_cp','cp',False),('cum_h','h',False),('cum_h_fp','h',True),('cum_s','s',False)):
+                self.assertEqual(len(iv[name]),len(data)+1)
+                self.assertEqual(iv[name][0],0.0)
+                for k in range(1,len(data)+1):
+                    ref=loop_piecewise(data[:k],np.array([data[k-1]['dt2']]),kind,fp)[0]
+                    self.assertAlmostEqual(iv[name][k],ref,delta=1e-12*abs(ref)+1e-9,msg=name)
+    #
+    def test_once(self):
+        rng=np.random.default_rng(14)
+        data=random_data(rng)
+        sbs=data_subst(data,m.temperature([300,3000,100]))
+        iv=sbs._intervals()
+        sbs.entalp()
+        sbs.set_parametr({'temperature':m.temperature([500,600,50])})
+        sbs.entrop()
+        self.assertIs(sbs._intervals(),iv)
+        #Новые данные о веществе - интервалы рассчитываются заново
+        self.assertFalse(data_subst(random_data(rng,ordered=False),m.temperature(300))._intervals()['ordered'])
+        self.assertFalse(data_subst(False,m.temperature(300))._intervals())
+#
+#
+class test_subst_cache(db_test_case):
+    '''Кэш рассчитанных свойств вещества'''
+    #
+    def test_hits(self):
+        temperatur=m.temperature([300,1500,200])
+        sbs=m.subst('H2O','g',{'temperature':temperatur},self.table)
+        g=sbs.gibbs()
+        info=sbs.get_cache_info()
+        for i in range(3):
+            self.assertTrue(np.array_equal(sbs.gibbs(),g))
+        self.assertEqual(sbs.get_cache_info()['hits'],info['hits']+3)
+        self.assertEqual(sbs.get_cache_info()['misses'],info['misses'])
+    #
+    def test_copy(self):
+        #Изменение результата на месте не затрагивает кэш
+        sbs=m.subst('H2O','g',{'temperature':m.temperature([300,1500,200])},self.table)
+        h=sbs.entalp()
+        ref=h.copy()
+        h+=1.0
+        h[0]=0.0
+        self.assertTrue(np.array_equal(sbs.entalp(),ref))
+        self.assertTrue(np.array_equal(sbs.gibbs(),m.subst('H2O','g',sbs.get_parametr(),self.table).gibbs()))
+    #
+    def test_state(self):
+        temperatur=m.temperature([300,1500,200])
+        sbs=m.subst('H2O','g',{'temperature':temperatur},self.table)
+        h=sbs.entalp()
+        #Изменение температуры
+        temperatur.set_value([1000,2000,200])
+        self.assertTrue(np.array_equal(sbs.entalp(),m.subst('H2O','g',{'temperature':temperatur},self.table).entalp()))
+        #Стехиометрический коэффициент
+        sbs.st_koeff=2
+        h2=sbs.entalp()
+        sbs.st_koeff=1
+        self.assertFalse(np.array_equal(sbs.entalp(),h2))
+        #Режим полной точности кэшируется отдельно
+        with m.calc_context():
+            hf=sbs.entalp()
+        self.assertFalse(np.array_equal(sbs.entalp(),hf))
+        self.assertTrue(np.allclose(sbs.entalp(),hf,atol=1e-3))
+        #Количество вещества (gelmgolz) и мольная доля (chem_potential)
+        a=sbs.gelmgolz()
+        sbs.moll=1
+        self.assertFalse(np.array_equal(sbs.gelmgolz(),a))
+    #
+    def test_database(self):
+        #Смена таблиц БД сбрасывает кэш
+        sbs=m.subst('H2O','g',{'temperature':m.temperature([300,1500,200])},self.table)
+        sbs.entalp()
+        sbs.set_database(self.table)
+        self.assertEqual(sbs.get_cache_info()['size'],0)
+        misses=sbs.get_cache_info()['misses']
+        sbs.entalp()
+        self.assertGreater(sbs.get_cache_info()['misses'],misses)
+#
+#
+class test_properties(unittest.TestCase):
+    '''Расчет набора свойств вещества за один проход'''
+    #
+    def test_same(self):
+        rng=np.random.default_rng(15)
+        for i in range(20):
+            data=random_data(rng,ordered=bool(i%4))
+            sbs=data_subst(data,random_temperatur(rng,data))
+            sbs.st_koeff=rng.choice([1,2])
+            sbs.moll=rng.uniform(0,2)
+            for fp in (False,True):
+                with m.calc_context(fp):
+                    res=sbs.properties()
+                    ref={'Cp':sbs.Cp_t(),'H':sbs.entalp(),'S':sbs.entrop(),'G':sbs.gibbs(),'A':sbs.gelmgolz()}
+                for k in ref:
+                    self.assertTrue(np.allclose(res[k],ref[k],rtol=1e-12,atol=1e-9 if fp else 0),k)
+    #
+    def test_format(self):
+        rng=np.random.default_rng(16)
+        sbs=data_subst(random_data(rng),m.temperature([300,1500,200]))
+        res=sbs.properties(['G','Cp','X'])
+        self.assertEqual(list(res),['G','Cp'])
+        out=sbs.properties(['H','S'],structured=True)
+        self.assertEqual(out.dtype.names,('T','H','S'))
+        self.assertTrue(np.array_equal(out['T'],sbs.get_parametr()['temperature'].get_value()))
+        self.assertTrue(np.array_equal(out['S'],sbs.entrop()))
+        empty=data_subst(False,m.temperature([300,1500,200])).properties()
+        self.assertTrue(all(np.array_equal(v,np.zeros(6)) for v in empty.values()))
+#
+#
+class test_engine(unittest.TestCase):
+    '''Расчет свойств N веществ x M температур (termod_engine)'''
+    #
+    def make(self,rng,temperatur):
+        lst=[data_subst(random_data(rng,ordered=bool(i%5)),temperatur) for i in range(15)]
+        lst.append(data_subst(False,temperatur))
+        for sbs in lst:
+            sbs.st_koeff=rng.choice([1,2,0.5])
+            sbs.moll=rng.uniform(0,2)
+            sbs.moll_konz=rng.uniform(0.1,1)
+        return lst
+    #
+    def test_rows(self):
+        #Строки результатов совпадают с результатами методов subst
+        rng=np.random.default_rng(17)
+        temperatur=m.temperature(np.r_[rng.uniform(200,6000,40),298.0,1000.0])
+        lst=self.make(rng,temperatur)
+        engine=m.termod_engine(lst,temperatur)
+        for fp in (False,True):
+            with m.calc_context(fp):
+                for name,metod in (('Cp_t','Cp_t'),('entalp','entalp'),('entrop','entrop'),('gibbs','gibbs'),
+                                   ('gelmgolz','gelmgolz'),('chem_potential','chem_potential')):
+                    res=getattr(engine,name)()
+                    self.assertEqual(res.shape,(16,42))
+                    ref=np.array([getattr(sbs,metod)() for sbs in lst])
+                    self.assertTrue(np.allclose(res,ref,rtol=1e-12,atol=1e-9 if fp else 0),(name,fp))
+    #
+    def test_molar(self):
+        rng=np.random.default_rng(18)
+        temperatur=m.temperature([300,3000,100])
+        lst=self.make(rng,temperatur)
+        molar=m.termod_engine(lst,temperatur,molar=True).entalp()
+        for i,sbs in enumerate(lst):
+            sbs.st_koeff=1
+            self.assertTrue(np.array_equal(molar[i],sbs.entalp()))
+    #
+    def test_state(self):
+        rng=np.random.default_rng(19)
+        temperatur=m.temperature([300,3000,100])
+        lst=self.make(rng,temperatur)
+        engine=m.termod_engine(lst)
+        self.assertIs(engine.get_temperatur(),temperatur)
+        g=engine.gibbs()
+        self.assertIs(engine.gibbs(),g)
+        #Изменение температуры и коэффициентов - новый расчет
+        temperatur.set_value([500,800,100])
+        self.assertEqual(engine.gibbs().shape,(16,3))
+        lst[0].st_koeff*=2
+        self.assertTrue(np.array_equal(engine.gibbs()[0],lst[0].gibbs()))
+        self.assertEqual(m.termod_engine([]).get_temperatur().get_value(),298)
+    #
+    def test_count_le(self):
+        #Число границ, не превышающих температуру (сравнение с прямым подсчетом)
+        rng=np.random.default_rng(20)
+        for i in range(20):
+            n,k=rng.integers(1,6),rng.integers(1,6)
+            bounds=np.sort(rng.choice([300.0,500.0,800.0,1000.0,1500.0,np.inf],(n,k)),axis=1)
+            temperatur=np.r_[rng.choice([200.0,300.0,500.0,1000.0,2000.0],5),rng.uniform(100,2000,5)]
+            lower=bounds[:,0]
+            ref=(bounds[:,np.newaxis,:]<=np.maximum(temperatur[np.newaxis,:],lower[:,np.newaxis])[:,:,np.newaxis]).sum(axis=2)
+            self.assertTrue(np.array_equal(m.termod_engine._count_le(bounds,temperatur,lower),ref))
+#
+#
+class test_calc_context(unittest.TestCase):
+    '''Режим полной точности'''
+    #
+    def test_round(self):
+        value=np.array([1.23456789,-2.0004])
+        self.assertFalse(m.get_full_precision())
+        self.assertTrue(np.array_equal(m.to_round(value),[1.235,-2.0]))
+        with m.calc_context():
+            self.assertTrue(m.get_full_precision())
+            #Значение возвращается без округления и копирования
+            self.assertIs(m.to_round(value),value)
+            with m.calc_context(False):
+                self.assertFalse(m.get_full_precision())
+            self.assertTrue(m.get_full_precision())
+        self.assertFalse(m.get_full_precision())
+    #
+    def test_exception(self):
+        with self.assertRaises(ZeroDivisionError):
+            with m.calc_context():
+                1/0
+        self.assertFalse(m.get_full_precision())
+    #
+    def test_threads(self):
+        #Режим действует только в текущем потоке
+        res=[]
+        event,done=threading.Event(),threading.Event()
+        def other():
+            event.wait()
+            res.append(m.get_full_precision())
+            done.set()
+        thread=threading.Thread(target=other)
+        thread.start()
+        with m.calc_context():
+            event.set()
+            done.wait()
+        thread.join()
+        self.assertEqual(res,[False])
+    #
+    def test_values(self):
+        rng=np.random.default_rng(21)
+        data=random_data(rng)
+        sbs=data_subst(data,m.temperature([300,3000,100]))
+        with m.calc_context():
+            h=sbs.entalp()
+        ref=data[0]['dh298']+loop_piecewise(data,sbs.get_parametr()['temperature'].get_value(),'h')/1000.0
+        self.assertTrue(np.allclose(h,ref,rtol=1e-12))
+        self.assertTrue(np.array_equal(sbs.entalp(),np.around(data[0]['dh298']+np.around(ref-data[0]['dh298'],3),3)))
+#
+#
+class test_reaktion_thermo(db_test_case):
+    '''Характеристики реакции как произведения вектора коэффициентов на матрицы свойств'''
+    #
+    def test_values(self):
+        temperatur=m.temperature([300,2500,200])
+        r=self.reakt([('CH4',-1,'g'),('O2',-2,'g'),('CO2',1,'g'),('H2O',2,'g')],temperatur)
+        koeff=r.get_koeff_vector()
+        self.assertEqual(list(koeff),[-1,-2,1,2])
+        with m.calc_context():
+            molar={name:np.array([m.subst(frm,'g',{'temperature':temperatur},self.table).properties([name])[name]
+                for frm in ('CH4','O2','CO2','H2O')]) for name in ('H','S','G')}
+            self.assertTrue(np.allclose(r.get_property_matrix('G'),molar['G']))
+            for name,metod in (('H',r.entalp),('S',r.entrop),('G',r.gibbs)):
+                self.assertTrue(np.allclose(metod(),np.dot(koeff,molar[name]),rtol=1e-12),name)
+            log_k=-np.dot(koeff,molar['G'])*1000/m.R_constant/temperatur.get_value()
+            self.assertTrue(np.allclose(r.log_const_p(),log_k,rtol=1e-12))
+            self.assertTrue(np.allclose(r.const_p(),np.exp(log_k),rtol=1e-12))
+        #Режим по умолчанию - округление
+        self.assertTrue(np.allclose(r.entalp(),np.dot(koeff,molar['H']),atol=1e-3))
+    #
+    def test_cache(self):
+        temperatur=m.temperature([300,2500,200])
+        r=self.reakt([('H2',-1,'g'),('O2',-0.5,'g'),('H2O',1,'g')],temperatur)
+        h=r.entalp()
+        self.assertIs(r._thermo(),r._thermo())
+        #Результат можно изменять, кэш при этом не меняется
+        h[:]=0.0
+        self.assertFalse(np.array_equal(r.entalp(),h))
+        #Изменение коэффициентов и температуры - новый расчет
+        h=r.entalp()
+        self.assertIs(r*2,r)
+        self.assertEqual(list(r.get_koeff_vector()),[-2,-1,2])
+        self.assertTrue(np.allclose(r.entalp(),2*h,atol=2e-3))
+        temperatur.set_value([400,600,100])
+        self.assertEqual(r.gibbs().shape,(2,))
+        self.assertTrue(np.allclose(r.log_const_p(),-r.gibbs()*1000/m.R_constant/temperatur.get_value(),atol=1e-2))
+#
+#
+class test_rawn_calc(db_test_case):
+    '''Равновесная степень полноты реакции H2+0.5O2=H2O'''
+    #
+    def residual(self,r,moll,log_p):
+        koeff=r.get_koeff_vector()
+        n=np.array([moll[frm] for frm in ('H2(g)','O2(g)','H2O(g)')])
+        with m.calc_context():
+            log_k=r.log_const_p()
+        return np.dot(koeff,np.log(n))-koeff.sum()*np.log(n.sum(axis=0))+koeff.sum()*log_p-log_k
+    #
+    def test_residual(self):
+        r=self.reakt([('H2',-1,'g'),('O2',-1,'g'),('H2O',1,'g')],m.temperature([1000,6000,500]))
+        for moll0 in ({'H2':2,'O2':1,'H2O':0},{'H2':1,'O2':1,'H2O':3}):
+            r.set_reagents(moll0)
+            for prs in (None,m.pressure(1e7)):
+                x,moll=r.rawn_calc({'pressure':prs} if prs!=None else None)
+                log_p=0.0 if prs==None else np.log(1e7/100000.0)
+                self.assertLess(np.max(np.abs(self.residual(r,moll,log_p))),1e-9)
+                #Баланс элементов и неотрицательность количеств
+                self.assertTrue(np.allclose(2*moll['H2(g)']+2*moll['H2O(g)'],2*moll0['H2']+2*moll0['H2O']))
+                self.assertTrue(np.allclose(2*moll['O2(g)']+moll['H2O(g)'],2*moll0['O2']+moll0['H2O']))
+                self.assertTrue(all((v>=0).all() for v in moll.values()))
+    #
+    def test_phases(self):
+        #Одна формула в разных фазовых состояниях: H2O(l)=H2O(g) при K=1
+        r=self.reakt([('H2O',-1,'l'),('H2O',1,'g')],m.temperature([300,800,100]))
+        r.set_reagents({'H2O(l)':1.5,'H2O(g)':0.5})
+        self.assertEqual(r.get_koeff_vector().tolist(),[-1,1])
+        #Давление выше стандартного - конденсация, ниже - испарение
+        for prs,liquid,gas,degree in ((1e7,2.0,0.0,-0.5),(1e3,0.0,2.0,1.5)):
+            x,moll=r.rawn_calc({'pressure':m.pressure(prs)})
+            self.assertEqual(sorted(moll),['H2O(g)','H2O(l)'])
+            self.assertTrue(np.allclose(moll['H2O(l)'],liquid))
+            self.assertTrue(np.allclose(moll['H2O(g)'],gas))
+            self.assertTrue(np.allclose(x,degree))
+#
+#
+class test_gibbs_min(db_test_case):
+    '''Минимизация энергии Гиббса'''
+    #
+    def check_kkt(self,a_matrix,b_vector,g_rt,gas,moll,mu):
+        '''Баланс элементов, равенство mu=A.T*pi для всех газов и присутствующих
+        конденсированных фаз, неотрицательность сродства отсутствующих фаз'''
+        #
+        scale=b_vector.sum()
+        self.assertLess(np.max(np.abs(np.dot(a_matrix,moll)-b_vector)),1e-9*scale)
+        #Элементы, отсутствующие в системе, и вещества, которые их содержат, не учитываются
+        used=~(a_matrix[b_vector<=0]>0).any(axis=0)
+        a_matrix=a_matrix[b_vector>0]
+        live=used&((gas&(moll>scale*1e-290))|(~gas&(moll>0)))
+        pi=np.linalg.lstsq(a_matrix[:,live].T,mu[live],rcond=None)[0]
+        self.assertLess(np.max(np.abs(np.dot(a_matrix[:,live].T,pi)-mu[live])),1e-6)
+        absent=used&~gas&(moll==0)
+        self.assertTrue((g_rt[absent]-np.dot(a_matrix[:,absent].T,pi)>=-1e-8).all())
+    #
+    def test_kkt(self):
+        #Элементы C,H,O; вещества H2 O2 H2O CO CO2 CH4 OH H O C(k)
+        a_matrix=np.array([[0,0,0,1,1,1,0,0,0,1],[2,0,2,0,0,4,1,1,0,0],[0,2,1,1,2,0,1,0,1,0]],float)
+        gas=np.array([1]*9+[0],bool)
+        rng=np.random.default_rng(5)
+        for trial in range(100):
+            g_rt=rng.uniform(-150,10,10)
+            moll0=np.zeros(10)
+            pick=rng.choice(10,3,replace=False)
+            moll0[pick]=rng.uniform(0.1,3,3)
+            b_vector=np.dot(a_matrix,moll0)
+            log_p=rng.uniform(-3,3)
+            for start in (moll0,np.ones(10)):
+                moll,mu,converged=m.gibbs_min(a_matrix,b_vector,g_rt,gas,start,log_p=log_p)
+                self.assertTrue(converged)
+                self.check_kkt(a_matrix,b_vector,g_rt,gas,moll,mu)
+    #
+    def test_condensed(self):
+        #Элементы C,O; вещества CO CO2 O2 C(k): фаза C(k) исчезает и появляется
+        a_matrix=np.array([[1,1,0,1],[1,2,2,0]],float)
+        gas=np.array([1,1,1,0],bool)
+        for g_rt in ([-20,-40,0,0],[-10,-15,0,0],[-20,-40,0,5]):
+            for moll0 in ([0,0,1,2],[0,0,1,0.2]):
+                g_rt,moll0=np.array(g_rt,float),np.array(moll0,float)
+                b_vector=np.dot(a_matrix,moll0)
+                moll,mu,converged=m.gibbs_min(a_matrix,b_vector,g_rt,gas,moll0)
+                self.assertTrue(converged)
+                self.check_kkt(a_matrix,b_vector,g_rt,gas,moll,mu)
+    #
+    def test_trace_equilibrium(self):
+        #Стехиометрическая смесь H2+O2 при 300-400 K: следовые H2 и O2 (~1e-27)
+        temperatur=m.temperature([300,400,50])
+        lst=[m.subst(frm,'g',{'temperature':temperatur},self.table) for frm in ('H2','O2','H2O')]
+        with m.calc_context():
+            g_rt=m.termod_engine(lst,temperatur,molar=True).gibbs()*1000/m.R_constant/temperatur.get_value()
+        log_k=-(2*g_rt[2]-2*g_rt[0]-g_rt[1])
+        system=m.chem_system('s',[('H2',2,'g'),('O2',1,'g')],temperatur,self.table)
+        res={}
+        for warm_start in (True,False):
+            with warnings.catch_warnings():
+                warnings.simplefilter('error')
+                moll,g=system.equilibrium({'candidates':[('H2O','g')],'warm_start':warm_start})
+            h2,o2,h2o=moll['H2(g)'],moll['O2(g)'],moll['H2O(g)']
+            log_q=2*np.log(h2o)-2*np.log(h2)-np.log(o2)+np.log(h2+o2+h2o)
+            self.assertLess(np.max(np.abs(log_q-log_k)),1e-8)
+            res[warm_start]=h2
+        self.assertTrue(np.allclose(res[True],res[False],rtol=1e-6,atol=0))
+    #
+    def test_max_iter(self):
+        system=m.chem_system('s',[('H2',2,'g'),('O2',1,'g')],m.temperature([300,400,50]),self.table)
+        with self.assertWarns(RuntimeWarning):
+            system.equilibrium({'candidates':[('H2O','g')],'max_iter':1})
+#
+#
+class test_balance(db_test_case):
+    '''Уравнивание коэффициентов реакций'''
+    #
+    def test_balance_koeff(self):
+        self.assertEqual(m.balance_koeff(['H2','O2']),('over',[]))
+        self.assertEqual(m.balance_koeff(['H2','O2','H2O','H2O2']),('under',[]))
+        status,koeff=m.balance_koeff(['H2','O2','H2O'])
+        self.assertEqual(status,'ok')
+        self.assertIn(koeff,([2,1,-2],[-2,-1,2]))
+        status,koeff=m.balance_koeff(['H2O','H2O'],phases=['l','g'])
+        self.assertEqual(status,'ok')
+        self.assertEqual(koeff[0],-koeff[1])
+    #
+    def test_matrix(self):
+        #Кэш учитывает заданные элементные матрицы веществ
+        status,koeff=m.balance_koeff(['X','Y'],[{'H':2},{'H':1}])
+        self.assertEqual(status,'ok')
+        self.assertIn(koeff,([1,-2],[-1,2]))
+        status,koeff=m.balance_koeff(['X','Y'],[{'H':1},{'H':1}])
+        self.assertEqual(status,'ok')
+        self.assertIn(koeff,([1,-1],[-1,1]))
+        self.assertEqual(m.balance_koeff(['X','Y'],[{'H':1},{'O':1}]),('over',[]))
+        status,koeff=m.balance_koeff(['H2','O2','H2O'],[{'H':2},{'O':2},{'H':2,'O':1}])
+        self.assertEqual((status,koeff),m.balance_koeff(['H2','O2','H2O']))
+        self.assertLessEqual(m.balance_basis.cache_info().currsize,1024)
+    #
+    def test_same_formula(self):
+        temperatur=m.temperature([300,350,50])
+        r=self.reakt([('H2O',-1,'l'),('H2O',1,'g')],temperatur)
+        self.assertEqual(list(r.get_koeff_vector()),[-1,1])
+        self.assertTrue(r.is_valid())
+        r=self.reakt([('H2O',1,'l'),('H2O',1,'g')],temperatur)
+        self.assertFalse(r.is_valid())
+    #
+    def test_scale(self):
+        #Коэффициенты приводятся к заданному коэффициенту последнего вещества
+        temperatur=m.temperature([298.15,400,100])
+        name='H2(g)+0.5O2(g)=H2O(g)'
+        r=self.reakt([(frm,k,ph) for k,frm,ph in m.to_stmatrix(name)],temperatur)
+        self.assertEqual(list(r.get_koeff_vector()),[-1,-0.5,1])
+        r2=self.reakt([('H2',-1,'g'),('O2',-1,'g'),('H2O',1,'g')],temperatur)
+        self.assertEqual(list(r2.get_koeff_vector()),[-1,-0.5,1])
+        r3=self.reakt([('H2',-2,'g'),('O2',-1,'g'),('H2O',2,'g')],temperatur)
+        self.assertEqual(list(r3.get_koeff_vector()),[-2,-1,2])
+        self.assertAlmostEqual(r.entalp()[0],-241.81,places=2)
+        #reaktion_lib - то же правило
+        lib=m.reaktion_lib([name,'H2(g)+O2(g)=H2O(g)'],{'temperature':temperatur},self.table,balance=True)
+        self.assertTrue(lib.is_valid().all())
+        h=lib.calc(['H'])['H']
+        self.assertTrue(np.allclose(h[0],r.entalp()))
+        self.assertTrue(np.allclose(h[1],r.entalp()))
+#
+#
+class test_reaktion_lib(db_test_case):
+    '''Матричный расчет набора реакций (reaktion_lib)'''
+    #
+    names=['H2(g)+0.5O2(g)=H2O(g)','CO(g)+0.5O2(g)=CO2(g)','CH4(g)+2O2(g)=CO2(g)+2H2O(g)','XY(g)=H2(g)']
+    #
+    def lib(self,temperatur,**kwargs):
+        return m.reaktion_lib(self.names,{'temperature':temperatur},self.table,**kwargs)
+    #
+    def test_subst(self):
+        lib=self.lib(m.temperature([300,1000,100]))
+        self.assertEqual(lib.get_names(),self.names)
+        #Общие вещества реакций создаются один раз
+        self.assertEqual(lib.get_subst(),[('H2','g'),('O2','g'),('H2O','g'),('CO','g'),('CO2','g'),('CH4','g'),('XY','g')])
+        self.assertEqual(lib.is_valid().tolist(),[True,True,True,False])
+        matrix=lib.get_stmatrix()
+        self.assertEqual(matrix.shape,(4,6))
+        self.assertEqual(matrix[2].tolist(),[0,-2,2,0,1,-1])
+        self.assertFalse(matrix[3].any())
+        self.assertTrue(np.array_equal(lib.get_stmatrix(1,3),matrix[1:3]))
+        self.assertEqual(lib.get_stmatrix(3,10).shape,(1,6))
+    #
+    def test_calc(self):
+        temperatur=m.temperature([300,2500,100])
+        lib=self.lib(temperatur)
+        res=lib.calc()
+        self.assertEqual(sorted(res),['G','H','S','lnK'])
+        for i,name in enumerate(self.names[:3]):
+            r=self.reakt([(frm,k,ph) for k,frm,ph in m.to_stmatrix(name)],temperatur)
+            self.assertTrue(np.allclose(res['H'][i],r.entalp(),atol=1e-3),name)
+            self.assertTrue(np.allclose(res['S'][i],r.entrop(),atol=1e-3),name)
+            self.assertTrue(np.allclose(res['G'][i],r.gibbs(),atol=1e-3),name)
+            self.assertTrue(np.allclose(res['lnK'][i],r.log_const_p(),atol=1e-2),name)
+        #Неправильно заданная реакция (вещества нет в БД) - nan
+        self.assertTrue(all(np.isnan(x[3]).all() for x in res.values()))
+        self.assertEqual(sorted(lib.calc(['lnK'])),['lnK'])
+    #
+    def test_iter_calc(self):
+        lib=self.lib(m.temperature([300,2500,100]))
+        res=lib.calc(['G'])['G']
+        parts=list(lib.iter_calc(['G'],chunk_size=3))
+        self.assertEqual([start for start,x in parts],[0,3])
+        self.assertTrue(np.array_equal(np.vstack([x['G'] for start,x in parts]),res,equal_nan=True))
+    #
+    def test_unknown(self):
+        lib=self.lib(m.temperature([300,1000,100]))
+        with self.assertRaisesRegex(ValueError,'Cp'):
+            lib.calc(['H','Cp'])
+        with self.assertRaisesRegex(ValueError,'Cp'):
+            next(lib.iter_calc(['Cp']))
+    #
+    def test_balance(self):
+        #Коэффициенты уравниваются и приводятся к коэффициенту последнего вещества
+        lib=m.reaktion_lib(['H2(g)+O2(g)=H2O(g)','CO(g)+O2(g)=CO2(g)','H2(g)=O2(g)'],
+            {'temperature':m.temperature([300,1000,100])},self.table,balance=True)
+        self.assertEqual(lib.is_valid().tolist(),[True,True,False])
+        matrix=lib.get_stmatrix()
+        self.assertEqual(matrix[0].tolist(),[-1,-0.5,1,0,0])
+        self.assertEqual(matrix[1].tolist(),[0,-0.5,0,-1,1])
+#
+if __name__=='__main__':
+    unittest.main()